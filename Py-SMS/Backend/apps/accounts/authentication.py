@@ -0,0 +1,69 @@
+"""JWT authentication that resolves the user from the token and an in-process cache.
+
+Access tokens carry the user id plus the ``ROLE_CLAIMS`` of the user at login
+(see ``TokenObtainPairSerializer``). ``CachedJWTAuthentication`` looks the id
+up in a per-process ``LocMemCache`` and only reads the ``users`` row on a
+miss, so most API calls authenticate without a query. Saving or deleting a
+user drops its entry (see ``accounts.signals``); other processes see the
+change once their entry expires after ``AUTH_USER_CACHE['TIMEOUT']`` seconds.
+Configured by ``AUTH_USER_CACHE`` in settings.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.core.instrumentation import record_cache_lookup
+
+ROLE_CLAIMS = ('is_instructor', 'is_superuser', 'is_staff')
+
+
+def _config():
+    return {
+        'ALIAS': 'users',
+        'TIMEOUT': 30,
+        **getattr(settings, 'AUTH_USER_CACHE', {}),
+    }
+
+
+def _cache():
+    return caches[_config()['ALIAS']]
+
+
+def _key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def add_role_claims(token, user):
+    token['username'] = user.get_username()
+    for claim in ROLE_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def invalidate_user(user_id):
+    _cache().delete(_key(user_id))
+
+
+def _matches_claims(user, token):
+    return all(token.get(claim, getattr(user, claim)) == getattr(user, claim) for claim in ROLE_CLAIMS)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` that reuses recently loaded users.
+
+    A cached user whose roles disagree with the token's claims was changed
+    elsewhere, so it is read again rather than trusted.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = _cache().get(_key(user_id)) if user_id is not None else None
+        hit = user is not None and user.is_active and _matches_claims(user, validated_token)
+        record_cache_lookup('users', hit)
+        if hit:
+            return user
+
+        user = super().get_user(validated_token)
+        _cache().set(_key(user_id), user, _config()['TIMEOUT'])
+        return user
@@ -4,14 +4,16 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.contrib.auth import get_user_model
 
+from apps.core.conditional import ConditionalGetMixin, conditional_get
 from .serializers import UserSerializer, UserCreateSerializer
 
 User = get_user_model()
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    conditional_models = (User,)
 
     def get_permissions(self):
         if self.action == 'create':
@@ -24,6 +26,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return UserSerializer
 
     @action(detail=False, methods=['get'])
+    @conditional_get(User)
     def me(self, request):
         serializer = self.get_serializer(request.user)
         return Response(serializer.data)
@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import GradeStatistics, StudentTranscript
+
+
+@admin.register(GradeStatistics)
+class GradeStatisticsAdmin(admin.ModelAdmin):
+    list_display = ['course', 'semester', 'grade_type', 'count', 'score_min', 'score_max', 'updated_at']
+    list_filter = ['semester', 'grade_type']
+    search_fields = ['course__course_code', 'course__name']
+    raw_id_fields = ['course']
+
+
+@admin.register(StudentTranscript)
+class StudentTranscriptAdmin(admin.ModelAdmin):
+    list_display = ['student', 'gpa', 'credits', 'updated_at']
+    search_fields = ['student__student_id', 'student__first_name', 'student__last_name']
+    raw_id_fields = ['student']
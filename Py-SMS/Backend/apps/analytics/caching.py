@@ -0,0 +1,171 @@
+"""Versioned response cache for the analytics endpoints.
+
+Every cached response key embeds the current version of each model the view
+reads. Writes to those models bump their version (see ``analytics.signals``),
+so stale entries are never read again and simply age out of the cache.
+Versions are ``ModelVersion`` rows, so they are shared by every worker
+process. A write inside a transaction bumps them once per model right after
+commit, in autocommit, so concurrent writers never wait on a counter row;
+until that bump, readers may briefly see the new data under the old version.
+They are read from the database the request reads its data from, and that
+database's alias is part of every key and ETag, so a response computed on a
+lagging replica is never served to a request that reads the primary.
+Configured by ``ANALYTICS_CACHE`` in settings.
+"""
+import hashlib
+import inspect
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.response import Response
+
+from apps.core.instrumentation import record_cache_lookup
+from .models import ModelVersion
+
+KEY_PREFIX = 'analytics'
+GLOBAL_SCOPE = 'global'
+
+
+def _config():
+    return {
+        'ALIAS': 'default',
+        'TIMEOUT': 60,
+        'INVALIDATION': 'model',
+        **getattr(settings, 'ANALYTICS_CACHE', {}),
+    }
+
+
+def _cache():
+    return caches[_config()['ALIAS']]
+
+
+def _scope_labels(models):
+    if _config()['INVALIDATION'] == GLOBAL_SCOPE:
+        return [GLOBAL_SCOPE]
+    return sorted(model._meta.label_lower for model in models)
+
+
+def model_versions(models, request=None):
+    """``(versions, last_modified)`` of ``models`` in one query.
+
+    ``versions`` are ``label=version`` strings, led by ``db=alias`` of the
+    database they were read from; ``last_modified`` is the Unix time of the
+    latest write (0 if none was recorded). Memoized on ``request``, which
+    the ETag and the response cache both ask for.
+    """
+    labels = tuple(_scope_labels(models))
+    memo = getattr(request, '_model_versions', None)
+    if memo is not None and labels in memo:
+        return memo[labels]
+
+    alias = router.db_for_read(ModelVersion)
+    rows = {
+        label: (version, modified_at)
+        for label, version, modified_at in ModelVersion.objects.using(alias).filter(label__in=labels)
+        .values_list('label', 'version', 'modified_at')
+    }
+    versions = [f'db={alias}', *(f'{label}={rows[label][0] if label in rows else 0}' for label in labels)]
+    last_modified = max((modified_at.timestamp() for _, modified_at in rows.values()), default=0)
+    if request is not None:
+        if memo is None:
+            memo = request._model_versions = {}
+        memo[labels] = (versions, last_modified)
+    return versions, last_modified
+
+
+class _PendingBump:
+    """``on_commit`` callback that bumps the labels its transaction wrote to."""
+
+    def __init__(self, labels):
+        self.labels = set(labels)
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        _bump(sorted(self.labels))
+
+
+def _bump(labels):
+    now = timezone.now()
+    bumped = ModelVersion.objects.filter(label__in=labels).update(version=F('version') + 1, modified_at=now)
+    if bumped < len(labels):
+        ModelVersion.objects.bulk_create(
+            [ModelVersion(label=label, version=1, modified_at=now) for label in labels], ignore_conflicts=True
+        )
+
+
+def bump_versions(*models):
+    """Invalidate every cached response that depends on ``models``.
+
+    Called from model signals; code paths that bypass signals (``bulk_create``,
+    ``QuerySet.update()``) must call it themselves. Inside a transaction the
+    bump is deferred to commit and merged with the transaction's other bumps
+    (a cascade delete of many rows bumps once), and skipped on rollback.
+    """
+    labels = _scope_labels(models)
+    alias = router.db_for_write(ModelVersion)
+    connection = connections[alias]
+    if not connection.in_atomic_block:
+        _bump(labels)
+        return
+    # A callback of a rolled back savepoint is gone from the list, so a new one is queued.
+    for _, callback, _ in connection.run_on_commit:
+        if isinstance(callback, _PendingBump) and not callback.done:
+            callback.labels.update(labels)
+            return
+    transaction.on_commit(_PendingBump(labels), using=alias)
+
+
+def _response_key(view_name, request, models):
+    params = sorted(request.query_params.lists())
+    versions, _ = model_versions(models, request)
+    raw = '|'.join([view_name, *versions, repr(params)])
+    return f'{KEY_PREFIX}:response:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def cached_response(*models):
+    """Cache successful ``Response.data`` of a view method until ``models`` change.
+
+    Works on ``async def`` view methods too.
+    """
+    def decorator(view_method):
+        if inspect.iscoroutinefunction(view_method):
+            @wraps(view_method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                config = _config()
+                view_name = f'{type(self).__name__}.{view_method.__name__}'
+                key = await sync_to_async(_response_key)(view_name, request, models)
+
+                data = await _cache().aget(key)
+                record_cache_lookup('analytics', data is not None)
+                if data is not None:
+                    return Response(data)
+
+                response = await view_method(self, request, *args, **kwargs)
+                if response.status_code == 200:
+                    await _cache().aset(key, response.data, config['TIMEOUT'])
+                return response
+            return async_wrapper
+
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            config = _config()
+            view_name = f'{type(self).__name__}.{view_method.__name__}'
+            key = _response_key(view_name, request, models)
+
+            data = _cache().get(key)
+            record_cache_lookup('analytics', data is not None)
+            if data is not None:
+                return Response(data)
+
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                _cache().set(key, response.data, config['TIMEOUT'])
+            return response
+        return wrapper
+    return decorator
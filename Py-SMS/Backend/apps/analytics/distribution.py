@@ -0,0 +1,91 @@
+"""Letter-grade distribution computed in the database.
+
+Buckets come from a ``CASE`` over ``score / max_score`` that mirrors
+``Grade.letter_grade``, so one aggregate query replaces a Python loop over
+every ``Grade`` row.
+"""
+from django.db.models import Case, Count, ExpressionWrapper, F, FloatField, Value, When
+from django.db.models.functions import NullIf
+from django.db.models.lookups import GreaterThanOrEqual
+
+from apps.grades.models import Grade
+
+LETTERS = Grade.LETTER_GRADES
+
+# breakdown key -> {output name: ORM lookup}
+BREAKDOWN_FIELDS = {
+    'grade_type': {'grade_type': 'grade_type'},
+    'course': {'course_id': 'course_id', 'course_code': 'course__course_code', 'course_name': 'course__name'},
+}
+
+
+def percentage_expression():
+    """SQL equivalent of ``Grade.percentage``; NULL when ``max_score`` is 0."""
+    return ExpressionWrapper(
+        F('score') / NullIf(F('max_score'), Value(0.0)) * Value(100.0),
+        output_field=FloatField(),
+    )
+
+
+def letter_grade_expression():
+    """SQL equivalent of ``Grade.letter_grade``."""
+    percentage = percentage_expression()
+    return Case(
+        *[
+            When(GreaterThanOrEqual(percentage, Value(float(minimum))), then=Value(letter))
+            for letter, minimum in Grade.LETTER_GRADE_THRESHOLDS
+        ],
+        default=Value('F'),
+    )
+
+
+def empty_distribution():
+    return {letter: 0 for letter in LETTERS}
+
+
+def parse_breakdown(value):
+    """Turn a ``group_by`` query param (comma separated) into breakdown keys."""
+    if not value:
+        return []
+    keys = [key.strip() for key in value.split(',') if key.strip()]
+    unknown = [key for key in keys if key not in BREAKDOWN_FIELDS]
+    if unknown:
+        raise ValueError(
+            f"Unsupported group_by value(s): {', '.join(unknown)}. "
+            f"Choose from: {', '.join(BREAKDOWN_FIELDS)}."
+        )
+    return list(dict.fromkeys(keys))
+
+
+def grade_distribution(queryset, breakdown=()):
+    """Return letter-grade counts for ``queryset``.
+
+    Without a breakdown the result is a single ``{'A': n, ..., 'F': n}`` dict.
+    With a breakdown (any keys of ``BREAKDOWN_FIELDS``) it is a list with one
+    entry per group, carrying the group fields and its ``distribution``.
+    """
+    group_fields = {
+        name: lookup for key in breakdown for name, lookup in BREAKDOWN_FIELDS[key].items()
+    }
+    lookups = list(group_fields.values())
+    rows = (
+        queryset.annotate(letter_grade_bucket=letter_grade_expression())
+        .values(*lookups, 'letter_grade_bucket')
+        .annotate(count=Count('id'))
+        .order_by(*lookups)
+    )
+
+    if not breakdown:
+        distribution = empty_distribution()
+        for row in rows:
+            distribution[row['letter_grade_bucket']] = row['count']
+        return distribution
+
+    groups = {}
+    for row in rows:
+        key = tuple(row[lookup] for lookup in lookups)
+        if key not in groups:
+            groups[key] = {name: row[lookup] for name, lookup in group_fields.items()}
+            groups[key]['distribution'] = empty_distribution()
+        groups[key]['distribution'][row['letter_grade_bucket']] = row['count']
+    return list(groups.values())
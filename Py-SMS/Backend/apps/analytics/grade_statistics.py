@@ -0,0 +1,257 @@
+"""Incremental maintenance of the ``GradeStatistics`` table.
+
+Each ``Grade`` contributes to exactly one row keyed by (course, semester,
+grade_type). Creates add their contribution, deletes subtract it and updates
+do both, all with ``F()`` expressions so concurrent writers do not lose
+updates. Min/max cannot be un-applied, so they are re-read from ``grades``
+for the one affected key when the removed score was an extreme.
+"""
+import math
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Max, Min, Q, Sum, Value
+from django.db.models.functions import Greatest, Least
+
+from apps.grades.models import Grade
+from .distribution import BREAKDOWN_FIELDS, empty_distribution, letter_grade_expression
+from .models import GradeStatistics
+
+KEY_FIELDS = ('course_id', 'semester', 'grade_type')
+SUM_FIELDS = ('count', 'score_sum', 'score_sq_sum', 'max_score_sum')
+BUCKET_FIELDS = {letter: f'{letter.lower()}_count' for letter in Grade.LETTER_GRADES}
+
+
+def grade_key(grade):
+    return (grade.course_id, grade.semester, grade.grade_type)
+
+
+def _key_filter(key):
+    return dict(zip(KEY_FIELDS, key))
+
+
+def _contribution(grade, sign):
+    score, max_score = grade.score, grade.max_score
+    return {
+        'count': sign,
+        'score_sum': sign * score,
+        'score_sq_sum': sign * score * score,
+        'max_score_sum': sign * max_score,
+        BUCKET_FIELDS[grade.letter_grade]: sign,
+    }
+
+
+def _updates(deltas, score=None):
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    if score is not None:
+        updates['score_min'] = Least(F('score_min'), Value(score))
+        updates['score_max'] = Greatest(F('score_max'), Value(score))
+    return updates
+
+
+def add_grade(grade):
+    """Fold a new or updated ``grade`` into its statistics row."""
+    key = _key_filter(grade_key(grade))
+    deltas = _contribution(grade, 1)
+    updates = _updates(deltas, grade.score)
+
+    with transaction.atomic(savepoint=False):
+        if GradeStatistics.objects.filter(**key).update(**updates):
+            return
+        try:
+            with transaction.atomic():
+                GradeStatistics.objects.create(
+                    **key, **deltas, score_min=grade.score, score_max=grade.score
+                )
+        except IntegrityError:
+            # Another writer created the row first; apply on top of it.
+            GradeStatistics.objects.filter(**key).update(**updates)
+
+
+def remove_grade(grade):
+    """Subtract ``grade`` (as it was last stored) from its statistics row."""
+    key = _key_filter(grade_key(grade))
+
+    with transaction.atomic(savepoint=False):
+        stats = GradeStatistics.objects.select_for_update().filter(**key).first()
+        if stats is None:
+            return
+        if stats.count <= 1:
+            stats.delete()
+            return
+
+        GradeStatistics.objects.filter(pk=stats.pk).update(**_updates(_contribution(grade, -1)))
+        if grade.score <= stats.score_min or grade.score >= stats.score_max:
+            refresh_extremes(key)
+
+
+def change_grade(previous, grade):
+    """Replace ``previous`` with ``grade`` when both map to the same row."""
+    key = _key_filter(grade_key(grade))
+    deltas = _contribution(grade, 1)
+    for field, delta in _contribution(previous, -1).items():
+        deltas[field] = deltas.get(field, 0) + delta
+
+    with transaction.atomic(savepoint=False):
+        stats = GradeStatistics.objects.select_for_update().filter(**key).first()
+        if stats is None:
+            add_grade(grade)
+            return
+
+        GradeStatistics.objects.filter(pk=stats.pk).update(**_updates(deltas, grade.score))
+        if previous.score <= stats.score_min or previous.score >= stats.score_max:
+            refresh_extremes(key)
+
+
+def refresh_extremes(key):
+    extremes = Grade.objects.filter(**key).aggregate(score_min=Min('score'), score_max=Max('score'))
+    GradeStatistics.objects.filter(**key).update(**extremes)
+
+
+def live_statistics(queryset=None):
+    """Aggregate ``queryset`` (default: all grades) straight from ``grades``.
+
+    Returns ``{(course_id, semester, grade_type): {field: value}}`` with the
+    same fields as ``GradeStatistics``.
+    """
+    if queryset is None:
+        queryset = Grade.objects.all()
+    rows = (
+        queryset.order_by()
+        .annotate(letter_grade_bucket=letter_grade_expression())
+        .values(*KEY_FIELDS, 'letter_grade_bucket')
+        .annotate(
+            count=Count('id'),
+            score_sum=Sum('score'),
+            score_sq_sum=Sum(F('score') * F('score')),
+            max_score_sum=Sum('max_score'),
+            score_min=Min('score'),
+            score_max=Max('score'),
+        )
+    )
+
+    result = {}
+    for row in rows:
+        key = tuple(row[field] for field in KEY_FIELDS)
+        stats = result.get(key)
+        if stats is None:
+            stats = result[key] = {field: 0 for field in SUM_FIELDS + tuple(BUCKET_FIELDS.values())}
+            stats['score_min'] = row['score_min']
+            stats['score_max'] = row['score_max']
+        for field in SUM_FIELDS:
+            stats[field] += row[field]
+        stats[BUCKET_FIELDS[row['letter_grade_bucket']]] += row['count']
+        stats['score_min'] = min(stats['score_min'], row['score_min'])
+        stats['score_max'] = max(stats['score_max'], row['score_max'])
+    return result
+
+
+def _keys_filter(keys):
+    return reduce(or_, (Q(**_key_filter(key)) for key in keys))
+
+
+def rebuild(keys=None):
+    """Recompute statistics rows from ``grades``.
+
+    With ``keys`` only those (course_id, semester, grade_type) rows are
+    rebuilt, which is what bulk writes that bypass signals should call.
+    Returns the number of rows written.
+    """
+    keys = list(keys) if keys is not None else None
+    if keys == []:
+        return 0
+
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            # Block concurrent grade writes so no delta lands between the
+            # aggregate and the swap.
+            with connection.cursor() as cursor:
+                cursor.execute(f'LOCK TABLE {Grade._meta.db_table} IN SHARE MODE')
+
+        grades = Grade.objects.all()
+        existing = GradeStatistics.objects.all()
+        if keys is not None:
+            grades = grades.filter(_keys_filter(keys))
+            existing = existing.filter(_keys_filter(keys))
+
+        live = live_statistics(grades)
+        existing.delete()
+        GradeStatistics.objects.bulk_create(
+            [GradeStatistics(**_key_filter(key), **values) for key, values in live.items()],
+            batch_size=1000,
+        )
+    return len(live)
+
+
+def verify():
+    """Compare the table with a live aggregate; return a list of mismatches."""
+    live = live_statistics()
+    stored = {
+        tuple(row[field] for field in KEY_FIELDS): row
+        for row in GradeStatistics.objects.values()
+    }
+
+    mismatches = []
+    for key in sorted(set(live) | set(stored), key=str):
+        expected, actual = live.get(key), stored.get(key)
+        if expected is None:
+            mismatches.append(f'{key}: stale row with count={actual["count"]}')
+            continue
+        if actual is None:
+            mismatches.append(f'{key}: missing row (expected count={expected["count"]})')
+            continue
+        for field, value in expected.items():
+            if actual[field] is None or not math.isclose(actual[field], value, rel_tol=1e-9, abs_tol=1e-6):
+                mismatches.append(f'{key}: {field} is {actual[field]}, expected {value}')
+    return mismatches
+
+
+def statistics_queryset(course_id=None, semester=None):
+    queryset = GradeStatistics.objects.all()
+    if course_id:
+        queryset = queryset.filter(course_id=course_id)
+    if semester:
+        queryset = queryset.filter(semester=semester)
+    return queryset
+
+
+def stored_summary(queryset):
+    """Total grade count, average score and average percentage for the rows."""
+    totals = queryset.aggregate(
+        count=Sum('count'), score_sum=Sum('score_sum'), max_score_sum=Sum('max_score_sum')
+    )
+    count = totals['count'] or 0
+    return {
+        'count': count,
+        'average_score': totals['score_sum'] / count if count else 0,
+        'average_percentage': (
+            totals['score_sum'] * 100 / totals['max_score_sum'] if totals['max_score_sum'] else 0
+        ),
+    }
+
+
+def stored_distribution(queryset, breakdown=()):
+    """Letter-grade distribution read from the statistics rows.
+
+    Same output shape as ``distribution.grade_distribution``.
+    """
+    bucket_sums = {letter: Sum(field) for letter, field in BUCKET_FIELDS.items()}
+
+    if not breakdown:
+        totals = queryset.aggregate(**bucket_sums)
+        return {letter: totals[letter] or 0 for letter in Grade.LETTER_GRADES}
+
+    group_fields = {
+        name: lookup for key in breakdown for name, lookup in BREAKDOWN_FIELDS[key].items()
+    }
+    lookups = list(group_fields.values())
+    rows = queryset.values(*lookups).annotate(**bucket_sums).order_by(*lookups)
+
+    groups = []
+    for row in rows:
+        group = {name: row[lookup] for name, lookup in group_fields.items()}
+        group['distribution'] = empty_distribution()
+        group['distribution'].update({letter: row[letter] for letter in Grade.LETTER_GRADES})
+        groups.append(group)
+    return groups
@@ -0,0 +1,33 @@
+"""Background tasks of the analytics app (see ``apps.jobs``)."""
+import os
+
+from apps.jobs.tasks import register
+from . import grade_statistics, transcripts
+
+MAX_BATCH_SIZE = 10000
+
+
+def check_recompute(payload):
+    processes = payload.get('processes', 1)
+    limit = os.cpu_count() or 1
+    if processes is not None and (type(processes) is not int or not 1 <= processes <= limit):
+        raise ValueError(f'processes must be between 1 and {limit}.')
+    batch_size = payload.get('batch_size', transcripts.BATCH_SIZE)
+    if type(batch_size) is not int or not 1 <= batch_size <= MAX_BATCH_SIZE:
+        raise ValueError(f'batch_size must be between 1 and {MAX_BATCH_SIZE}.')
+    if not isinstance(payload.get('semester', ''), (str, type(None))):
+        raise ValueError('semester must be a string.')
+
+
+@register('analytics.rebuild_grade_statistics', concurrency=1)
+def rebuild_grade_statistics(job):
+    return {'rows': grade_statistics.rebuild()}
+
+
+@register('analytics.recompute_transcripts', concurrency=1, validate=check_recompute)
+def recompute_transcripts(job, semester=None, processes=1, batch_size=transcripts.BATCH_SIZE):
+    count = transcripts.recompute_semester(
+        semester, processes=processes, batch_size=batch_size,
+        progress=lambda written, total: job.set_progress(written, total, 'students'),
+    )
+    return {'transcripts': count}
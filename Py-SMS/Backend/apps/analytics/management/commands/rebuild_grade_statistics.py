@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.analytics import grade_statistics
+from apps.analytics.models import GradeStatistics
+from apps.jobs.tasks import enqueue
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the grade_statistics table from grades and verify it against a live aggregate.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check-only',
+            action='store_true',
+            help='Only compare the table with a live aggregate; do not rebuild.',
+        )
+        parser.add_argument(
+            '--if-empty',
+            action='store_true',
+            help='Do nothing if the table already has rows (signals keep it current).',
+        )
+        parser.add_argument(
+            '--background',
+            action='store_true',
+            help='Queue the rebuild for `manage.py run_jobs` instead of running it now.',
+        )
+
+    def handle(self, *args, **options):
+        if options['if_empty'] and GradeStatistics.objects.exists():
+            self.stdout.write('grade_statistics is already populated; skipping.')
+            return
+
+        if options['background']:
+            job = enqueue('analytics.rebuild_grade_statistics')
+            self.stdout.write(self.style.SUCCESS(f'Queued job {job.pk}.'))
+            return
+
+        if not options['check_only']:
+            rows = grade_statistics.rebuild()
+            self.stdout.write(f'Rebuilt {rows} grade statistics rows.')
+
+        mismatches = grade_statistics.verify()
+        if mismatches:
+            for mismatch in mismatches[:50]:
+                self.stderr.write(mismatch)
+            raise CommandError(f'{len(mismatches)} mismatch(es) between grade_statistics and grades.')
+        self.stdout.write(self.style.SUCCESS('grade_statistics matches the live aggregate.'))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from apps.analytics import transcripts
+from apps.jobs.tasks import enqueue
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored student transcripts (GPA) for one semester or for every student.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--semester',
+            help='Only students with grades in this semester (e.g. 2024-1). Default: all students.',
+        )
+        parser.add_argument(
+            '--processes', type=int, default=None,
+            help='Worker processes (default: number of CPUs; 1 runs in this process).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=transcripts.BATCH_SIZE,
+            help='Students per worker task.',
+        )
+        parser.add_argument(
+            '--background', action='store_true',
+            help='Queue the recompute for `manage.py run_jobs` instead of running it now.',
+        )
+
+    def handle(self, *args, **options):
+        if options['background']:
+            job = enqueue('analytics.recompute_transcripts', {
+                'semester': options['semester'],
+                'processes': options['processes'] or 1,
+                'batch_size': options['batch_size'],
+            })
+            self.stdout.write(self.style.SUCCESS(f'Queued job {job.pk}.'))
+            return
+
+        count = transcripts.recompute_semester(
+            options['semester'], processes=options['processes'], batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(f'Recomputed {count} transcripts.'))
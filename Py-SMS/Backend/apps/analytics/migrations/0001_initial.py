@@ -0,0 +1,40 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ('courses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradeStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semester', models.CharField(max_length=20)),
+                ('grade_type', models.CharField(max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0.0)),
+                ('score_sq_sum', models.FloatField(default=0.0)),
+                ('score_min', models.FloatField(blank=True, null=True)),
+                ('score_max', models.FloatField(blank=True, null=True)),
+                ('max_score_sum', models.FloatField(default=0.0)),
+                ('a_count', models.IntegerField(default=0)),
+                ('b_count', models.IntegerField(default=0)),
+                ('c_count', models.IntegerField(default=0)),
+                ('d_count', models.IntegerField(default=0)),
+                ('f_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grade_statistics', to='courses.course')),
+            ],
+            options={
+                'verbose_name_plural': 'grade statistics',
+                'db_table': 'grade_statistics',
+                'ordering': ['course', 'semester', 'grade_type'],
+                'unique_together': {('course', 'semester', 'grade_type')},
+            },
+        ),
+    ]
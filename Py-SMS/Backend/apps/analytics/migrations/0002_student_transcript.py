@@ -0,0 +1,25 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('students', '0003_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentTranscript',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='transcript', serialize=False, to='students.student')),
+                ('gpa', models.FloatField(blank=True, null=True)),
+                ('credits', models.IntegerField(default=0)),
+                ('semesters', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'student_transcripts',
+            },
+        ),
+    ]
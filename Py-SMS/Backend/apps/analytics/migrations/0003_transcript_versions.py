@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('analytics', '0002_student_transcript'),
+    ]
+
+    # Existing rows get no computed_version, so each is rebuilt on its next read.
+    operations = [
+        migrations.AddField(
+            model_name='studenttranscript',
+            name='version',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='studenttranscript',
+            name='computed_version',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
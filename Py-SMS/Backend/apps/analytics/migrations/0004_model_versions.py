@@ -0,0 +1,39 @@
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def create_versions(apps, schema_editor):
+    # Every model and the 'global' scope start with a row, so writes only UPDATE.
+    ModelVersion = apps.get_model('analytics', 'ModelVersion')
+    labels = [model._meta.label_lower for model in apps.get_models()] + ['global']
+    now = timezone.now()
+    ModelVersion.objects.bulk_create(
+        [ModelVersion(label=label, version=1, modified_at=now) for label in labels], ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('analytics', '0003_transcript_versions'),
+        # The seeded labels come from the models these apps define.
+        ('accounts', '0001_initial'),
+        ('courses', '0004_enrollment_enrollments_active_idx'),
+        ('grades', '0004_partition_grade_by_semester'),
+        ('jobs', '0001_initial'),
+        ('students', '0003_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelVersion',
+            fields=[
+                ('label', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+                ('modified_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'model_versions',
+            },
+        ),
+        migrations.RunPython(create_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,102 @@
+from django.db import models
+from apps.courses.models import Course
+from apps.students.models import Student
+
+
+class GradeStatistics(models.Model):
+    """Materialized grade aggregates per (course, semester, grade_type).
+
+    Maintained incrementally by the ``Grade`` signals in ``analytics.signals``;
+    ``manage.py rebuild_grade_statistics`` recomputes it from scratch.
+    """
+
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='grade_statistics'
+    )
+    semester = models.CharField(max_length=20)
+    grade_type = models.CharField(max_length=50)
+    count = models.IntegerField(default=0)
+    score_sum = models.FloatField(default=0.0)
+    score_sq_sum = models.FloatField(default=0.0)
+    score_min = models.FloatField(null=True, blank=True)
+    score_max = models.FloatField(null=True, blank=True)
+    max_score_sum = models.FloatField(default=0.0)
+    a_count = models.IntegerField(default=0)
+    b_count = models.IntegerField(default=0)
+    c_count = models.IntegerField(default=0)
+    d_count = models.IntegerField(default=0)
+    f_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'grade_statistics'
+        unique_together = ['course', 'semester', 'grade_type']
+        ordering = ['course', 'semester', 'grade_type']
+        verbose_name_plural = 'grade statistics'
+
+    def __str__(self):
+        return f"{self.course_id} / {self.semester} / {self.grade_type}: {self.count}"
+
+    @property
+    def average_score(self):
+        if not self.count:
+            return 0.0
+        return self.score_sum / self.count
+
+    @property
+    def variance(self):
+        """Population variance of ``score``."""
+        if not self.count:
+            return 0.0
+        mean = self.average_score
+        return max(self.score_sq_sum / self.count - mean * mean, 0.0)
+
+
+class StudentTranscript(models.Model):
+    """Precomputed credit-weighted transcript of one student.
+
+    Built by ``analytics.transcripts``. The ``Grade`` / ``Enrollment`` signals
+    bump ``version`` in the writing transaction; the stored data is current
+    while ``computed_version`` equals it and is rebuilt on the next read
+    otherwise.
+    """
+
+    student = models.OneToOneField(
+        Student,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='transcript'
+    )
+    gpa = models.FloatField(null=True, blank=True)
+    credits = models.IntegerField(default=0)
+    semesters = models.JSONField(default=list)
+    version = models.IntegerField(default=0)
+    computed_version = models.IntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'student_transcripts'
+
+    def __str__(self):
+        return f"{self.student_id}: GPA {self.gpa} ({self.credits} credits)"
+
+
+class ModelVersion(models.Model):
+    """Write counter of one model (or of everything, ``global``).
+
+    Bumped by ``analytics.caching.bump_versions`` when the writing transaction commits;
+    cached analytics responses and ``ETag`` / ``Last-Modified`` validators are
+    derived from it, so every worker process sees the same versions.
+    """
+
+    label = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    modified_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'model_versions'
+
+    def __str__(self):
+        return f"{self.label}: {self.version}"
@@ -0,0 +1,112 @@
+"""Descriptive statistics over raw grade rows, computed with NumPy.
+
+``load_scores`` reads ``(student_id, score, max_score)`` for the matching
+grades in one unordered ``values_list`` query; everything after that is
+vectorized, so a course with 100k+ rows costs one query plus a few array
+passes.
+"""
+import numpy as np
+
+from apps.grades.models import Grade
+
+METRICS = ('percentage', 'score')
+DEFAULT_BINS = 10
+MAX_BINS = 100
+
+
+def grade_queryset(course_id=None, semester=None, grade_type=None):
+    queryset = Grade.objects.order_by()
+    if course_id:
+        queryset = queryset.filter(course_id=course_id)
+    if semester:
+        queryset = queryset.filter(semester=semester)
+    if grade_type:
+        queryset = queryset.filter(grade_type=grade_type)
+    return queryset
+
+
+def load_scores(queryset, metric='percentage'):
+    """``(student_ids, values)`` arrays; ``values`` are percentages or raw scores."""
+    rows = np.array(list(queryset.values_list('student_id', 'score', 'max_score')), dtype=float)
+    if not len(rows):
+        return np.empty(0, dtype=np.int64), np.empty(0)
+
+    student_ids, scores, max_scores = rows[:, 0].astype(np.int64), rows[:, 1], rows[:, 2]
+    if metric == 'score':
+        return student_ids, scores
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentages = np.where(max_scores != 0, scores / max_scores * 100, 0.0)
+    return student_ids, percentages
+
+
+def _float(value):
+    return round(float(value), 4)
+
+
+def describe(values):
+    if not len(values):
+        return {
+            'count': 0, 'mean': None, 'median': None, 'std': None, 'min': None, 'max': None,
+            'quartiles': {'q1': None, 'q2': None, 'q3': None},
+        }
+    q1, q2, q3 = np.percentile(values, [25, 50, 75])
+    return {
+        'count': int(len(values)),
+        'mean': _float(values.mean()),
+        'median': _float(q2),
+        'std': _float(values.std()),
+        'min': _float(values.min()),
+        'max': _float(values.max()),
+        'quartiles': {'q1': _float(q1), 'q2': _float(q2), 'q3': _float(q3)},
+    }
+
+
+def histogram(values, bins=DEFAULT_BINS):
+    """``bins`` equal-width buckets over the data range."""
+    if not len(values):
+        return []
+    counts, edges = np.histogram(values, bins=bins)
+    return [
+        {'start': _float(start), 'end': _float(end), 'count': int(count)}
+        for start, end, count in zip(edges[:-1], edges[1:], counts)
+    ]
+
+
+def student_standings(student_ids, values):
+    """Mean per student with its z-score and percentile rank among the students.
+
+    The percentile rank counts ties as half, so the median student is at 50.
+    """
+    if not len(values):
+        return []
+    students, inverse = np.unique(student_ids, return_inverse=True)
+    counts = np.bincount(inverse)
+    means = np.bincount(inverse, weights=values) / counts
+
+    std = means.std()
+    z_scores = (means - means.mean()) / std if std else np.zeros_like(means)
+
+    ordered = np.sort(means)
+    below = np.searchsorted(ordered, means, side='left')
+    at_or_below = np.searchsorted(ordered, means, side='right')
+    percentile_ranks = (below + at_or_below) / 2 / len(means) * 100
+
+    order = np.argsort(-means, kind='stable')
+    return [
+        {
+            'student_id': int(students[i]),
+            'count': int(counts[i]),
+            'mean': _float(means[i]),
+            'z_score': _float(z_scores[i]),
+            'percentile_rank': _float(percentile_ranks[i]),
+        }
+        for i in order
+    ]
+
+
+def score_statistics(queryset, metric='percentage', bins=DEFAULT_BINS, include_students=False):
+    student_ids, values = load_scores(queryset, metric)
+    result = {'metric': metric, **describe(values), 'histogram': histogram(values, bins)}
+    if include_students:
+        result['students'] = student_standings(student_ids, values)
+    return result
@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.students.models import Student
+from apps.courses.models import Course, Enrollment
+from apps.grades.models import Grade
+from . import grade_statistics, transcripts
+from .caching import bump_versions
+
+STATS_FIELDS = ['course_id', 'semester', 'grade_type', 'score', 'max_score']
+
+
+@receiver(pre_save, sender=Grade)
+def remember_previous_grade(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    previous = Grade.objects.filter(pk=instance.pk).values(*STATS_FIELDS, 'student_id').first()
+    instance._previous_stats_grade = Grade(**previous) if previous else None
+
+
+@receiver(post_save, sender=Grade)
+def update_grade_statistics(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_stats_grade', None)
+    instance._previous_stats_grade = None
+
+    students = {instance.student_id}
+    if previous is not None:
+        students.add(previous.student_id)
+    transcripts.invalidate(students)
+
+    if previous is None:
+        grade_statistics.add_grade(instance)
+    elif all(getattr(previous, field) == getattr(instance, field) for field in STATS_FIELDS):
+        return
+    elif grade_statistics.grade_key(previous) == grade_statistics.grade_key(instance):
+        grade_statistics.change_grade(previous, instance)
+    else:
+        grade_statistics.remove_grade(previous)
+        grade_statistics.add_grade(instance)
+
+
+@receiver(post_delete, sender=Grade)
+def discard_grade_statistics(sender, instance, **kwargs):
+    grade_statistics.remove_grade(instance)
+    transcripts.invalidate([instance.student_id])
+
+
+@receiver([post_save, post_delete], sender=Enrollment)
+def invalidate_enrollment_transcript(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transcripts.invalidate([instance.student_id])
+
+
+@receiver(post_save, sender=Course)
+def invalidate_course_transcripts(sender, instance, created, raw=False, **kwargs):
+    # Credits, code and name are copied into the transcripts of its students.
+    if not created and not raw:
+        transcripts.invalidate_course(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+@receiver([post_save, post_delete], sender=Student)
+@receiver([post_save, post_delete], sender=Course)
+@receiver([post_save, post_delete], sender=Enrollment)
+@receiver([post_save, post_delete], sender=Grade)
+def invalidate_analytics_cache(sender, **kwargs):
+    bump_versions(sender)
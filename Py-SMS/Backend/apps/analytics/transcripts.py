@@ -0,0 +1,194 @@
+"""Credit-weighted transcripts and GPA.
+
+A course's result in a semester is the student's total score over total
+max_score across every grade row of that course and semester, converted to a
+letter with ``Grade.LETTER_GRADE_THRESHOLDS`` and to grade points with
+``GRADE_POINTS``. Semester and cumulative GPA weight those points by
+``Course.credits``; courses the student dropped are left out.
+
+Results are stored per student in ``StudentTranscript``. Writes to a
+student's grades or enrollments bump that student's ``version`` in the same
+transaction (see ``analytics.signals``) and the next read recomputes it, so
+the transcript endpoint is a primary-key lookup except right after a change.
+A recompute only stores its result if the version it read before computing
+is still current, so a reader that computed from grades a concurrent write
+has since changed cannot store a stale transcript over it.
+``recompute_semester`` refreshes every student of a semester in a process pool.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.db import connections, transaction
+from django.db.models import Count, Exists, F, OuterRef, QuerySet, Sum
+from django.utils import timezone
+
+from apps.courses.models import Enrollment
+from apps.grades.models import Grade
+from apps.students.models import Student
+from .models import StudentTranscript
+
+GRADE_POINTS = {'A': 4.0, 'B': 3.0, 'C': 2.0, 'D': 1.0, 'F': 0.0}
+BATCH_SIZE = 500
+
+
+def letter_grade(percentage):
+    for letter, minimum in Grade.LETTER_GRADE_THRESHOLDS:
+        if percentage >= minimum:
+            return letter
+    return 'F'
+
+
+def _gpa(courses):
+    credits = sum(course['credits'] for course in courses)
+    if not credits:
+        return None, 0
+    points = sum(course['grade_points'] * course['credits'] for course in courses)
+    return round(points / credits, 2), credits
+
+
+def course_results(student_ids):
+    """Per (student, semester, course) totals, one aggregate query."""
+    dropped = Enrollment.objects.filter(
+        student=OuterRef('student'), course=OuterRef('course'), status='dropped'
+    )
+    return (
+        Grade.objects.filter(student_id__in=student_ids)
+        .filter(~Exists(dropped))
+        .values(
+            'student_id', 'semester', 'course_id',
+            'course__course_code', 'course__name', 'course__credits',
+        )
+        .annotate(score_sum=Sum('score'), max_score_sum=Sum('max_score'), grade_count=Count('id'))
+        .order_by('student_id', 'semester', 'course__course_code')
+    )
+
+
+def compute_transcripts(student_ids):
+    """Build unsaved ``StudentTranscript`` objects for ``student_ids``."""
+    semesters_by_student = {student_id: {} for student_id in student_ids}
+    for row in course_results(student_ids):
+        percentage = row['score_sum'] * 100 / row['max_score_sum'] if row['max_score_sum'] else 0.0
+        letter = letter_grade(percentage)
+        semesters = semesters_by_student[row['student_id']]
+        semesters.setdefault(row['semester'], []).append({
+            'course_id': row['course_id'],
+            'course_code': row['course__course_code'],
+            'course_name': row['course__name'],
+            'credits': row['course__credits'],
+            'grade_count': row['grade_count'],
+            'percentage': round(percentage, 2),
+            'letter_grade': letter,
+            'grade_points': GRADE_POINTS[letter],
+        })
+
+    transcripts = []
+    for student_id, semesters in semesters_by_student.items():
+        entries, taken = [], []
+        for semester, courses in semesters.items():
+            gpa, credits = _gpa(courses)
+            taken.extend(courses)
+            entries.append({'semester': semester, 'gpa': gpa, 'credits': credits, 'courses': courses})
+        gpa, credits = _gpa(taken)
+        transcripts.append(StudentTranscript(
+            student_id=student_id, gpa=gpa, credits=credits, semesters=entries
+        ))
+    return transcripts
+
+
+def refresh(student_ids):
+    """Recompute the transcripts of ``student_ids``; returns them.
+
+    Each is stored only if the student's ``version`` did not change while it
+    was computed. Call outside a transaction: the rows created here must be
+    visible to concurrent writers for their version bumps to count.
+    """
+    student_ids = list(Student.objects.filter(pk__in=list(student_ids)).values_list('pk', flat=True))
+    # Writers can only bump the version of a row that exists.
+    StudentTranscript.objects.bulk_create(
+        [StudentTranscript(student_id=student_id) for student_id in student_ids],
+        batch_size=BATCH_SIZE, ignore_conflicts=True,
+    )
+    # Read before the grades, so the computed data is at least this new.
+    versions = dict(
+        StudentTranscript.objects.filter(student_id__in=student_ids).values_list('student_id', 'version')
+    )
+    transcripts = compute_transcripts(student_ids)
+    now = timezone.now()
+    for transcript in transcripts:
+        transcript.version = transcript.computed_version = versions.get(transcript.student_id)
+        transcript.updated_at = now
+
+    with transaction.atomic():
+        current = dict(
+            StudentTranscript.objects.select_for_update()
+            .filter(student_id__in=student_ids).values_list('student_id', 'version')
+        )
+        fresh = [
+            transcript for transcript in transcripts
+            if transcript.computed_version is not None
+            and current.get(transcript.student_id) == transcript.computed_version
+        ]
+        StudentTranscript.objects.bulk_update(
+            fresh, ['gpa', 'credits', 'semesters', 'computed_version', 'updated_at'], batch_size=BATCH_SIZE
+        )
+    return transcripts
+
+
+def invalidate(student_ids):
+    """Mark stored transcripts stale; they are recomputed on their next read.
+
+    ``student_ids`` may also be a ``values('student_id')`` queryset, which
+    stays a subquery.
+    """
+    if not isinstance(student_ids, QuerySet):
+        student_ids = list(student_ids)
+    StudentTranscript.objects.filter(student_id__in=student_ids).update(version=F('version') + 1)
+
+
+def invalidate_course(course_id):
+    """Mark the transcripts of every student graded in ``course_id`` stale."""
+    invalidate(Grade.objects.filter(course_id=course_id).values('student_id'))
+
+
+def get_transcript(student_id):
+    """Stored transcript of ``student_id``, computed first if missing or stale."""
+    transcript = StudentTranscript.objects.filter(student_id=student_id, computed_version=F('version')).first()
+    if transcript is None:
+        transcript = next(iter(refresh([student_id])), None)
+    return transcript
+
+
+def _refresh_batch(student_ids):
+    return len(refresh(student_ids))
+
+
+def _tally(written_per_batch, total, progress):
+    written = 0
+    for count in written_per_batch:
+        written += count
+        if progress is not None:
+            progress(written, total)
+    return written
+
+
+def recompute_semester(semester=None, processes=None, batch_size=BATCH_SIZE, progress=None):
+    """Refresh every student with grades in ``semester`` (all students if ``None``).
+
+    Batches of ``batch_size`` students are spread over ``processes`` worker
+    processes; ``processes=1`` runs in this process. ``progress`` is called
+    with ``(written, total)`` after each batch. Returns the number of
+    transcripts written.
+    """
+    students = Grade.objects.order_by().values_list('student_id', flat=True).distinct()
+    if semester:
+        students = students.filter(semester=semester)
+    student_ids = sorted(students)
+    batches = [student_ids[i:i + batch_size] for i in range(0, len(student_ids), batch_size)]
+
+    if processes == 1 or len(batches) <= 1:
+        return _tally(map(_refresh_batch, batches), len(student_ids), progress)
+
+    # Forked workers must open their own connections, not share the parent's.
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=processes, initializer=django.setup) as pool:
+        return _tally(pool.map(_refresh_batch, batches), len(student_ids), progress)
@@ -3,12 +3,16 @@ from .views import (
     DashboardStatsView,
     CourseAnalyticsView,
     GradeDistributionView,
-    StudentPerformanceView
+    ScoreStatisticsView,
+    StudentPerformanceView,
+    StudentTranscriptView,
 )
 
 urlpatterns = [
     path('dashboard/', DashboardStatsView.as_view(), name='dashboard-stats'),
     path('courses/', CourseAnalyticsView.as_view(), name='course-analytics'),
     path('grades/distribution/', GradeDistributionView.as_view(), name='grade-distribution'),
+    path('grades/statistics/', ScoreStatisticsView.as_view(), name='score-statistics'),
     path('students/performance/', StudentPerformanceView.as_view(), name='student-performance'),
+    path('students/<int:student_id>/transcript/', StudentTranscriptView.as_view(), name='student-transcript'),
 ]
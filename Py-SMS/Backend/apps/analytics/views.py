@@ -1,78 +1,145 @@
-from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.db.models import Count, Avg
+from django.db.models import Sum
 from apps.students.models import Student
 from apps.courses.models import Course, Enrollment
 from apps.grades.models import Grade
-
-
-class DashboardStatsView(APIView):
-    """Dashboard statistics API."""
-
-    def get(self, request):
-        total_students = Student.objects.count()
-        total_courses = Course.objects.count()
-        active_enrollments = Enrollment.objects.filter(status='active').count()
-        total_grades = Grade.objects.count()
-
-        avg_grade = Grade.objects.aggregate(
-            avg=Avg('score')
-        )['avg'] or 0
+from . import score_statistics, transcripts
+from apps.core.async_views import AsyncAPIView, run_concurrently, run_query
+from apps.core.conditional import conditional_get
+from .caching import cached_response
+from .distribution import empty_distribution, parse_breakdown
+from .grade_statistics import statistics_queryset, stored_distribution, stored_summary
+from .models import GradeStatistics
+
+
+class DashboardStatsView(AsyncAPIView):
+    """Dashboard statistics API; the four queries run concurrently."""
+
+    @conditional_get(Student, Course, Enrollment, Grade)
+    @cached_response(Student, Course, Enrollment, Grade)
+    async def get(self, request):
+        total_students, total_courses, active_enrollments, grade_summary = await run_concurrently(
+            Student.objects.count,
+            Course.objects.count,
+            Enrollment.objects.filter(status='active').count,
+            lambda: stored_summary(GradeStatistics.objects.all()),
+        )
 
         return Response({
             'total_students': total_students,
             'total_courses': total_courses,
             'active_enrollments': active_enrollments,
-            'total_grades': total_grades,
-            'average_grade': round(avg_grade, 2),
+            'total_grades': grade_summary['count'],
+            'average_grade': round(grade_summary['average_score'], 2),
         })
 
 
-class CourseAnalyticsView(APIView):
-    """Course analytics API."""
+class CourseAnalyticsView(AsyncAPIView):
+    """Course analytics API; enrollment counts and grade totals are read concurrently."""
 
-    def get(self, request):
-        course_stats = Course.objects.annotate(
-            student_count=Count('enrollments', filter=Enrollment.objects.filter(status='active')),
-            avg_grade=Avg('grades__score')
-        ).values('id', 'course_code', 'name', 'student_count', 'avg_grade')
+    @conditional_get(Course, Enrollment, Grade)
+    @cached_response(Course, Enrollment, Grade)
+    async def get(self, request):
+        course_stats, grade_rows = await run_concurrently(
+            lambda: list(Course.objects.with_student_count().values(
+                'id', 'course_code', 'name', 'student_count'
+            )),
+            lambda: list(GradeStatistics.objects.values('course_id').annotate(
+                count=Sum('count'), score_sum=Sum('score_sum')
+            ).order_by()),
+        )
 
-        return Response(list(course_stats))
+        grade_totals = {row['course_id']: row for row in grade_rows}
 
+        results = []
+        for course in course_stats:
+            totals = grade_totals.get(course['id'])
+            course['avg_grade'] = totals['score_sum'] / totals['count'] if totals else None
+            results.append(course)
+        return Response(results)
 
-class GradeDistributionView(APIView):
-    """Grade distribution API."""
 
-    def get(self, request):
+class GradeDistributionView(AsyncAPIView):
+    """Grade distribution API.
+
+    ``group_by`` (``grade_type``, ``course`` or both, comma separated) adds a
+    per-group breakdown next to the overall distribution.
+    """
+
+    @conditional_get(Course, Grade)
+    @cached_response(Course, Grade)
+    async def get(self, request):
         course_id = request.query_params.get('course_id')
         semester = request.query_params.get('semester')
 
-        queryset = Grade.objects.all()
-        if course_id:
-            queryset = queryset.filter(course_id=course_id)
-        if semester:
-            queryset = queryset.filter(semester=semester)
+        try:
+            breakdown = parse_breakdown(request.query_params.get('group_by'))
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=400)
 
-        distribution = {
-            'A': 0, 'B': 0, 'C': 0, 'D': 0, 'F': 0
-        }
+        queryset = statistics_queryset(course_id, semester)
 
-        for grade in queryset:
-            letter = grade.letter_grade
-            distribution[letter] += 1
+        if not breakdown:
+            return Response(await run_query(lambda: stored_distribution(queryset)))
 
-        return Response(distribution)
+        groups = await run_query(lambda: stored_distribution(queryset, breakdown))
+        distribution = empty_distribution()
+        for group in groups:
+            for letter, count in group['distribution'].items():
+                distribution[letter] += count
 
+        return Response({
+            'distribution': distribution,
+            'group_by': breakdown,
+            'groups': groups,
+        })
 
-class StudentPerformanceView(APIView):
+
+class ScoreStatisticsView(AsyncAPIView):
+    """Mean, median, std-dev, quartiles, histogram and per-student standings.
+
+    Filters: ``course_id``, ``semester``, ``grade_type``. ``metric`` is
+    ``percentage`` (default) or ``score``, ``bins`` the histogram bucket count
+    and ``students=true`` adds z-scores and percentile ranks per student.
+    """
+
+    @conditional_get(Grade)
+    @cached_response(Grade)
+    async def get(self, request):
+        params = request.query_params
+        metric = params.get('metric', 'percentage')
+        if metric not in score_statistics.METRICS:
+            return Response({'error': f"metric must be one of: {', '.join(score_statistics.METRICS)}"}, status=400)
+        try:
+            bins = int(params.get('bins', score_statistics.DEFAULT_BINS))
+        except ValueError:
+            bins = 0
+        if not 1 <= bins <= score_statistics.MAX_BINS:
+            return Response({'error': f'bins must be between 1 and {score_statistics.MAX_BINS}'}, status=400)
+
+        queryset = score_statistics.grade_queryset(
+            params.get('course_id'), params.get('semester'), params.get('grade_type')
+        )
+        include_students = params.get('students', '').lower() in ('1', 'true')
+        # The NumPy work runs in the worker thread too, off the event loop.
+        return Response(await run_query(lambda: score_statistics.score_statistics(
+            queryset, metric=metric, bins=bins, include_students=include_students,
+        )))
+
+
+class StudentPerformanceView(AsyncAPIView):
     """Student performance API."""
 
-    def get(self, request):
+    @conditional_get(Course, Grade)
+    @cached_response(Course, Grade)
+    async def get(self, request):
         student_id = request.query_params.get('student_id')
         if not student_id:
             return Response({'error': 'student_id is required'}, status=400)
 
-        grades = Grade.objects.filter(student_id=student_id).select_related('course')
+        grades = await run_query(
+            lambda: list(Grade.objects.filter(student_id=student_id).select_related('course'))
+        )
 
         performance = []
         for grade in grades:
@@ -92,3 +159,21 @@ class StudentPerformanceView(APIView):
             'grades': performance,
             'average_percentage': round(avg_percentage, 2),
         })
+
+
+class StudentTranscriptView(AsyncAPIView):
+    """Per-semester and cumulative credit-weighted GPA of one student."""
+
+    @conditional_get(Grade, Enrollment, Course)
+    async def get(self, request, student_id):
+        transcript = await run_query(lambda: transcripts.get_transcript(student_id))
+        if transcript is None:
+            return Response({'error': 'Student not found'}, status=404)
+
+        return Response({
+            'student_id': transcript.student_id,
+            'gpa': transcript.gpa,
+            'credits': transcript.credits,
+            'semesters': transcript.semesters,
+            'updated_at': transcript.updated_at,
+        })
@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.core'
+    verbose_name = 'Core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import instrumentation, routing  # noqa: F401 (registers its system check)
+
+        if instrumentation.enabled():
+            connection_created.connect(instrumentation.install_query_timer)
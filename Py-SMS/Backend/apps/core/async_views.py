@@ -0,0 +1,87 @@
+"""Async DRF views and concurrent ORM calls.
+
+``AsyncAPIView`` lets a view define ``async def get``: authentication,
+permissions and throttling still run through DRF (in a thread, since they
+may query), then the handler is awaited. ``run_concurrently`` runs
+independent ORM calls at the same time, each in a worker thread with its own
+database connection, so a view with four aggregates waits for the slowest
+one instead of their sum. Worker threads follow ``CONN_MAX_AGE`` like request
+threads do: connections are checked before a call and closed after it unless
+persistent.
+"""
+import asyncio
+import inspect
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, connection
+from rest_framework.views import APIView
+
+
+def can_query_from_other_threads():
+    """Whether other threads' connections see what this thread's connection sees.
+
+    Not for in-memory SQLite (one database per connection) or inside a
+    transaction (its writes are not committed yet).
+    """
+    return (
+        not (connection.vendor == 'sqlite' and connection.is_in_memory_db())
+        and not connection.in_atomic_block
+    )
+
+
+def _in_worker_thread(func):
+    def run():
+        close_old_connections()
+        try:
+            return func()
+        finally:
+            close_old_connections()
+    return run
+
+
+async def run_query(func):
+    """Run one ORM call without blocking the event loop."""
+    return (await run_concurrently(func))[0]
+
+
+async def run_concurrently(*funcs):
+    """Call the zero-argument ``funcs`` concurrently; returns their results in order.
+
+    Falls back to calling them one after another on the request's own
+    connection when ``can_query_from_other_threads()`` is false.
+    """
+    if not await sync_to_async(can_query_from_other_threads)():
+        return [await sync_to_async(func)() for func in funcs]
+    return await asyncio.gather(*(
+        sync_to_async(_in_worker_thread(func), thread_sensitive=False)() for func in funcs
+    ))
+
+
+class AsyncAPIView(APIView):
+    """``APIView`` whose handlers are coroutines.
+
+    Served natively under ASGI; under WSGI Django runs each request's
+    coroutine in its own event loop, so ``run_concurrently`` still applies.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,147 @@
+"""``POST /api/v1/batch/``: run several GET API calls in one round trip.
+
+The batch request is authenticated once; every sub-request is dispatched
+straight to its view through the URL resolver with that user forced onto it,
+so JWT decoding and middleware run once per batch instead of once per call.
+Sub-requests run in a thread pool when ``BATCH_REQUESTS['MAX_WORKERS'] > 1``
+unless other threads could not see this request's data (in-memory SQLite,
+or an open transaction); each worker thread closes the connection it opened.
+"""
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.http import Http404
+from django.urls import Resolver404, resolve
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .async_views import can_query_from_other_threads
+from .routing import skip_pin
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = '/api/v1/'
+# Sub-request headers copied from the batch request; authentication is not
+# among them because the batch's user is forced onto every sub-request.
+FORWARDED_META = ('HTTP_HOST', 'SERVER_NAME', 'SERVER_PORT', 'REMOTE_ADDR', 'HTTP_ACCEPT_LANGUAGE', 'wsgi.url_scheme')
+
+
+def _config():
+    return {
+        'MAX_REQUESTS': 20,
+        'MAX_WORKERS': 4,
+        **getattr(settings, 'BATCH_REQUESTS', {}),
+    }
+
+
+def _sub_request(request, path, query):
+    environ = {key: request.META[key] for key in FORWARDED_META if key in request.META}
+    environ.update({
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'CONTENT_LENGTH': '0',
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.input': io.BytesIO(),
+    })
+    sub_request = WSGIRequest(environ)
+    # Picked up by rest_framework.request.Request in place of the
+    # authentication classes.
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    return sub_request
+
+
+def _error(status, message):
+    return status, {'error': message}
+
+
+def dispatch(request, url):
+    """Run one GET sub-request; returns ``(status, data)``."""
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path.startswith(API_PREFIX):
+        return _error(400, f'Only {API_PREFIX} paths can be batched.')
+    try:
+        match = resolve(parts.path)
+    except Resolver404:
+        return _error(404, 'Not found.')
+    if getattr(match.func, 'view_class', None) is BatchView:
+        return _error(400, 'Batches cannot be nested.')
+
+    view = match.func
+    if iscoroutinefunction(view):
+        view = async_to_sync(view)
+    try:
+        response = view(_sub_request(request, parts.path, parts.query), *match.args, **match.kwargs)
+    except Http404:
+        return _error(404, 'Not found.')
+    except PermissionDenied:
+        return _error(403, 'Permission denied.')
+    except Exception:
+        logger.exception('Batched request to %s failed', url)
+        return _error(500, 'Internal server error.')
+
+    if response.streaming:
+        return _error(400, 'Streaming responses cannot be batched.')
+    if hasattr(response, 'data'):
+        return response.status_code, response.data
+    return response.status_code, response.content.decode(response.charset)
+
+
+def _dispatch_in_thread(request, url):
+    try:
+        return dispatch(request, url)
+    finally:
+        connections.close_all()
+
+
+def _can_use_threads(workers, count):
+    return workers > 1 and count > 1 and can_query_from_other_threads()
+
+
+class BatchView(APIView):
+    """Run a list of GET API calls and return their responses together.
+
+    Body: ``{"requests": ["/api/v1/analytics/dashboard/", {"id": "courses",
+    "url": "/api/v1/analytics/courses/"}, ...]}``. Each response entry has
+    ``id`` (the index when not given), ``url``, ``status`` and ``data``.
+    """
+
+    def post(self, request):
+        config = _config()
+        items = request.data.get('requests') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'Send a non-empty "requests" list.'}, status=400)
+        if len(items) > config['MAX_REQUESTS']:
+            return Response({'error': f"At most {config['MAX_REQUESTS']} requests per batch."}, status=400)
+
+        entries = []
+        for index, item in enumerate(items):
+            if isinstance(item, str):
+                item = {'url': item}
+            if not isinstance(item, dict) or not isinstance(item.get('url'), str):
+                return Response({'error': f'Request {index} needs a "url" string.'}, status=400)
+            if str(item.get('method', 'GET')).upper() != 'GET':
+                return Response({'error': f'Request {index}: only GET can be batched.'}, status=400)
+            entries.append({'id': item.get('id', index), 'url': item['url']})
+        # Every sub-request is a GET, so the batch does not pin its user to
+        # the primary the way a POST normally would.
+        skip_pin(request)
+
+        urls = [entry['url'] for entry in entries]
+        if _can_use_threads(config['MAX_WORKERS'], len(urls)):
+            with ThreadPoolExecutor(max_workers=min(config['MAX_WORKERS'], len(urls))) as pool:
+                results = list(pool.map(lambda url: _dispatch_in_thread(request, url), urls))
+        else:
+            results = [dispatch(request, url) for url in urls]
+
+        for entry, (status, data) in zip(entries, results):
+            entry.update(status=status, data=data)
+        return Response({'responses': entries})
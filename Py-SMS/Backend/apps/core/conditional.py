@@ -0,0 +1,99 @@
+"""Conditional GET (``ETag`` / ``Last-Modified``) for API views.
+
+Validators come from the per-model version counters and write timestamps in
+``analytics.caching``, which every write to the listed models bumps when its
+transaction commits, so deciding on a ``304 Not Modified`` costs one primary-key
+query and happens before the view queries or serializes anything. The ETag also covers
+the path, query string, ``Accept`` header and user, so it only matches a
+response that would have been identical. ``conditional_get`` also wraps
+``async def`` handlers.
+"""
+import hashlib
+import inspect
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from apps.analytics.caching import model_versions
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def _validators(request, models):
+    versions, last_modified = model_versions(models, request)
+    raw = '|'.join([
+        *versions,
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+        str(request.user.pk),
+    ])
+    # No recorded write yet: no Last-Modified, the ETag alone decides.
+    return f'W/"{hashlib.md5(raw.encode()).hexdigest()}"', int(last_modified) or None
+
+
+def _add_validators(response, etag, last_modified):
+    if response.status_code == 200:
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        # Authenticated data: never shared caches, always revalidated.
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_response(request, models, render):
+    """Return 304 if the client's copy is current, else ``render()`` with validators."""
+    if request.method not in SAFE_METHODS:
+        return render()
+
+    etag, last_modified = _validators(request, models)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+    return _add_validators(render(), etag, last_modified)
+
+
+async def aconditional_response(request, models, render):
+    """``conditional_response`` for a coroutine ``render``."""
+    if request.method not in SAFE_METHODS:
+        return await render()
+
+    etag, last_modified = await sync_to_async(_validators)(request, models)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+    return _add_validators(await render(), etag, last_modified)
+
+
+def conditional_get(*models):
+    """Decorate a view method to answer unchanged GETs with ``304``."""
+    def decorator(view_method):
+        if inspect.iscoroutinefunction(view_method):
+            @wraps(view_method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                render = partial(view_method, self, request, *args, **kwargs)
+                return await aconditional_response(request, models, render)
+            return async_wrapper
+
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            render = partial(view_method, self, request, *args, **kwargs)
+            return conditional_response(request, models, render)
+        return wrapper
+    return decorator
+
+
+class ConditionalGetMixin:
+    """``list`` / ``retrieve`` answer ``304`` while ``conditional_models`` are unchanged."""
+
+    conditional_models = ()
+
+    def list(self, request, *args, **kwargs):
+        render = partial(super().list, request, *args, **kwargs)
+        return conditional_response(request, self.conditional_models, render)
+
+    def retrieve(self, request, *args, **kwargs):
+        render = partial(super().retrieve, request, *args, **kwargs)
+        return conditional_response(request, self.conditional_models, render)
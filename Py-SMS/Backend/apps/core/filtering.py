@@ -0,0 +1,42 @@
+"""Reuse a viewset's list filtering for parameters sent in a request body."""
+import copy
+
+from django.http import QueryDict
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+
+def list_filter_params(view_class):
+    """Query parameters that narrow ``view_class``'s list (filters and search)."""
+    params = list(getattr(view_class, 'filterset_fields', ()))
+    if getattr(view_class, 'search_fields', None):
+        params.append(api_settings.SEARCH_PARAM)
+    return params
+
+
+def filter_like_list(view_class, request, params, field='filter'):
+    """The queryset ``GET`` on ``view_class``'s list would return for query string ``params``.
+
+    Unknown or empty ``params`` raise ``ValidationError`` under ``field``:
+    a filter that silently matched everything is never what a bulk write
+    wants.
+    """
+    allowed = list_filter_params(view_class)
+    unknown = set(params).difference(allowed)
+    if unknown:
+        raise ValidationError({field: f"Unknown filter(s): {', '.join(sorted(unknown))}. Available: {', '.join(allowed)}."})
+    if not params:
+        raise ValidationError({field: 'At least one filter is required.'})
+
+    query = QueryDict(mutable=True)
+    for key, value in params.items():
+        query.setlist(key, [str(item) for item in value] if isinstance(value, list) else [str(value)])
+    django_request = copy.copy(request._request)
+    django_request.GET = query
+
+    view = view_class(
+        request=Request(django_request, authenticators=()), format_kwarg=None,
+        action='list', args=(), kwargs={},
+    )
+    return view.filter_queryset(view.get_queryset())
@@ -0,0 +1,223 @@
+"""Per-request timings: ``Server-Timing`` header, request log and slow logs.
+
+``InstrumentationMiddleware`` measures each request's total time, SQL query
+count and time, response rendering (serialization) time and cache hits and
+misses, and reports them as a ``Server-Timing`` header and one logfmt line
+on the ``apps.core.instrumentation`` logger. Requests and queries slower than
+the configured thresholds are logged with their SQL (without parameters) and
+view name, e.g. ``GradeViewSet.list``, on ``apps.core.instrumentation.slow``.
+Every request is also counted in the Prometheus metrics (``core.metrics``).
+
+Queries are timed by an execute wrapper put on every database connection
+as it is opened. It only records while a request is measured, in any thread
+that inherited the request's context (``run_concurrently`` workers
+included), and costs one context lookup per query otherwise. Configured by
+``INSTRUMENTATION`` in settings.
+"""
+import contextvars
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import metrics as prometheus
+
+logger = logging.getLogger(__name__)
+slow_logger = logging.getLogger(f'{__name__}.slow')
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+def _config():
+    return {
+        'ENABLED': True,
+        'SERVER_TIMING': True,
+        'LOG_REQUESTS': True,
+        'SLOW_REQUEST_MS': 1000,
+        'SLOW_QUERY_MS': 200,
+        'SLOW_REQUEST_QUERIES': 5,
+        **getattr(settings, 'INSTRUMENTATION', {}),
+    }
+
+
+def enabled():
+    return _config()['ENABLED']
+
+
+class RequestMetrics:
+    """Counters of one request; queries may be added from several threads."""
+
+    def __init__(self, slow_query_ms, keep_queries):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.render_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.slow_queries = []
+        self.slowest = []
+        self._slow_query_seconds = slow_query_ms / 1000 if slow_query_ms is not None else None
+        self._keep_queries = keep_queries
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+
+    def add_query(self, sql, seconds):
+        with self._lock:
+            self.queries += 1
+            self.sql_seconds += seconds
+            if self._slow_query_seconds is not None and seconds >= self._slow_query_seconds:
+                self.slow_queries.append((seconds, sql))
+            # The slowest few, for the slow request log.
+            entry = (seconds, next(self._order), sql)
+            if len(self.slowest) < self._keep_queries:
+                heapq.heappush(self.slowest, entry)
+            elif self.slowest and seconds > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, entry)
+
+    def add_cache_lookup(self, hit):
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+
+def record_cache_lookup(cache, hit):
+    """Count a hit or miss of the application cache named ``cache``."""
+    prometheus.observe_cache_lookup(cache, hit)
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add_cache_lookup(hit)
+
+
+def _time_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(sql, time.perf_counter() - start)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """``connection_created`` receiver (see ``CoreConfig.ready``)."""
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+def view_name(request):
+    """``GradeViewSet.list``, ``GradeDistributionView`` or ``-`` if unresolved."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '-'
+    view_class = getattr(match.func, 'cls', None) or getattr(match.func, 'view_class', None)
+    if view_class is None:
+        return match._func_path
+    action = getattr(match.func, 'actions', {}).get(request.method.lower())
+    return f'{view_class.__name__}.{action}' if action else view_class.__name__
+
+
+def _logfmt(fields):
+    return ' '.join(f'{key}={value}' for key, value in fields.items())
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1)
+
+
+class InstrumentationMiddleware:
+    """Measure every request; put it first in ``MIDDLEWARE`` to time all of it."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def _start(self):
+        config = _config()
+        return RequestMetrics(config['SLOW_QUERY_MS'], config['SLOW_REQUEST_QUERIES'])
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = self._start()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._report(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        metrics = self._start()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._report(request, response, metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered (serialized to bytes) right after this.
+        metrics = _current.get()
+        if metrics is not None:
+            start = time.perf_counter()
+
+            def rendered(_):
+                metrics.render_seconds += time.perf_counter() - start
+            response.add_post_render_callback(rendered)
+        return response
+
+    def _report(self, request, response, metrics):
+        config = _config()
+        total = time.perf_counter() - metrics.start
+        prometheus.observe_request(request, response, total, metrics.queries)
+        if config['SERVER_TIMING']:
+            response['Server-Timing'] = ', '.join([
+                f'total;dur={_ms(total)}',
+                f'db;dur={_ms(metrics.sql_seconds)};desc="{metrics.queries} queries"',
+                f'serialize;dur={_ms(metrics.render_seconds)}',
+                f'cache;desc="{metrics.cache_hits} hits, {metrics.cache_misses} misses"',
+            ])
+
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'view': view_name(request),
+            'status': response.status_code,
+            'total_ms': _ms(total),
+            'db_queries': metrics.queries,
+            'db_ms': _ms(metrics.sql_seconds),
+            'serialize_ms': _ms(metrics.render_seconds),
+            'cache_hits': metrics.cache_hits,
+            'cache_misses': metrics.cache_misses,
+        }
+        if config['LOG_REQUESTS']:
+            logger.info('request %s', _logfmt(fields), extra={'request_metrics': fields})
+
+        for seconds, sql in metrics.slow_queries:
+            slow_logger.warning(
+                'slow query view=%s duration_ms=%s sql=%s', fields['view'], _ms(seconds), sql,
+                extra={'request_metrics': fields},
+            )
+        slow_request_ms = config['SLOW_REQUEST_MS']
+        if slow_request_ms is not None and fields['total_ms'] >= slow_request_ms:
+            queries = ''.join(
+                f'\n  {_ms(seconds)}ms {sql}' for seconds, _, sql in sorted(metrics.slowest, reverse=True)
+            )
+            slow_logger.warning('slow request %s%s', _logfmt(fields), queries, extra={'request_metrics': fields})
@@ -0,0 +1,326 @@
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.core import instrumentation
+from apps.courses.models import Course, Enrollment
+from apps.grades.models import Grade
+from apps.jobs.models import Job
+from apps.students.models import Student
+
+DEFAULT_BASELINE = 'benchmarks/baseline.json'
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+PERCENTILES = ('p50', 'p95', 'p99')
+SKIPPED_ROUTES = {'api-root'}
+SKIPPED_NAMESPACES = {'admin'}
+
+
+def endpoints(sample):
+    """``(label, url)`` of the GET requests to time, from sample rows.
+
+    Labels are route names, with a ``:variant`` suffix for a second URL of the
+    same route; baselines are keyed by label, so ids may differ between runs.
+    """
+    student, course, grade, semester = sample['student'], sample['course'], sample['grade'], sample['semester']
+    return [
+        ('user-list', reverse('user-list')),
+        ('user-me', reverse('user-me')),
+        ('user-detail', reverse('user-detail', args=[sample['user']])),
+        ('student-list', reverse('student-list')),
+        ('student-list:cursor', reverse('student-list') + '?pagination=cursor'),
+        ('student-detail', reverse('student-detail', args=[student])),
+        ('course-list', reverse('course-list')),
+        ('course-detail', reverse('course-detail', args=[course])),
+        ('course-students', reverse('course-students', args=[course])),
+        ('course-roster', reverse('course-roster', args=[course])),
+        ('enrollment-list', reverse('enrollment-list') + f'?course={course}&status=active'),
+        ('enrollment-detail', reverse('enrollment-detail', args=[sample['enrollment']])),
+        ('enrollment-export', reverse('enrollment-export') + f'?course={course}'),
+        ('grade-list:cursor', reverse('grade-list') + '?pagination=cursor'),
+        ('grade-list:course', reverse('grade-list') + f'?course={course}&semester={semester}'),
+        ('grade-detail', reverse('grade-detail', args=[grade])),
+        ('grade-by-student', reverse('grade-by-student') + f'?student_id={student}'),
+        ('grade-by-course', reverse('grade-by-course') + f'?course_id={course}'),
+        ('grade-statistics', reverse('grade-statistics') + f'?course_id={course}&semester={semester}'),
+        ('grade-export', reverse('grade-export') + f'?export_format=ndjson&course={course}'),
+        ('dashboard-stats', reverse('dashboard-stats')),
+        ('course-analytics', reverse('course-analytics')),
+        ('grade-distribution', reverse('grade-distribution') + '?group_by=grade_type,course'),
+        ('score-statistics', reverse('score-statistics') + f'?course_id={course}&students=true'),
+        ('student-performance', reverse('student-performance') + f'?student_id={student}'),
+        ('student-transcript', reverse('student-transcript', args=[student])),
+        ('job-list', reverse('job-list')),
+        ('job-detail', reverse('job-detail', args=[sample['job']])),
+        ('job-progress', reverse('job-progress', args=[sample['job']])),
+        ('metrics', reverse('metrics')),
+    ]
+
+
+def route_of(label):
+    return label.partition(':')[0]
+
+
+def get_routes():
+    """Names of the URLconf routes that answer GET."""
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                if pattern.namespace not in SKIPPED_NAMESPACES:
+                    yield from walk(pattern.url_patterns)
+            elif isinstance(pattern, URLPattern) and pattern.name not in SKIPPED_ROUTES:
+                actions = getattr(pattern.callback, 'actions', None)
+                view_class = getattr(pattern.callback, 'view_class', None)
+                if (actions and 'get' in actions) or (not actions and hasattr(view_class, 'get')):
+                    yield pattern.name
+
+    return set(walk(get_resolver().url_patterns))
+
+
+def run_load(url, headers, total, concurrency):
+    """Send ``total`` GETs to ``url`` from ``concurrency`` in-process clients.
+
+    Returns ``(latencies in ms, query counts, error count, elapsed seconds)``.
+    """
+    remaining = iter(range(total))
+    lock = threading.Lock()
+
+    def client():
+        http = Client(headers=headers)
+        latencies, queries, errors = [], [], 0
+        try:
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        break
+                start = time.perf_counter()
+                response = http.get(url)
+                # Server-Timing is written before a streamed body runs its queries.
+                streamed = 0
+                if response.streaming:
+                    with ExitStack() as stack:
+                        captures = [stack.enter_context(CaptureQueriesContext(db)) for db in connections.all(initialized_only=True)]
+                        b''.join(response.streaming_content)
+                    streamed = sum(len(capture) for capture in captures)
+                latencies.append((time.perf_counter() - start) * 1000)
+                match = SERVER_TIMING_QUERIES.search(response.get('Server-Timing', ''))
+                if match:
+                    queries.append(int(match.group(1)) + streamed)
+                if response.status_code >= 400:
+                    errors += 1
+        finally:
+            connections.close_all()
+        return latencies, queries, errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: client(), range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies = [latency for client_latencies, _, _ in results for latency in client_latencies]
+    queries = [count for _, client_queries, _ in results for count in client_queries]
+    return latencies, queries, sum(errors for _, _, errors in results), elapsed
+
+
+class Command(BaseCommand):
+    help = (
+        'Time every read endpoint (analytics included) in-process against the configured '
+        '(seeded) database, report p50/p95/p99 latency, throughput and queries per request, '
+        'and fail when results regress against a stored baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Measured requests per endpoint (default: 50).')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per endpoint (default: 5).')
+        parser.add_argument('--concurrency', type=int, default=1, help='Concurrent clients (default: 1).')
+        parser.add_argument('--endpoints', help='Comma separated route names to time (default: all).')
+        parser.add_argument('--username', help='User the requests authenticate as (default: first superuser).')
+        parser.add_argument(
+            '--cached', action='store_true',
+            help='Leave the analytics response cache on (by default every request runs its queries).',
+        )
+        parser.add_argument(
+            '--baseline', default=DEFAULT_BASELINE,
+            help=f'Baseline JSON, relative to BASE_DIR (default: {DEFAULT_BASELINE}).',
+        )
+        parser.add_argument('--save-baseline', action='store_true', help='Write the results as the new baseline.')
+        parser.add_argument(
+            '--metric', choices=PERCENTILES, default='p50',
+            help='Latency percentile compared with the baseline (default: p50, the least noisy).',
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.5,
+            help='Allowed latency growth over the baseline as a fraction (default: 0.5).',
+        )
+        parser.add_argument(
+            '--min-delta-ms', type=float, default=10,
+            help='Latency growth below this many ms is never a regression (default: 10).',
+        )
+        parser.add_argument('--output', help='Also write the results to this JSON file.')
+
+    def handle(self, *args, **options):
+        if not instrumentation.enabled():
+            raise CommandError('Query counts come from the Server-Timing header; set INSTRUMENTATION=True.')
+
+        sample = self.sample()
+        users = get_user_model().objects.filter(is_active=True)
+        user = users.filter(username=options['username']).first() if options['username'] else (
+            users.filter(is_superuser=True).order_by('pk').first()
+        )
+        if user is None:
+            raise CommandError('No matching active user to authenticate as.')
+        sample['user'] = user.pk
+        sample['job'] = self.sample_job(user)
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}', 'Accept': 'application/json'}
+        # /metrics takes its own token, not a JWT.
+        metrics_token = settings.METRICS.get('TOKEN')
+        metrics_headers = {'Authorization': f'Bearer {metrics_token}'} if metrics_token else {}
+
+        targets = endpoints(sample)
+        uncovered = get_routes() - {route_of(label) for label, _ in targets}
+        if uncovered:
+            self.stderr.write(f"Not benchmarked (no sample URL): {', '.join(sorted(uncovered))}")
+        if options['endpoints']:
+            wanted = {name.strip() for name in options['endpoints'].split(',') if name.strip()}
+            unknown = wanted - {route_of(label) for label, _ in targets}
+            if unknown:
+                raise CommandError(f"Unknown endpoint(s): {', '.join(sorted(unknown))}")
+            targets = [(label, url) for label, url in targets if route_of(label) in wanted]
+
+        overrides = {
+            'INSTRUMENTATION': {
+                **settings.INSTRUMENTATION, 'SERVER_TIMING': True, 'LOG_REQUESTS': False,
+                'SLOW_REQUEST_MS': None, 'SLOW_QUERY_MS': None,
+            },
+            # Without a token, production settings answer /metrics with 403.
+            'METRICS': {**settings.METRICS, 'PUBLIC': True},
+        }
+        if not options['cached']:
+            overrides['ANALYTICS_CACHE'] = {**settings.ANALYTICS_CACHE, 'TIMEOUT': 0}
+
+        concurrency = options['concurrency']
+        self.stdout.write(
+            f"{options['requests']} requests per endpoint, {concurrency} client(s), "
+            f"{sample['counts']['grades']} grades"
+        )
+        self.stdout.write(
+            f"{'endpoint':<28}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}"
+        )
+        results = {}
+        setup_test_environment()
+        try:
+            with override_settings(**overrides):
+                for label, url in targets:
+                    target_headers = metrics_headers if route_of(label) == 'metrics' else headers
+                    if options['warmup']:
+                        run_load(url, target_headers, options['warmup'], min(concurrency, options['warmup']))
+                    latencies, queries, errors, elapsed = run_load(
+                        url, target_headers, options['requests'], concurrency
+                    )
+                    if errors:
+                        raise CommandError(f'GET {url}: {errors} of {len(latencies)} requests failed.')
+                    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+                    results[label] = {
+                        'url': url,
+                        'rps': round(len(latencies) / elapsed, 1),
+                        'p50_ms': round(p50, 2), 'p95_ms': round(p95, 2), 'p99_ms': round(p99, 2),
+                        'queries': int(np.median(queries)) if queries else 0,
+                    }
+                    self.stdout.write(
+                        f'{label:<28}{results[label]["rps"]:>9.1f}{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}'
+                        f'{results[label]["queries"]:>9}'
+                    )
+        finally:
+            teardown_test_environment()
+
+        report = {
+            'meta': {
+                'dataset': sample['counts'], 'database': connections['default'].vendor,
+                'requests': options['requests'], 'concurrency': concurrency, 'cached': options['cached'],
+            },
+            'endpoints': results,
+        }
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2) + '\n')
+
+        path = Path(settings.BASE_DIR) / options['baseline']
+        if options['save_baseline']:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Baseline of {len(results)} endpoints written to {path}.'))
+            return
+        if not path.exists():
+            self.stdout.write(f'No baseline at {path}; run with --save-baseline to create one.')
+            return
+        self.compare(
+            json.loads(path.read_text()), report, f"{options['metric']}_ms", options['tolerance'],
+            options['min_delta_ms'],
+        )
+
+    def sample(self):
+        grade = Grade.objects.order_by('pk').values('pk', 'student_id', 'course_id', 'semester').first()
+        enrollment = Enrollment.objects.order_by('pk').values_list('pk', flat=True).first()
+        if grade is None or enrollment is None:
+            raise CommandError('No grades found; seed the database first (manage.py seed_data).')
+        return {
+            'student': grade['student_id'], 'course': grade['course_id'], 'grade': grade['pk'],
+            'semester': grade['semester'], 'enrollment': enrollment,
+            'counts': {
+                'students': Student.objects.count(), 'courses': Course.objects.count(),
+                'enrollments': Enrollment.objects.count(), 'grades': Grade.objects.count(),
+            },
+        }
+
+    def sample_job(self, user):
+        """A job ``user`` may read; a finished one is created if there is none."""
+        jobs = Job.objects.order_by('pk')
+        if not user.is_superuser:
+            jobs = jobs.filter(created_by=user)
+        job = jobs.values_list('pk', flat=True).first()
+        if job is None:
+            now = timezone.now()
+            job = Job.objects.create(
+                name='analytics.rebuild_grade_statistics', status=Job.SUCCEEDED, attempts=1,
+                result={'rows': 0}, created_by=user, started_at=now, finished_at=now,
+            ).pk
+        return job
+
+    def compare(self, baseline, report, metric, tolerance, min_delta_ms):
+        for option in ('concurrency', 'cached'):
+            if baseline['meta'].get(option) != report['meta'][option]:
+                raise CommandError(
+                    f"The baseline was run with {option}={baseline['meta'].get(option)}; "
+                    f'compare with the same options or save a new baseline.'
+                )
+        if baseline['meta'].get('dataset') != report['meta']['dataset']:
+            self.stderr.write(
+                f"Dataset differs from the baseline's ({baseline['meta'].get('dataset')}); "
+                'reseed with the same seed_data options for comparable numbers.'
+            )
+        regressions = []
+        for label, result in report['endpoints'].items():
+            before = baseline['endpoints'].get(label)
+            if before is None:
+                continue
+            if result['queries'] > before['queries']:
+                regressions.append(f"{label}: {before['queries']} -> {result['queries']} queries")
+            if result[metric] - before[metric] > min_delta_ms and result[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f"{label}: {metric[:-3]} {before[metric]} -> {result[metric]} ms")
+        if regressions:
+            raise CommandError(
+                f'{len(regressions)} regression(s) against the baseline:\n  ' + '\n  '.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS(f"{len(report['endpoints'])} endpoints within the baseline."))
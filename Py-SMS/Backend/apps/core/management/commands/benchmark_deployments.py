@@ -0,0 +1,159 @@
+import http.client
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+DEPLOYMENTS = ('wsgi', 'asgi')
+# Worker class modules each gunicorn.conf.py profile needs.
+REQUIRED_MODULES = {'wsgi': 'gunicorn', 'asgi': 'uvicorn_worker'}
+DEFAULT_PATH = '/api/v1/analytics/dashboard/'
+STARTUP_TIMEOUT = 30
+
+
+class Server:
+    """A gunicorn process started with one ``gunicorn.conf.py`` profile."""
+
+    def __init__(self, profile, port, workers, extra_env):
+        self.profile, self.port = profile, port
+        env = {
+            **os.environ, **extra_env,
+            'SERVER_PROFILE': profile, 'WEB_CONCURRENCY': str(workers), 'PORT': str(port),
+        }
+        # A file, not a pipe: a full pipe would block the server mid-benchmark.
+        self.log = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}'],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=self.log,
+        )
+
+    def wait_until_ready(self, path):
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                self.log.seek(0)
+                error = self.log.read().decode(errors='replace').strip().splitlines()
+                raise CommandError(f'{self.profile} server exited: {error[-1] if error else "no output"}')
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=1)
+                connection.request('GET', path)
+                connection.getresponse().read()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f'{self.profile} server did not answer within {STARTUP_TIMEOUT}s.')
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.log.close()
+
+
+def run_load(port, path, headers, total, concurrency):
+    """Send ``total`` GETs from ``concurrency`` keep-alive clients.
+
+    Returns ``(latencies in ms, error count, elapsed seconds)``.
+    """
+    remaining = iter(range(total))
+    lock = threading.Lock()
+
+    def client():
+        latencies, errors = [], 0
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    break
+            start = time.perf_counter()
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    errors += 1
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            latencies.append((time.perf_counter() - start) * 1000)
+        connection.close()
+        return latencies, errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: client(), range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies = [latency for client_latencies, _ in results for latency in client_latencies]
+    return latencies, sum(errors for _, errors in results), elapsed
+
+
+class Command(BaseCommand):
+    help = (
+        'Start the WSGI (sync workers) and ASGI (Uvicorn workers) gunicorn profiles '
+        'from gunicorn.conf.py one after another and compare throughput and p99 '
+        'latency of one endpoint under concurrent load.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=DEFAULT_PATH, help=f'Endpoint to load (default: {DEFAULT_PATH}).')
+        parser.add_argument('--requests', type=int, default=2000, help='Measured requests per deployment.')
+        parser.add_argument('--concurrency', type=int, default=50, help='Concurrent clients (default: 50).')
+        parser.add_argument('--workers', type=int, default=2, help='Worker processes per server (default: 2).')
+        parser.add_argument('--port', type=int, default=8765, help='Port the servers listen on.')
+        parser.add_argument('--username', help='User the requests authenticate as (default: first superuser).')
+        parser.add_argument(
+            '--deployments', default=','.join(DEPLOYMENTS),
+            help='Comma separated subset of: wsgi, asgi.',
+        )
+        parser.add_argument(
+            '--cached', action='store_true',
+            help='Leave the analytics response cache on (by default every request runs its queries).',
+        )
+
+    def handle(self, *args, **options):
+        deployments = [name.strip() for name in options['deployments'].split(',') if name.strip()]
+        unknown = set(deployments).difference(DEPLOYMENTS)
+        if unknown:
+            raise CommandError(f"Unknown deployment(s): {', '.join(sorted(unknown))}")
+        for name in deployments:
+            if importlib.util.find_spec(REQUIRED_MODULES[name]) is None:
+                raise CommandError(f'{name} needs {REQUIRED_MODULES[name]}; pip install -r requirements.txt')
+
+        users = get_user_model().objects.filter(is_active=True)
+        user = users.filter(username=options['username']).first() if options['username'] else (
+            users.filter(is_superuser=True).order_by('pk').first()
+        )
+        if user is None:
+            raise CommandError('No matching active user to authenticate as.')
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}', 'Accept': 'application/json'}
+        extra_env = {} if options['cached'] else {'ANALYTICS_CACHE_TIMEOUT': '0'}
+
+        path, total, concurrency = options['path'], options['requests'], options['concurrency']
+        self.stdout.write(
+            f'GET {path}: {total} requests, {concurrency} clients, {options["workers"]} workers per server'
+        )
+        self.stdout.write(f"{'deployment':<12}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for name in deployments:
+            server = Server(name, options['port'], options['workers'], extra_env)
+            try:
+                server.wait_until_ready(path)
+                run_load(options['port'], path, headers, min(total, concurrency * 5), concurrency)
+                latencies, errors, elapsed = run_load(options['port'], path, headers, total, concurrency)
+            finally:
+                server.stop()
+
+            p50, p99 = np.percentile(latencies, [50, 99])
+            self.stdout.write(f'{name:<12}{len(latencies) / elapsed:>10.1f}{p50:>10.1f}{p99:>10.1f}{errors:>8}')
@@ -0,0 +1,67 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.core.sparse import project, values_queryset
+from apps.courses.models import Course
+from apps.courses.serializers import CourseListSerializer
+from apps.courses.views import CourseViewSet
+from apps.grades.models import Grade
+from apps.grades.serializers import GradeListSerializer
+from apps.grades.views import GRADE_LIST_FIELDS, GradeViewSet
+from apps.students.models import Student
+from apps.students.serializers import StudentListSerializer
+from apps.students.views import StudentViewSet
+
+
+def serializer_rows(queryset, serializer_class):
+    return serializer_class(list(queryset), many=True).data
+
+
+def values_rows(queryset, list_values):
+    rows, aliases = values_queryset(queryset, list_values, list(list_values))
+    return project(rows, aliases)
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare list serialization through the DRF list serializers with the '
+        'values() fast path on the rows in the configured database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per list (default: 1000).')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement; the median is reported.')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        cases = [
+            ('students', Student.objects.all(), StudentListSerializer, StudentViewSet.list_values),
+            ('courses', Course.objects.all(), CourseListSerializer, CourseViewSet.list_values),
+            (
+                'grades',
+                Grade.objects.select_related('student', 'course').only(*GRADE_LIST_FIELDS),
+                GradeListSerializer, GradeViewSet.list_values,
+            ),
+        ]
+
+        self.stdout.write(f"{'list':<10}{'rows':>8}{'serializer ms':>16}{'values() ms':>14}{'speedup':>10}")
+        for name, queryset, serializer_class, list_values in cases:
+            page = queryset.order_by('-pk')[:rows]
+            count = len(page)
+            if not count:
+                self.stdout.write(f'{name:<10}{0:>8}  (no rows)')
+                continue
+            slow = timed(lambda: serializer_rows(page.all(), serializer_class), repeat)
+            fast = timed(lambda: values_rows(page.all(), list_values), repeat)
+            self.stdout.write(f'{name:<10}{count:>8}{slow:>16.1f}{fast:>14.1f}{slow / fast:>9.1f}x')
@@ -0,0 +1,148 @@
+import json
+import re
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.grades.models import Grade
+
+LARGE_TABLES = ['grades', 'enrollments', 'students']
+SQLITE_FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+# Django aliases subquery and repeated-join tables (``"students" U0``); SQLite
+# reports the alias in its plan.
+SQL_TABLE_ALIAS = re.compile(r'"(\w+)" (?:AS )?"?([A-Z]\d+)"?')
+
+
+def api_checks(student, course, semester):
+    """``(label, url)`` for every list and analytics query path worth indexing."""
+    course_kwargs = {'pk': course}
+    return [
+        ('student list', reverse('student-list') + '?pagination=cursor'),
+        ('enrollment list by course', reverse('enrollment-list') + f'?pagination=cursor&course={course}&status=active'),
+        ('grade list', reverse('grade-list') + '?pagination=cursor'),
+        ('grade list by type', reverse('grade-list') + '?pagination=cursor&grade_type=exam'),
+        ('grade list by course', reverse('grade-list') + f'?course={course}&semester={semester}'),
+        ('grade list by student', reverse('grade-list') + f'?student={student}&semester={semester}'),
+        ('grades by student', reverse('grade-by-student') + f'?student_id={student}'),
+        ('grades by course', reverse('grade-by-course') + f'?course_id={course}'),
+        ('grade statistics', reverse('grade-statistics') + f'?course_id={course}&semester={semester}'),
+        ('course students', reverse('course-students', kwargs=course_kwargs)),
+        ('course roster', reverse('course-roster', kwargs=course_kwargs)),
+        ('dashboard', reverse('dashboard-stats')),
+        ('course analytics', reverse('course-analytics')),
+        ('grade distribution', reverse('grade-distribution') + f'?course_id={course}&semester={semester}'),
+        ('student performance', reverse('student-performance') + f'?student_id={student}'),
+    ]
+
+
+def with_partitions(tables):
+    """``tables`` plus their partitions, which PostgreSQL plans name instead (see ``grades.partitions``)."""
+    if connection.vendor != 'postgresql':
+        return set(tables)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent::regclass::text = ANY(%s)', [list(tables)]
+        )
+        return set(tables).union(name for name, in cursor.fetchall())
+
+
+def _postgres_seq_scans(plan, tables):
+    if plan.get('Node Type') == 'Seq Scan' and plan.get('Relation Name') in tables:
+        yield f"Seq Scan on {plan['Relation Name']}" + (f" (filter: {plan['Filter']})" if 'Filter' in plan else '')
+    for child in plan.get('Plans', []):
+        yield from _postgres_seq_scans(child, tables)
+
+
+def sequential_scans(sql, tables):
+    """Full-table scans of ``tables`` in the plan of ``sql``."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return list(_postgres_seq_scans(plan[0]['Plan'], tables))
+
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        aliases = {alias: table for table, alias in SQL_TABLE_ALIAS.findall(sql)}
+        scans = []
+        for row in cursor.fetchall():
+            match = SQLITE_FULL_SCAN.match(row[-1])
+            if match and aliases.get(match.group(1), match.group(1)) in tables:
+                scans.append(row[-1])
+        return scans
+
+
+class Command(BaseCommand):
+    help = (
+        'Run EXPLAIN on the SQL behind every list and analytics endpoint against the '
+        'configured (seeded) database and report sequential scans on large tables.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tables', nargs='+', default=LARGE_TABLES,
+            help=f"Tables that must not be scanned sequentially (default: {' '.join(LARGE_TABLES)}).",
+        )
+
+    def handle(self, *args, **options):
+        tables = with_partitions(options['tables'])
+        self.verbosity = options['verbosity']
+        sample = Grade.objects.order_by('pk').values('student_id', 'course_id', 'semester').first()
+        if sample is None:
+            raise CommandError('No grades found; seed the database before checking query plans.')
+
+        client = APIClient()
+        client.force_authenticate(get_user_model()(username='explain', is_staff=True, is_superuser=True))
+        checks = api_checks(sample['student_id'], sample['course_id'], sample['semester'])
+
+        setup_test_environment()
+        problems = 0
+        try:
+            # Analytics responses must not come from the cache.
+            with override_settings(ANALYTICS_CACHE={**settings.ANALYTICS_CACHE, 'TIMEOUT': 0}):
+                for label, url in checks:
+                    problems += self.check_endpoint(client, label, url, tables)
+        finally:
+            teardown_test_environment()
+
+        if problems:
+            raise CommandError(f'{problems} quer(y/ies) scan a large table sequentially.')
+        self.stdout.write(self.style.SUCCESS(f'{len(checks)} endpoints checked, no sequential scans.'))
+
+    def check_endpoint(self, client, label, url, tables):
+        # Inside a transaction async views run their queries on this
+        # connection instead of worker threads, so all of them are captured.
+        with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        if response.status_code != 200:
+            raise CommandError(f'GET {url} returned {response.status_code}.')
+
+        problems = 0
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # A tiny seeded table is always cheapest to scan; with seq scans
+                # disabled the planner only picks one when no index applies.
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            for query in queries.captured_queries:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+                scans = sequential_scans(sql, tables)
+                if scans:
+                    problems += 1
+                    self.stderr.write(f'{label} ({url}):\n  {sql}\n  -> ' + '\n  -> '.join(scans))
+                elif self.verbosity > 1:
+                    self.stdout.write(f'ok  {label}: {sql[:120]}')
+        return problems
@@ -0,0 +1,216 @@
+import math
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.analytics import grade_statistics
+from apps.analytics.caching import bump_versions
+from apps.courses.models import Course, Enrollment
+from apps.grades.models import Grade
+from apps.jobs.models import Job
+from apps.students.models import Student
+
+# students, courses, semesters; courses per student and grades per course are options.
+SCALES = {
+    'small': (200, 20, 4),
+    'medium': (5000, 100, 8),
+    'large': (50000, 400, 10),
+    'xlarge': (250000, 1000, 12),
+}
+FIRST_NAMES = ['Minjun', 'Seoyeon', 'Jiho', 'Haeun', 'Doyun', 'Jiwoo', 'Eunwoo', 'Sua', 'Siwoo', 'Yuna',
+               'Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Riley', 'Casey', 'Jamie', 'Avery', 'Quinn']
+LAST_NAMES = ['Kim', 'Lee', 'Park', 'Choi', 'Jung', 'Kang', 'Cho', 'Yoon', 'Jang', 'Lim',
+              'Smith', 'Garcia', 'Chen', 'Nguyen', 'Silva', 'Müller', 'Rossi', 'Sato', 'Khan', 'Ivanova']
+SUBJECTS = ['Calculus', 'Linear Algebra', 'Physics', 'Chemistry', 'Biology', 'Programming', 'Data Structures',
+            'Algorithms', 'Databases', 'Networks', 'Statistics', 'Economics', 'Psychology', 'Literature',
+            'History', 'Philosophy', 'Korean', 'English', 'Robotics', 'Machine Learning']
+# Grade types in the order a course hands them out.
+GRADE_TYPES = ['quiz', 'assignment', 'midterm', 'project', 'exam', 'final']
+CREDITS = [1, 2, 3, 3, 3, 4]
+DROP_RATE = 0.05
+
+
+def semester_labels(first_year, count):
+    return [f'{first_year + n // 2}-{n % 2 + 1}' for n in range(count)]
+
+
+def distinct_courses(rng, rows, course_count, per_student):
+    """``rows x per_student`` course indexes, distinct within each row.
+
+    A random start plus a stride coprime to ``course_count`` visits distinct
+    courses, so no per-student sampling loop is needed.
+    """
+    strides = np.array([s for s in range(1, max(course_count, 2)) if math.gcd(s, course_count) == 1] or [1])
+    start = rng.integers(0, course_count, size=rows)
+    stride = rng.choice(strides, size=rows)
+    return (start[:, None] + stride[:, None] * np.arange(per_student)) % course_count
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a reproducible synthetic dataset (users, students, courses, enrollments and '
+        'grades across many semesters) with bulk_create. Same --seed and sizes, same data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', choices=SCALES, default='small',
+            help='Preset sizes: ' + ', '.join(
+                f'{name}={students} students/{courses} courses/{semesters} semesters'
+                for name, (students, courses, semesters) in SCALES.items()
+            ) + ' (default: small).',
+        )
+        parser.add_argument('--students', type=int, help='Override the number of students.')
+        parser.add_argument('--courses', type=int, help='Override the number of courses.')
+        parser.add_argument('--semesters', type=int, help='Override the number of semesters.')
+        parser.add_argument('--first-year', type=int, default=2020, help='Year of the first semester (default: 2020).')
+        parser.add_argument('--courses-per-student', type=int, default=6, help='Courses each student takes (default: 6).')
+        parser.add_argument(
+            '--grades-per-course', type=int, default=4,
+            help=f'Graded items per enrollment, 1-{len(GRADE_TYPES)} (default: 4).',
+        )
+        parser.add_argument('--instructors', type=int, help='Instructor accounts (default: one per 10 courses).')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42).')
+        parser.add_argument('--prefix', default='SD', help='Prefix of generated codes and usernames (default: SD).')
+        parser.add_argument('--password', default='seed-pass-123', help='Password of the generated accounts.')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Students generated per transaction.')
+
+    def handle(self, *args, **options):
+        students, courses, semesters = SCALES[options['scale']]
+        students = options['students'] or students
+        courses = options['courses'] or courses
+        semesters = options['semesters'] or semesters
+        per_student = min(options['courses_per_student'], courses)
+        grades_per_course = options['grades_per_course']
+        if not 1 <= grades_per_course <= len(GRADE_TYPES):
+            raise CommandError(f'--grades-per-course must be between 1 and {len(GRADE_TYPES)}.')
+        prefix = options['prefix']
+        if Student.objects.filter(student_id__startswith=prefix).exists():
+            raise CommandError(f'Students with prefix {prefix!r} exist; use another --prefix or `manage.py flush`.')
+
+        rng = np.random.default_rng(options['seed'])
+        labels = semester_labels(options['first_year'], semesters)
+        started = time.perf_counter()
+
+        instructors = self.create_users(prefix, options['instructors'] or max(courses // 10, 1), options['password'])
+        self.create_jobs(prefix, labels)
+        course_rows = self.create_courses(rng, prefix, courses, instructors)
+        difficulty = rng.normal(0, 0.5, size=len(course_rows))
+
+        totals = {'students': 0, 'enrollments': 0, 'grades': 0}
+        for offset in range(0, students, options['batch_size']):
+            size = min(options['batch_size'], students - offset)
+            with transaction.atomic():
+                counts = self.create_students(
+                    rng, prefix, offset, size, course_rows, difficulty, labels, per_student, grades_per_course
+                )
+            for key, value in counts.items():
+                totals[key] += value
+            self.stdout.write(
+                f"  {totals['students']}/{students} students, {totals['grades']} grades "
+                f'({time.perf_counter() - started:.0f}s)'
+            )
+
+        # bulk_create skips the signals that keep these up to date.
+        grade_statistics.rebuild()
+        bump_versions(get_user_model(), Student, Course, Enrollment, Grade)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(instructors) + 1} users, {totals['students']} students, {len(course_rows)} courses, "
+            f"{totals['enrollments']} enrollments and {totals['grades']} grades over {len(labels)} semesters "
+            f'({labels[0]}..{labels[-1]}) in {time.perf_counter() - started:.0f}s. '
+            f"Log in as {prefix.lower()}admin / {options['password']}."
+        ))
+
+    def create_users(self, prefix, count, password):
+        User = get_user_model()
+        # One hash for every account; hashing is deliberately slow.
+        hashed = make_password(password)
+        name = prefix.lower()
+        User.objects.bulk_create([
+            User(
+                username=f'{name}admin', email=f'{name}admin@example.edu', password=hashed,
+                full_name='Seed Admin', is_staff=True, is_superuser=True,
+            ),
+            *(
+                User(
+                    username=f'{name}inst{n:04d}', email=f'{name}inst{n:04d}@example.edu', password=hashed,
+                    full_name=f'{LAST_NAMES[n % len(LAST_NAMES)]} {FIRST_NAMES[n % len(FIRST_NAMES)]}',
+                    is_instructor=True,
+                )
+                for n in range(count)
+            ),
+        ])
+        return [f'{LAST_NAMES[n % len(LAST_NAMES)]} {FIRST_NAMES[n % len(FIRST_NAMES)]}' for n in range(count)]
+
+    def create_jobs(self, prefix, labels):
+        """Finished recompute jobs of the admin, one per semester, for the job endpoints."""
+        admin = get_user_model().objects.get(username=f'{prefix.lower()}admin')
+        now = timezone.now()
+        Job.objects.bulk_create([
+            Job(
+                name='analytics.recompute_transcripts', payload={'semester': label}, status=Job.SUCCEEDED,
+                attempts=1, result={'transcripts': 0}, created_by=admin, started_at=now, finished_at=now,
+            )
+            for label in labels
+        ])
+
+    def create_courses(self, rng, prefix, count, instructors):
+        subjects = rng.integers(0, len(SUBJECTS), size=count)
+        credits = rng.choice(CREDITS, size=count)
+        teachers = rng.integers(0, len(instructors), size=count)
+        return Course.objects.bulk_create([
+            Course(
+                course_code=f'{prefix}{n:05d}',
+                name=f'{SUBJECTS[subjects[n]]} {100 + n % 400}',
+                credits=int(credits[n]),
+                instructor=instructors[teachers[n]],
+            )
+            for n in range(count)
+        ], batch_size=1000)
+
+    def create_students(self, rng, prefix, offset, size, courses, difficulty, labels, per_student, grades_per_course):
+        first = rng.integers(0, len(FIRST_NAMES), size=size)
+        last = rng.integers(0, len(LAST_NAMES), size=size)
+        birthdays = rng.integers(0, 365 * 6, size=size)
+        ability = rng.normal(0, 1, size=size)
+        taken = distinct_courses(rng, size, len(courses), per_student)
+        taken_in = rng.integers(0, len(labels), size=(size, per_student))
+        dropped = rng.random((size, per_student)) < DROP_RATE
+        expected = 72 + 10 * ability[:, None] - 6 * difficulty[taken]
+        scores = np.clip(expected[:, :, None] + rng.normal(0, 8, size=(size, per_student, grades_per_course)), 0, 100)
+        scores = scores.round(1).tolist()
+
+        students = Student.objects.bulk_create([
+            Student(
+                student_id=f'{prefix}{offset + n:07d}',
+                first_name=FIRST_NAMES[first[n]],
+                last_name=LAST_NAMES[last[n]],
+                email=f'{prefix.lower()}{offset + n:07d}@example.edu',
+                date_of_birth=date(1998, 1, 1) + timedelta(days=int(birthdays[n])),
+            )
+            for n in range(size)
+        ])
+
+        current = len(labels) - 1
+        enrollments, grades = [], []
+        # Plain ids skip the related-object descriptors, the bulk of per-row cost.
+        course_ids = [course.pk for course in courses]
+        for n, student in enumerate(students):
+            for k in range(per_student):
+                course_id, semester = course_ids[taken[n, k]], int(taken_in[n, k])
+                status = 'dropped' if dropped[n, k] else 'active' if semester == current else 'completed'
+                enrollments.append(Enrollment(student_id=student.pk, course_id=course_id, status=status))
+                for g in range(1 if status == 'dropped' else grades_per_course):
+                    grades.append(Grade(
+                        student_id=student.pk, course_id=course_id, semester=labels[semester],
+                        grade_type=GRADE_TYPES[g], score=scores[n][k][g], max_score=100.0,
+                    ))
+        Enrollment.objects.bulk_create(enrollments, batch_size=5000)
+        Grade.objects.bulk_create(grades, batch_size=5000)
+        return {'students': len(students), 'enrollments': len(enrollments), 'grades': len(grades)}
@@ -0,0 +1,94 @@
+"""Prometheus metrics, exposed at ``/metrics`` in the text exposition format.
+
+Fed by ``InstrumentationMiddleware`` (request counts, latency and query
+count per URL route name and method), ``record_cache_lookup`` (cache hit
+ratios) and the JWT token routes (authentication failures).
+
+Under gunicorn every worker process writes its samples to files in
+``PROMETHEUS_MULTIPROC_DIR`` (set up by ``gunicorn.conf.py``) and
+``/metrics`` aggregates all of them, whichever worker serves the scrape.
+Without that variable (``runserver``) the process's own registry is used.
+Configured by ``METRICS`` in settings; with a ``TOKEN`` the endpoint
+requires ``Authorization: Bearer <token>``. Without one it answers only
+under ``DEBUG`` or with ``PUBLIC`` set (e.g. behind a private network).
+"""
+import hmac
+import os
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views import View
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+
+AUTH_ROUTES = ('token_obtain_pair', 'token_refresh')
+UNRESOLVED = 'unresolved'
+
+REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests by URL route name, method and status.',
+    ['route', 'method', 'status'],
+)
+LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by URL route name and method.',
+    ['route', 'method'], buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_QUERIES = Histogram(
+    'http_request_db_queries', 'SQL queries per request by URL route name and method.',
+    ['route', 'method'], buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+CACHE_LOOKUPS = Counter(
+    'cache_lookups_total', 'Application cache lookups by cache and result (hit/miss).',
+    ['cache', 'result'],
+)
+AUTH_FAILURES = Counter(
+    'auth_failures_total', 'Rejected requests to the JWT token routes.',
+    ['route', 'status'],
+)
+
+
+def _config():
+    return {
+        'TOKEN': '',
+        'PUBLIC': False,
+        **getattr(settings, 'METRICS', {}),
+    }
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None and match.view_name else UNRESOLVED
+
+
+def observe_request(request, response, seconds, queries):
+    route, method, status = route_name(request), request.method, response.status_code
+    REQUESTS.labels(route, method, status).inc()
+    LATENCY.labels(route, method).observe(seconds)
+    DB_QUERIES.labels(route, method).observe(queries)
+    if route in AUTH_ROUTES and status in (400, 401):
+        AUTH_FAILURES.labels(route, status).inc()
+
+
+def observe_cache_lookup(cache, hit):
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def _registry():
+    if not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+class MetricsView(View):
+    """``GET /metrics`` for Prometheus scrapers; outside DRF and JWT auth."""
+
+    def get(self, request):
+        config = _config()
+        token = config['TOKEN']
+        if not token and not (config['PUBLIC'] or settings.DEBUG):
+            return HttpResponse('Set METRICS_TOKEN (or METRICS_PUBLIC=true) to expose metrics.', status=403)
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse(status=401)
+        return HttpResponse(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,127 @@
+"""Pagination shared by the large list endpoints.
+
+``CursorOrPageNumberPagination`` keeps the default page-number behaviour and
+adds two per-request options:
+
+* ``?pagination=cursor`` (or any request carrying ``?cursor=``) switches to
+  keyset pagination over the view's ``cursor_ordering``, so deep pages cost the
+  same as the first one and no ``COUNT(*)`` is run.
+* ``?count=estimated`` replaces the exact ``COUNT(*)`` with the PostgreSQL
+  planner's row estimate (exact count on other databases).
+"""
+import json
+
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+
+def estimate_count(queryset):
+    """Row estimate for ``queryset`` from ``EXPLAIN`` on PostgreSQL."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedPage(Page):
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator whose ``count`` is an estimate.
+
+    Since the count may be off, page bounds are not checked against it;
+    ``has_next`` is decided by fetching one extra row instead.
+    """
+
+    @cached_property
+    def count(self):
+        return estimate_count(self.object_list)
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        offset = (number - 1) * self.per_page
+        rows = list(self.object_list[offset:offset + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        return EstimatedPage(rows[:self.per_page], number, self, has_next=len(rows) > self.per_page)
+
+
+class KeysetPagination(CursorPagination):
+    """Cursor pagination over a fixed, indexed ordering (ignores ``?ordering=``)."""
+
+    def __init__(self, ordering, page_size):
+        self.ordering = ordering
+        self.page_size = page_size
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(self.ordering)
+
+
+class CursorOrPageNumberPagination(PageNumberPagination):
+    """Page-number pagination with opt-in cursor mode and estimated counts.
+
+    Views using it declare ``cursor_ordering``, e.g. ``('-created_at', '-id')``,
+    which should be backed by an index.
+    """
+
+    mode_query_param = 'pagination'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.estimated_count = request.query_params.get(self.count_query_param) == 'estimated'
+        self.keyset = None
+
+        if self.use_cursor(request):
+            self.keyset = KeysetPagination(view.cursor_ordering, self.get_page_size(request))
+            if self.estimated_count:
+                self.count = estimate_count(queryset)
+            return self.keyset.paginate_queryset(queryset, request, view)
+
+        if self.estimated_count:
+            self.django_paginator_class = EstimatedCountPaginator
+        return super().paginate_queryset(queryset, request, view)
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def get_paginated_response(self, data):
+        if self.keyset is None:
+            return super().get_paginated_response(data)
+
+        payload = {}
+        if self.estimated_count:
+            payload['count'] = self.count
+        payload.update({
+            'next': self.keyset.get_next_link(),
+            'previous': self.keyset.get_previous_link(),
+            'results': data,
+        })
+        return Response(payload)
@@ -0,0 +1,181 @@
+"""Read-replica routing for analytics and list requests.
+
+With a ``replica`` database configured (``REPLICA_DATABASE_URL``),
+``ReplicaRoutingMiddleware`` marks safe GETs of ``apps.analytics`` views and
+of ``list`` actions, and ``ReplicaRouter`` sends the reads of those requests
+to the replica. Everything else (writes, other reads, reads inside a
+transaction, management commands, job workers) uses ``default``. After a
+successful write the user is pinned to ``default`` for
+``REPLICA_ROUTING['PIN_SECONDS']`` so they read their own writes while the
+replica catches up. A view can opt in or out with ``replica_reads``, and
+one that handles a write method without writing (the GET batch) calls
+``skip_pin``.
+
+Pins must be visible to every worker, so ``check_pin_cache`` (a system
+check) rejects a process-local ``CACHE_ALIAS`` while a replica is configured.
+"""
+import contextvars
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import Resolver404, resolve
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+SAFE_METHODS = ('GET', 'HEAD')
+# Cache backends whose entries other worker processes cannot see.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+_reading_replica = contextvars.ContextVar('reading_replica', default=False)
+
+
+def _config():
+    return {
+        'ALIAS': 'replica',
+        'PIN_SECONDS': 5,
+        'CACHE_ALIAS': 'default',
+        **getattr(settings, 'REPLICA_ROUTING', {}),
+    }
+
+
+def replica_alias():
+    """The replica's database alias, or ``None`` when none is configured."""
+    alias = _config()['ALIAS']
+    return alias if alias in settings.DATABASES else None
+
+
+@checks.register(checks.Tags.caches, checks.Tags.database)
+def check_pin_cache(app_configs=None, **kwargs):
+    """A replica needs a shared pin cache, or users miss their own writes."""
+    if replica_alias() is None or _config()['PIN_SECONDS'] <= 0:
+        return []
+    alias = _config()['CACHE_ALIAS']
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    # A single runserver process shares its LocMemCache with itself.
+    level, check_id = (checks.Warning, 'core.W001') if settings.DEBUG else (checks.Error, 'core.E001')
+    return [level(
+        f"REPLICA_ROUTING['CACHE_ALIAS'] ({alias!r}) uses {backend}, which other worker processes cannot see, "
+        'so a user pinned to the primary after a write may read stale data from the replica.',
+        hint='Set CACHE_BACKEND/CACHE_LOCATION to Redis or Memcached, or REPLICA_PIN_SECONDS=0 to disable pinning.',
+        id=check_id,
+    )]
+
+
+def _pin_key(user_id):
+    return f'replica:pin:{user_id}'
+
+
+def pin_to_primary(user_id):
+    seconds = _config()['PIN_SECONDS']
+    if seconds > 0 and replica_alias():
+        caches[_config()['CACHE_ALIAS']].set(_pin_key(user_id), True, seconds)
+
+
+def is_pinned(user_id):
+    return caches[_config()['CACHE_ALIAS']].get(_pin_key(user_id), False)
+
+
+def _token_user_id(request):
+    """User id of the request's access token, without loading the user."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        return authentication.get_validated_token(raw_token).get(api_settings.USER_ID_CLAIM)
+    except AuthenticationFailed:
+        return None
+
+
+def reads_replica(request):
+    """Whether the reads of ``request`` may be served by the replica."""
+    if request.method not in SAFE_METHODS or replica_alias() is None:
+        return False
+    try:
+        view = resolve(request.path_info, getattr(request, 'urlconf', None)).func
+    except Resolver404:
+        return False
+    view_class = getattr(view, 'cls', None)
+    allowed = getattr(view_class, 'replica_reads', None)
+    if allowed is None:
+        allowed = view_class is not None and (
+            view_class.__module__.startswith('apps.analytics.')
+            or getattr(view, 'actions', {}).get('get') == 'list'
+        )
+    if not allowed or _config()['PIN_SECONDS'] <= 0:
+        return allowed
+    user_id = _token_user_id(request)
+    return user_id is None or not is_pinned(user_id)
+
+
+def skip_pin(request):
+    """Do not pin the user after ``request``, which wrote nothing despite its method."""
+    getattr(request, '_request', request).replica_skip_pin = True
+
+
+def _pin_writer(request, response):
+    if request.method in SAFE_METHODS or response.status_code >= 400 or getattr(request, 'replica_skip_pin', False):
+        return
+    # DRF sets the authenticated user on the underlying request.
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        pin_to_primary(user.pk)
+
+
+class ReplicaRoutingMiddleware:
+    """Route the reads of replica-safe requests; pin users after they write."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = _reading_replica.set(reads_replica(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _reading_replica.reset(token)
+        _pin_writer(request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = _reading_replica.set(await sync_to_async(reads_replica)(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _reading_replica.reset(token)
+        await sync_to_async(_pin_writer)(request, response)
+        return response
+
+
+class ReplicaRouter:
+    """Send reads to the replica while ``ReplicaRoutingMiddleware`` allows it."""
+
+    def db_for_read(self, model, **hints):
+        # Reads inside a transaction must see its uncommitted writes.
+        if not _reading_replica.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return replica_alias()
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
@@ -0,0 +1,105 @@
+"""Index-friendly ``?search=``.
+
+On PostgreSQL ``icontains`` compiles to ``UPPER(col::text) LIKE UPPER('%term%')``,
+which a ``pg_trgm`` GIN index on ``UPPER(col)`` can answer (see
+``AddTrigramIndex``). ``TrigramSearchFilter`` keeps DRF's ``SearchFilter``
+semantics but turns search fields on a foreign key (``student__first_name``)
+into ``student_id IN (SELECT ...)`` subqueries, so each table is searched
+through its own indexes instead of ``OR``-ing across a join. Other databases
+run the same SQL without the indexes.
+"""
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import migrations
+from django.db.models import Q
+from rest_framework import filters
+
+
+def _is_forward_relation(model, name):
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return field.is_relation and (field.many_to_one or field.one_to_one) and field.concrete
+
+
+def _any_contains(fields, term):
+    return reduce(or_, (Q(**{f'{field}__icontains': term}) for field in fields))
+
+
+class TrigramSearchFilter(filters.SearchFilter):
+    """``SearchFilter`` that searches related tables through ``IN`` subqueries."""
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+        if any(field[0] in self.lookup_prefixes for field in search_fields):
+            return super().filter_queryset(request, queryset, view)
+
+        model = queryset.model
+        local, related = [], {}
+        for field in search_fields:
+            relation, _, rest = field.partition('__')
+            if rest and _is_forward_relation(model, relation):
+                related.setdefault(relation, []).append(rest)
+            else:
+                local.append(field)
+
+        for term in search_terms:
+            conditions = [_any_contains(local, term)] if local else []
+            for relation, fields in related.items():
+                related_model = model._meta.get_field(relation).related_model
+                matches = related_model._default_manager.filter(_any_contains(fields, term))
+                conditions.append(Q(**{f'{relation}__in': matches.values('pk')}))
+            queryset = queryset.filter(reduce(or_, conditions))
+        return queryset
+
+
+class AddTrigramIndex(migrations.operations.base.Operation):
+    """Create a ``gin (UPPER(column) gin_trgm_ops)`` index on PostgreSQL only.
+
+    The index is not part of the model state, so ``makemigrations`` ignores it
+    and SQLite databases simply skip it.
+    """
+
+    reduces_to_sql = False
+    reversible = True
+
+    def __init__(self, model_name, field, name):
+        self.model_name = model_name
+        self.field = field
+        self.name = name
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        model = to_state.apps.get_model(app_label, self.model_name)
+        quote = schema_editor.quote_name
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {quote(self.name)} ON {quote(model._meta.db_table)} '
+            f'USING gin (UPPER({quote(model._meta.get_field(self.field).column)}) gin_trgm_ops)'
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        schema_editor.execute(f'DROP INDEX IF EXISTS {schema_editor.quote_name(self.name)}')
+
+    def describe(self):
+        return f'Create trigram index {self.name} on {self.model_name}.{self.field}'
+
+    @property
+    def migration_name_fragment(self):
+        return self.name.lower()
+
+    def deconstruct(self):
+        return self.__class__.__name__, [], {
+            'model_name': self.model_name, 'field': self.field, 'name': self.name,
+        }
@@ -0,0 +1,90 @@
+"""Sparse fieldsets (``?fields=``) and the ``values()`` fast path for list actions.
+
+``?fields=id,full_name`` limits any response of a ``SparseFieldsMixin`` view
+to those fields. ``ValuesListMixin`` additionally serves ``list`` without
+model instances or serializers: ``list_values`` maps every output field of
+the list serializer to a lookup or SQL expression, the page is fetched with
+``QuerySet.values()`` (only the requested columns) and the rows are renamed
+into the response dicts.
+"""
+from django.db.models import F
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+FIELDS_PARAM = 'fields'
+
+
+def requested_fields(request, available):
+    """Fields named in ``?fields=`` (in ``available`` order), or ``None`` for all."""
+    raw = request.query_params.get(FIELDS_PARAM)
+    if not raw:
+        return None
+    names = {name.strip() for name in raw.split(',') if name.strip()}
+    unknown = names.difference(available)
+    if unknown:
+        raise ValidationError({
+            FIELDS_PARAM: f"Unknown field(s): {', '.join(sorted(unknown))}. "
+                          f"Available: {', '.join(available)}."
+        })
+    return [name for name in available if name in names]
+
+
+def values_queryset(queryset, list_values, fields, extra=()):
+    """``queryset.values()`` with a ``value_<field>`` column per field, plus ``extra``.
+
+    Returns the queryset and the ``{field: column}`` mapping for ``project``.
+    """
+    aliases = {field: f'value_{field}' for field in fields}
+    queryset = queryset.annotate(**{
+        aliases[field]: F(source) if isinstance(source, str) else source
+        for field, source in list_values.items() if field in aliases
+    })
+    return queryset.values(*aliases.values(), *extra), aliases
+
+
+def project(rows, aliases):
+    return [{field: row[alias] for field, alias in aliases.items()} for row in rows]
+
+
+class SparseFieldsMixin:
+    """Drop serializer fields the client did not ask for with ``?fields=``."""
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.request is None or self.request.method != 'GET':
+            return serializer
+
+        target = getattr(serializer, 'child', serializer)
+        readable = [name for name, field in target.fields.items() if not field.write_only]
+        selected = requested_fields(self.request, readable)
+        if selected is not None:
+            for name in set(readable).difference(selected):
+                target.fields.pop(name)
+        return serializer
+
+
+class ValuesListMixin(SparseFieldsMixin):
+    """Serve ``list`` from ``QuerySet.values()`` using ``list_values``.
+
+    ``list_values`` is ``{output field: lookup or expression}`` and must
+    produce exactly what the list serializer would.
+    """
+
+    list_values = None
+
+    def list(self, request, *args, **kwargs):
+        if not self.list_values:
+            return super().list(request, *args, **kwargs)
+
+        fields = requested_fields(request, list(self.list_values)) or list(self.list_values)
+        # Keyset pagination reads its position from the row itself.
+        position = [field.lstrip('-') for field in getattr(self, 'cursor_ordering', ())]
+        rows, aliases = values_queryset(
+            self.filter_queryset(self.get_queryset()), self.list_values, fields, position
+        )
+
+        page = self.paginate_queryset(rows)
+        data = project(page if page is not None else rows, aliases)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
@@ -0,0 +1,58 @@
+"""Set-based enrollment changes.
+
+Each operation is a few statements however many enrollments it touches:
+``bulk_create(ignore_conflicts=True)`` lets the ``(student, course)`` unique
+constraint skip students who are already enrolled, and status changes are a
+single ``UPDATE``. Both bypass model signals, so the affected transcripts
+and the ``Enrollment`` cache version are invalidated here.
+"""
+from django.db import transaction
+
+from apps.analytics import transcripts
+from apps.analytics.caching import bump_versions
+from apps.students.models import Student
+from .models import Enrollment
+
+BATCH_SIZE = 1000
+
+
+def enroll(course, students, status='active'):
+    """Enroll every student of the ``students`` queryset in ``course``.
+
+    Returns ``{'matched', 'created', 'already_enrolled'}``.
+    """
+    student_ids = list(students.order_by().values_list('pk', flat=True).distinct())
+    if not student_ids:
+        return {'matched': 0, 'created': 0, 'already_enrolled': 0}
+
+    with transaction.atomic():
+        existing = Enrollment.objects.filter(
+            course=course, student__in=students.order_by().values('pk')
+        ).count()
+        Enrollment.objects.bulk_create(
+            [Enrollment(student_id=student_id, course=course, status=status) for student_id in student_ids],
+            batch_size=BATCH_SIZE, ignore_conflicts=True,
+        )
+        transcripts.invalidate(student_ids)
+    bump_versions(Enrollment)
+    return {'matched': len(student_ids), 'created': len(student_ids) - existing, 'already_enrolled': existing}
+
+
+def set_status(enrollments, status):
+    """Move every enrollment of the queryset to ``status``; returns ``{'updated'}``."""
+    changing = Enrollment.objects.filter(pk__in=enrollments.order_by().values('pk')).exclude(status=status)
+    with transaction.atomic():
+        # Before the UPDATE, while the filter still matches the rows.
+        transcripts.invalidate(changing.values('student_id'))
+        updated = changing.update(status=status)
+    if updated:
+        bump_versions(Enrollment)
+    return {'updated': updated}
+
+
+def copy_cohort(source, target, source_statuses=('active',), status='active'):
+    """Enroll the students of ``source`` whose status is in ``source_statuses`` in ``target``."""
+    students = Student.objects.filter(
+        enrollments__course=source, enrollments__status__in=list(source_statuses)
+    )
+    return enroll(target, students, status)
@@ -0,0 +1,18 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+from apps.core.search import AddTrigramIndex
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('courses', '0002_enrollment_enrollments_enrolled_id_idx'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddTrigramIndex(model_name='course', field='course_code', name='courses_course_code_trgm'),
+        AddTrigramIndex(model_name='course', field='name', name='courses_name_trgm'),
+        AddTrigramIndex(model_name='course', field='description', name='courses_description_trgm'),
+        AddTrigramIndex(model_name='course', field='instructor', name='courses_instructor_trgm'),
+    ]
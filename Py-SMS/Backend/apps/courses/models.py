@@ -2,6 +2,14 @@ from django.db import models
 from apps.students.models import Student
 
 
+class CourseQuerySet(models.QuerySet):
+    def with_student_count(self):
+        """Annotate ``student_count`` with the number of active enrollments."""
+        return self.annotate(
+            student_count=models.Count('enrollments', filter=models.Q(enrollments__status='active'))
+        )
+
+
 class Course(models.Model):
     """Course model."""
 
@@ -13,6 +21,8 @@ class Course(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CourseQuerySet.as_manager()
+
     class Meta:
         db_table = 'courses'
         ordering = ['name']
@@ -47,6 +57,14 @@ class Enrollment(models.Model):
         db_table = 'enrollments'
         unique_together = ['student', 'course']
         ordering = ['-enrolled_at']
+        indexes = [
+            models.Index(fields=['-enrolled_at', '-id'], name='enrollments_enrolled_id_idx'),
+            # Rosters and student counts only ever look at active enrollments.
+            models.Index(
+                fields=['course', 'student'], condition=models.Q(status='active'),
+                name='enrollments_active_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.student.full_name} - {self.course.name}"
@@ -13,7 +13,12 @@ class CourseSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
     def get_student_count(self, obj):
-        return obj.enrollments.filter(status='active').count()
+        # Annotated by CourseQuerySet.with_student_count(); fall back to a
+        # query for instances that were not loaded through it.
+        count = getattr(obj, 'student_count', None)
+        if count is None:
+            count = obj.enrollments.filter(status='active').count()
+        return count
 
 
 class CourseListSerializer(serializers.ModelSerializer):
@@ -39,3 +44,35 @@ class EnrollmentCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Enrollment
         fields = ['student', 'course', 'status']
+
+
+STATUS_VALUES = [status for status, _ in Enrollment.STATUS_CHOICES]
+MAX_BULK_STUDENTS = 10000
+
+
+class BulkEnrollSerializer(serializers.Serializer):
+    """Students by primary key (``students``) or by student list filters (``student_filter``)."""
+
+    students = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False, max_length=MAX_BULK_STUDENTS
+    )
+    student_filter = serializers.DictField(required=False)
+    status = serializers.ChoiceField(choices=STATUS_VALUES, default='active')
+
+    def validate(self, data):
+        if ('students' in data) == ('student_filter' in data):
+            raise serializers.ValidationError('Send either "students" or "student_filter".')
+        return data
+
+
+class BulkStatusSerializer(serializers.Serializer):
+    filter = serializers.DictField()
+    status = serializers.ChoiceField(choices=STATUS_VALUES)
+
+
+class CohortCopySerializer(serializers.Serializer):
+    target_course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all())
+    source_status = serializers.ListField(
+        child=serializers.ChoiceField(choices=STATUS_VALUES), default=['active'], allow_empty=False
+    )
+    status = serializers.ChoiceField(choices=STATUS_VALUES, default='active')
@@ -3,8 +3,9 @@ from rest_framework.routers import DefaultRouter
 from .views import CourseViewSet, EnrollmentViewSet
 
 router = DefaultRouter()
-router.register('', CourseViewSet, basename='course')
+# Registered before the course routes so '<pk>/' does not swallow 'enrollments/'.
 router.register('enrollments', EnrollmentViewSet, basename='enrollment')
+router.register('', CourseViewSet, basename='course')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -2,44 +2,187 @@ from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from apps.core.conditional import ConditionalGetMixin, conditional_get
+from apps.core.export import export_response, get_export_format
+from apps.core.filtering import filter_like_list
+from apps.core.pagination import CursorOrPageNumberPagination
+from apps.core.search import TrigramSearchFilter
+from apps.core.sparse import SparseFieldsMixin, ValuesListMixin
+from apps.students.models import Student, full_name_expression
+from apps.students.views import StudentViewSet
+from . import bulk
 from .models import Course, Enrollment
 from .serializers import (
     CourseSerializer, CourseListSerializer,
-    EnrollmentSerializer, EnrollmentCreateSerializer
+    EnrollmentSerializer, EnrollmentCreateSerializer,
+    BulkEnrollSerializer, BulkStatusSerializer, CohortCopySerializer
 )
 
+# Columns EnrollmentSerializer reads, including its nested list serializers.
+ENROLLMENT_READ_FIELDS = [
+    'id', 'enrolled_at', 'status', 'student', 'course',
+    'student__student_id', 'student__first_name', 'student__last_name', 'student__email',
+    'course__course_code', 'course__name', 'course__credits', 'course__instructor',
+]
+ENROLLMENT_EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('student_id', 'student__student_id'),
+    ('student_name', full_name_expression('student__')),
+    ('course_code', 'course__course_code'),
+    ('course_name', 'course__name'),
+    ('status', 'status'),
+    ('enrolled_at', 'enrolled_at'),
+]
+ROSTER_EXPORT_COLUMNS = [
+    ('student_id', 'student__student_id'),
+    ('first_name', 'student__first_name'),
+    ('last_name', 'student__last_name'),
+    ('email', 'student__email'),
+    ('status', 'status'),
+    ('enrolled_at', 'enrolled_at'),
+]
 
-class CourseViewSet(viewsets.ModelViewSet):
+
+def with_enrollment_relations(queryset):
+    return queryset.select_related('student', 'course').only(*ENROLLMENT_READ_FIELDS)
+
+
+class CourseViewSet(ConditionalGetMixin, ValuesListMixin, viewsets.ModelViewSet):
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, TrigramSearchFilter, filters.OrderingFilter]
     filterset_fields = ['course_code', 'instructor']
     search_fields = ['course_code', 'name', 'description', 'instructor']
     ordering_fields = ['created_at', 'name', 'course_code']
     ordering = ['name']
+    # student_count comes from enrollments.
+    conditional_models = (Course, Enrollment)
+    # Same output as CourseListSerializer.
+    list_values = {
+        'id': 'id',
+        'course_code': 'course_code',
+        'name': 'name',
+        'credits': 'credits',
+        'instructor': 'instructor',
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.get_serializer_class() is CourseSerializer:
+            queryset = queryset.with_student_count()
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'list':
             return CourseListSerializer
         return CourseSerializer
 
+    def perform_create(self, serializer):
+        course = serializer.save()
+        course.student_count = 0
+
     @action(detail=True, methods=['get'])
+    @conditional_get(Course, Enrollment, Student)
     def students(self, request, pk=None):
         course = self.get_object()
-        enrollments = course.enrollments.filter(status='active')
+        enrollments = with_enrollment_relations(course.enrollments.filter(status='active'))
         serializer = EnrollmentSerializer(enrollments, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    @conditional_get(Course, Enrollment, Student)
+    def roster(self, request, pk=None):
+        """Stream the course roster (active students by default, ``?status=`` to change)."""
+        export_format = get_export_format(request)
+        if export_format is None:
+            return Response({'error': 'export_format must be csv or ndjson'}, status=400)
+
+        course = self.get_object()
+        enrollments = Enrollment.objects.filter(course=course).order_by(
+            'student__last_name', 'student__first_name'
+        )
+        status_filter = request.query_params.get('status', 'active')
+        if status_filter != 'all':
+            enrollments = enrollments.filter(status=status_filter)
+        return export_response(
+            request, enrollments, ROSTER_EXPORT_COLUMNS, f'roster-{course.course_code}', export_format
+        )
+
+    @action(detail=True, methods=['post'])
+    def enroll(self, request, pk=None):
+        """Enroll many students at once; returns counts, not rows.
+
+        Body: ``{"students": [ids]}`` or ``{"student_filter": {"search": "..."}}``
+        (any student list filter), plus an optional ``status``.
+        """
+        serializer = BulkEnrollSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        course = self.get_object()
+        if 'students' in data:
+            students = Student.objects.filter(pk__in=data['students'])
+        else:
+            students = filter_like_list(StudentViewSet, request, data['student_filter'], 'student_filter')
+        result = bulk.enroll(course, students, data['status'])
+        if 'students' in data:
+            result['unknown'] = len(set(data['students'])) - result['matched']
+        return Response(result)
+
+    @action(detail=True, methods=['post'])
+    def copy_cohort(self, request, pk=None):
+        """Enroll this course's students (``source_status``, default active) in ``target_course``."""
+        serializer = CohortCopySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        course = self.get_object()
+        if data['target_course'].pk == course.pk:
+            return Response({'error': 'target_course must differ from the source course.'}, status=400)
+        return Response(bulk.copy_cohort(course, data['target_course'], data['source_status'], data['status']))
+
 
-class EnrollmentViewSet(viewsets.ModelViewSet):
+class EnrollmentViewSet(ConditionalGetMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Enrollment.objects.all()
     serializer_class = EnrollmentSerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['student', 'course', 'status']
     ordering_fields = ['enrolled_at']
     ordering = ['-enrolled_at']
+    pagination_class = CursorOrPageNumberPagination
+    cursor_ordering = ('-enrolled_at', '-id')
+    conditional_models = (Enrollment, Student, Course)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.get_serializer_class() is EnrollmentSerializer and self.action != 'destroy':
+            queryset = with_enrollment_relations(queryset)
+        return queryset
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return EnrollmentCreateSerializer
         return EnrollmentSerializer
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream every enrollment matching the list filters as CSV or NDJSON."""
+        export_format = get_export_format(request)
+        if export_format is None:
+            return Response({'error': 'export_format must be csv or ndjson'}, status=400)
+
+        queryset = self.filter_queryset(Enrollment.objects.all())
+        return export_response(request, queryset, ENROLLMENT_EXPORT_COLUMNS, 'enrollments', export_format)
+
+    @action(detail=False, methods=['post'])
+    def bulk_status(self, request):
+        """Set ``status`` on every enrollment matching ``filter`` (list filters); returns counts.
+
+        e.g. ``{"filter": {"course": 3, "status": "active"}, "status": "completed"}``.
+        """
+        serializer = BulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        enrollments = filter_like_list(EnrollmentViewSet, request, data['filter'])
+        return Response(bulk.set_status(enrollments, data['status']))
@@ -0,0 +1,191 @@
+"""Bulk grade import.
+
+Rows arrive as CSV or JSON and are processed in fixed-size chunks so memory
+stays flat regardless of upload size. Each chunk is validated column-wise
+with pandas, ``student_id`` / ``course_code`` are resolved with one query per
+chunk, and valid rows are written with ``bulk_create`` in one transaction per
+chunk. ``bulk_create`` bypasses model signals, so the affected grade
+statistics rows, student transcripts and analytics cache versions are
+refreshed once at the end, also when a chunk fails after earlier ones were
+committed.
+"""
+import numpy as np
+import pandas as pd
+from django.db import transaction
+
+from apps.analytics import grade_statistics, transcripts
+from apps.analytics.caching import bump_versions
+from apps.courses.models import Course
+from apps.students.models import Student
+from .models import Grade
+
+REQUIRED_COLUMNS = ['student_id', 'course_code', 'score', 'semester']
+OPTIONAL_COLUMNS = {'max_score': '100', 'grade_type': 'exam', 'comments': ''}
+CHUNK_SIZE = 5000
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+GRADE_TYPES = [choice for choice, _ in Grade.GRADE_TYPE_CHOICES]
+SEMESTER_MAX_LENGTH = Grade._meta.get_field('semester').max_length
+
+
+class ImportFormatError(ValueError):
+    """The upload cannot be read as grade rows at all."""
+
+
+def read_csv_chunks(file, chunk_size=CHUNK_SIZE):
+    try:
+        yield from pd.read_csv(
+            file, dtype=str, keep_default_na=False, encoding='utf-8-sig',
+            skipinitialspace=True, chunksize=chunk_size,
+        )
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as exc:
+        raise ImportFormatError(f'Could not parse CSV: {exc}') from exc
+
+
+def record_chunks(rows, chunk_size=CHUNK_SIZE):
+    if not all(isinstance(row, dict) for row in rows):
+        raise ImportFormatError('Each row must be a JSON object.')
+    for start in range(0, len(rows), chunk_size):
+        yield pd.DataFrame.from_records(rows[start:start + chunk_size])
+
+
+def _text(column):
+    return column.where(column.notna(), '').astype(str).str.strip()
+
+
+class GradeImporter:
+    """Validate and insert grade rows chunk by chunk; collects a per-row error report."""
+
+    def __init__(self, dry_run=False, progress=None):
+        self.dry_run = dry_run
+        # Called with the number of rows processed after each chunk.
+        self.progress = progress
+        self.total = 0
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        self.affected_keys = set()
+        self.affected_students = set()
+
+    def run(self, chunks):
+        """Import every chunk and return the report.
+
+        Chunks commit as they go, so when a later chunk raises
+        ``ImportFormatError`` the earlier rows stay and ``created`` counts them.
+        """
+        try:
+            for frame in chunks:
+                self.import_chunk(frame)
+                if self.progress is not None:
+                    self.progress(self.total)
+        finally:
+            self.refresh_derived()
+
+        return {
+            'total': self.total,
+            'valid': self.total - self.failed,
+            'created': self.created,
+            'failed': self.failed,
+            'dry_run': self.dry_run,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+    def refresh_derived(self):
+        """Update what the signals skipped by ``bulk_create`` would have."""
+        if self.affected_keys:
+            grade_statistics.rebuild(self.affected_keys)
+            transcripts.invalidate(self.affected_students)
+            bump_versions(Grade)
+            self.affected_keys, self.affected_students = set(), set()
+
+    def import_chunk(self, frame):
+        if frame.empty:
+            return
+        missing = [column for column in REQUIRED_COLUMNS if column not in frame.columns]
+        if missing:
+            raise ImportFormatError(f"Missing required column(s): {', '.join(missing)}")
+
+        # 1-based data row numbers, continuous across chunks.
+        frame.index = np.arange(self.total + 1, self.total + len(frame) + 1)
+        self.total += len(frame)
+
+        frame = self.prepare(frame)
+        invalid = self.validate(frame)
+        valid = frame[~invalid]
+
+        self.failed += int(invalid.sum())
+        if valid.empty or self.dry_run:
+            return
+
+        grades = [
+            Grade(
+                student_id=row.student_pk, course_id=row.course_pk, score=row.score,
+                max_score=row.max_score, grade_type=row.grade_type, semester=row.semester,
+                comments=row.comments,
+            )
+            for row in valid.itertuples(index=False)
+        ]
+        with transaction.atomic():
+            Grade.objects.bulk_create(grades, batch_size=BATCH_SIZE)
+        self.created += len(grades)
+
+        keys = valid[['course_pk', 'semester', 'grade_type']].drop_duplicates()
+        self.affected_keys.update(
+            (int(course_pk), semester, grade_type)
+            for course_pk, semester, grade_type in keys.itertuples(index=False)
+        )
+        self.affected_students.update(int(student_pk) for student_pk in valid['student_pk'].unique())
+
+    def prepare(self, frame):
+        for column, default in OPTIONAL_COLUMNS.items():
+            if column not in frame.columns:
+                frame[column] = default
+        for column in ['student_id', 'course_code', 'grade_type', 'semester', 'comments']:
+            frame[column] = _text(frame[column])
+        frame['grade_type'] = frame['grade_type'].replace('', OPTIONAL_COLUMNS['grade_type'])
+
+        frame['score'] = pd.to_numeric(frame['score'], errors='coerce')
+        max_score = frame['max_score'].where(_text(frame['max_score']) != '', OPTIONAL_COLUMNS['max_score'])
+        frame['max_score'] = pd.to_numeric(max_score, errors='coerce')
+
+        students = dict(
+            Student.objects.filter(student_id__in=frame['student_id'].unique().tolist())
+            .order_by().values_list('student_id', 'id')
+        )
+        courses = dict(
+            Course.objects.filter(course_code__in=frame['course_code'].unique().tolist())
+            .order_by().values_list('course_code', 'id')
+        )
+        frame['student_pk'] = frame['student_id'].map(students)
+        frame['course_pk'] = frame['course_code'].map(courses)
+        return frame
+
+    def validate(self, frame):
+        """Return a boolean mask of invalid rows and record their errors."""
+        checks = [
+            ('student_id', frame['student_pk'].isna(), 'Unknown student_id.'),
+            ('course_code', frame['course_pk'].isna(), 'Unknown course_code.'),
+            ('score', ~np.isfinite(frame['score']), 'A valid number is required.'),
+            ('max_score', ~np.isfinite(frame['max_score']), 'A valid number is required.'),
+            ('grade_type', ~frame['grade_type'].isin(GRADE_TYPES),
+             f"Must be one of: {', '.join(GRADE_TYPES)}."),
+            ('semester', frame['semester'] == '', 'This field is required.'),
+            ('semester', frame['semester'].str.len() > SEMESTER_MAX_LENGTH,
+             f'Ensure this field has no more than {SEMESTER_MAX_LENGTH} characters.'),
+        ]
+
+        invalid = pd.Series(False, index=frame.index)
+        for _, mask, _ in checks:
+            invalid |= mask
+
+        room = MAX_REPORTED_ERRORS - len(self.errors)
+        if room > 0 and invalid.any():
+            row_errors = {row: {} for row in frame.index[invalid][:room]}
+            for field, mask, message in checks:
+                for row in frame.index[mask]:
+                    if row in row_errors:
+                        row_errors[row].setdefault(field, message)
+            self.errors.extend({'row': int(row), 'errors': errors} for row, errors in row_errors.items())
+        return invalid
@@ -0,0 +1,28 @@
+"""Background tasks of the grades app (see ``apps.jobs``)."""
+import io
+
+from apps.jobs.tasks import PermanentFailure, register
+from .importer import GradeImporter, ImportFormatError, read_csv_chunks, record_chunks
+
+
+def check_import(payload):
+    if not isinstance(payload.get('rows', []), list):
+        raise ValueError('rows must be a list of grade records.')
+    if not isinstance(payload.get('dry_run', False), bool):
+        raise ValueError('dry_run must be true or false.')
+
+
+# Chunks commit as they go, so a retry would insert the earlier chunks twice.
+@register('grades.import', retryable=False, validate=check_import)
+def import_grades(job, rows=None, dry_run=False):
+    """Run a bulk grade import from the job's CSV ``input`` or JSON ``rows``."""
+    if rows is not None:
+        chunks, total = record_chunks(rows), len(rows)
+    else:
+        chunks, total = read_csv_chunks(io.BytesIO(bytes(job.input or b''))), None
+
+    importer = GradeImporter(dry_run=dry_run, progress=lambda done: job.set_progress(done, total, 'rows'))
+    try:
+        return importer.run(chunks)
+    except ImportFormatError as exc:
+        raise PermanentFailure(f'{exc} ({importer.created} grades were imported before the error)') from exc
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.grades import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        'Move closed semesters out of the grades_default partition into partitions '
+        'of their own (PostgreSQL), without blocking reads or writes of grades. The '
+        'semester being archived is read-only from the first step on.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('semesters', nargs='*', help='Semesters to archive (e.g. 2023-1 2023-2).')
+        parser.add_argument(
+            '--keep', type=int,
+            help='Archive every semester in grades_default except the KEEP most recent ones.',
+        )
+        parser.add_argument('--list', action='store_true', help='Show the partitions of grades and exit.')
+        parser.add_argument('--dry-run', action='store_true', help='Only print which semesters would be archived.')
+        parser.add_argument(
+            '--lock-timeout', type=int, default=2000,
+            help='Milliseconds the final swap waits for its locks before retrying (default: 2000).',
+        )
+        parser.add_argument('--retries', type=int, default=5, help='Retries of the swap after a lock timeout.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Partitioning grades needs PostgreSQL.')
+
+        try:
+            if options['list']:
+                self.stdout.write(f"{'partition':<32}{'rows (est.)':>12}  bound")
+                for name, bound, rows in partitions.partitions():
+                    self.stdout.write(f'{name:<32}{rows:>12}  {bound}')
+                return
+
+            semesters = list(options['semesters'])
+            if options['keep'] is not None:
+                hot = partitions.default_semesters()
+                semesters += hot[:max(len(hot) - options['keep'], 0)]
+            if not semesters:
+                raise CommandError('Name the semesters to archive or pass --keep.')
+
+            for semester in dict.fromkeys(semesters):
+                name = partitions.partition_name(semester)
+                if options['dry_run']:
+                    self.stdout.write(f'Would archive {semester} into {name}.')
+                    continue
+                rows = partitions.archive(semester, options['lock_timeout'], options['retries'])
+                if rows:
+                    self.stdout.write(self.style.SUCCESS(f'Archived {rows} grades of {semester} into {name}.'))
+                else:
+                    self.stdout.write(f'Nothing to archive for {semester}.')
+        except partitions.PartitionError as exc:
+            raise CommandError(str(exc))
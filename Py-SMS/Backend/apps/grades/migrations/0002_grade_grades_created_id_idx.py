@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('courses', '0002_enrollment_enrollments_enrolled_id_idx'),
+        ('grades', '0001_initial'),
+        ('students', '0002_student_students_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='grade',
+            index=models.Index(fields=['-created_at', '-id'], name='grades_created_id_idx'),
+        ),
+    ]
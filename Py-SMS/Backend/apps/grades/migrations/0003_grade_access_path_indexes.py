@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('courses', '0004_enrollment_enrollments_active_idx'),
+        ('grades', '0002_grade_grades_created_id_idx'),
+        ('students', '0003_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='grade',
+            index=models.Index(fields=['course', 'semester', 'grade_type', 'score'], name='grades_course_sem_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='grade',
+            index=models.Index(fields=['student', 'semester'], name='grades_student_sem_idx'),
+        ),
+    ]
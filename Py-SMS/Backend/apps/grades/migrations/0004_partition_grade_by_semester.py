@@ -0,0 +1,13 @@
+from django.db import migrations
+
+from apps.grades.partitions import PartitionByList
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('grades', '0003_grade_access_path_indexes'),
+    ]
+
+    operations = [
+        PartitionByList(model_name='grade', field='semester', default_partition='grades_default'),
+    ]
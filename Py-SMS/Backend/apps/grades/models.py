@@ -15,6 +15,15 @@ class Grade(models.Model):
         ('final', 'Final'),
     ]
 
+    # (letter, minimum percentage) in descending order; anything below is "F".
+    LETTER_GRADE_THRESHOLDS = [
+        ('A', 90),
+        ('B', 80),
+        ('C', 70),
+        ('D', 60),
+    ]
+    LETTER_GRADES = [letter for letter, _ in LETTER_GRADE_THRESHOLDS] + ['F']
+
     student = models.ForeignKey(
         Student,
         on_delete=models.CASCADE,
@@ -36,6 +45,12 @@ class Grade(models.Model):
     class Meta:
         db_table = 'grades'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='grades_created_id_idx'),
+            # Statistics keys and min/max refreshes; ``score`` makes the latter index-only.
+            models.Index(fields=['course', 'semester', 'grade_type', 'score'], name='grades_course_sem_type_idx'),
+            models.Index(fields=['student', 'semester'], name='grades_student_sem_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.full_name} - {self.course.name}: {self.score}/{self.max_score}"
@@ -51,13 +66,7 @@ class Grade(models.Model):
     def letter_grade(self):
         """Convert percentage to letter grade."""
         pct = self.percentage
-        if pct >= 90:
-            return "A"
-        elif pct >= 80:
-            return "B"
-        elif pct >= 70:
-            return "C"
-        elif pct >= 60:
-            return "D"
-        else:
-            return "F"
+        for letter, minimum in self.LETTER_GRADE_THRESHOLDS:
+            if pct >= minimum:
+                return letter
+        return "F"
@@ -0,0 +1,346 @@
+"""List partitioning of ``grades`` by semester on PostgreSQL.
+
+Migration ``0004`` turns ``grades`` into a table partitioned by ``LIST
+(semester)`` whose only partition, ``grades_default``, is the old table
+attached in place (no rows are copied). ``archive`` later moves a closed
+semester into a partition of its own, so queries with ``semester = ...``
+read one partition and current-semester queries no longer walk the archive.
+
+A partitioned table's unique constraints must contain the partition key, so
+the primary key becomes ``(id, semester)``; ids still come from one identity
+sequence and the model keeps ``id`` as its primary key. SQLite databases are
+left unpartitioned.
+"""
+import re
+import time
+
+from django.db import OperationalError, connection, migrations, transaction
+from django.db.backends.utils import truncate_name
+from django.db.migrations.exceptions import IrreversibleError
+
+from .models import Grade
+
+DEFAULT_PARTITION = 'grades_default'
+LOCK_NOT_AVAILABLE = '55P03'
+PENDING_COMMENT = 'grades archive copy, not attached yet'
+
+
+class PartitionError(Exception):
+    """A semester cannot be archived as requested."""
+
+
+def _fetch(cursor, sql, params=None):
+    cursor.execute(sql, params)
+    return cursor.fetchall()
+
+
+def _indexes(cursor, table):
+    """``[(name, definition, is_primary)]`` for the indexes of ``table``."""
+    return _fetch(cursor, '''
+        SELECT c.relname, pg_get_indexdef(c.oid), x.indisprimary
+        FROM pg_index x JOIN pg_class c ON c.oid = x.indexrelid
+        WHERE x.indrelid = %s::regclass ORDER BY c.relname
+    ''', [table])
+
+
+def _foreign_keys(cursor, table):
+    return _fetch(cursor, '''
+        SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype = 'f' ORDER BY conname
+    ''', [table])
+
+
+def _primary_key(cursor, table):
+    rows = _fetch(cursor, '''
+        SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'
+    ''', [table])
+    return rows[0][0] if rows else None
+
+
+def _next_id(cursor, table, column):
+    quote = connection.ops.quote_name
+    return _fetch(cursor, f'SELECT COALESCE(MAX({quote(column)}), 0) + 1 FROM {quote(table)}')[0][0]
+
+
+def _partitions(cursor, table):
+    return _fetch(cursor, '''
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::bigint
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass ORDER BY c.relname
+    ''', [table])
+
+
+def _is_partitioned(cursor, table):
+    return _fetch(cursor, 'SELECT relkind FROM pg_class WHERE oid = %s::regclass', [table])[0][0] == 'p'
+
+
+def _renamed(name, table, partition):
+    """``grades_created_id_idx`` -> ``grades_default_created_id_idx``."""
+    suffix = name[len(table):] if name.startswith(table) else f'_{name}'
+    return truncate_name(partition + suffix, connection.ops.max_name_length())
+
+
+def _literal(value):
+    # DDL (ATTACH ... FOR VALUES, CHECK) takes no bind parameters; this is
+    # safe with standard_conforming_strings, the default since PostgreSQL 9.1.
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class PartitionByList(migrations.operations.base.Operation):
+    """Turn a table into ``PARTITION BY LIST (field)`` on PostgreSQL only.
+
+    The existing table becomes the ``DEFAULT`` partition and keeps its rows,
+    indexes and foreign keys; the new parent gets the same definitions, which
+    ``ATTACH PARTITION`` matches instead of rebuilding. Only the primary key
+    index is rebuilt, to include ``field``. Model state is unchanged.
+    """
+
+    reduces_to_sql = False
+    reversible = True
+
+    def __init__(self, model_name, field, default_partition):
+        self.model_name = model_name
+        self.field = field
+        self.default_partition = default_partition
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        model = to_state.apps.get_model(app_label, self.model_name)
+        table, default = model._meta.db_table, self.default_partition
+        pk, key = model._meta.pk.column, model._meta.get_field(self.field).column
+        quote = schema_editor.quote_name
+        with schema_editor.connection.cursor() as cursor:
+            indexes = [(name, definition) for name, definition, primary in _indexes(cursor, table) if not primary]
+            foreign_keys = _foreign_keys(cursor, table)
+            primary_key = _primary_key(cursor, table)
+            next_id = _next_id(cursor, table, pk)
+
+        schema_editor.execute(f'ALTER TABLE {quote(table)} RENAME TO {quote(default)}')
+        # Free the names for the parent's copies.
+        for name, _ in indexes:
+            schema_editor.execute(f'ALTER INDEX {quote(name)} RENAME TO {quote(_renamed(name, table, default))}')
+        schema_editor.execute(f'ALTER TABLE {quote(default)} DROP CONSTRAINT {quote(primary_key)}')
+        schema_editor.execute(f'ALTER TABLE {quote(default)} ALTER COLUMN {quote(pk)} DROP IDENTITY IF EXISTS')
+        schema_editor.execute(f'ALTER TABLE {quote(default)} ALTER COLUMN {quote(pk)} DROP DEFAULT')
+
+        schema_editor.execute(
+            f'CREATE TABLE {quote(table)} (LIKE {quote(default)} INCLUDING DEFAULTS INCLUDING STORAGE) '
+            f'PARTITION BY LIST ({quote(key)})'
+        )
+        schema_editor.execute(
+            f'ALTER TABLE {quote(table)} ALTER COLUMN {quote(pk)} '
+            f'ADD GENERATED BY DEFAULT AS IDENTITY (START WITH {int(next_id)})'
+        )
+        schema_editor.execute(
+            f'ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(primary_key)} PRIMARY KEY ({quote(pk)}, {quote(key)})'
+        )
+        for _, definition in indexes:
+            schema_editor.execute(definition)
+        for name, definition in foreign_keys:
+            schema_editor.execute(f'ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}')
+        schema_editor.execute(f'ALTER TABLE {quote(table)} ATTACH PARTITION {quote(default)} DEFAULT')
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        model = from_state.apps.get_model(app_label, self.model_name)
+        table, default, pk = model._meta.db_table, self.default_partition, model._meta.pk.column
+        quote = schema_editor.quote_name
+        with schema_editor.connection.cursor() as cursor:
+            archived = [name for name, _, _ in _partitions(cursor, table) if name != default]
+            if archived:
+                raise IrreversibleError(
+                    f"Move the rows of {', '.join(archived)} back into {default} before unpartitioning {table}."
+                )
+            index_names = _fetch(cursor, '''
+                SELECT parent.relname, child.relname
+                FROM pg_index x
+                JOIN pg_class child ON child.oid = x.indexrelid
+                JOIN pg_inherits i ON i.inhrelid = child.oid
+                JOIN pg_class parent ON parent.oid = i.inhparent
+                WHERE x.indrelid = %s::regclass AND NOT x.indisprimary
+            ''', [default])
+            primary_key = _primary_key(cursor, table)
+            default_primary_key = _primary_key(cursor, default)
+            next_id = _next_id(cursor, table, pk)
+
+        # Detached, the partition keeps its indexes and foreign keys.
+        schema_editor.execute(f'ALTER TABLE {quote(table)} DETACH PARTITION {quote(default)}')
+        schema_editor.execute(f'DROP TABLE {quote(table)}')
+        schema_editor.execute(f'ALTER TABLE {quote(default)} RENAME TO {quote(table)}')
+        for parent_name, child_name in index_names:
+            schema_editor.execute(f'ALTER INDEX {quote(child_name)} RENAME TO {quote(parent_name)}')
+        schema_editor.execute(f'ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(default_primary_key)}')
+        schema_editor.execute(f'ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(primary_key)} PRIMARY KEY ({quote(pk)})')
+        schema_editor.execute(
+            f'ALTER TABLE {quote(table)} ALTER COLUMN {quote(pk)} '
+            f'ADD GENERATED BY DEFAULT AS IDENTITY (START WITH {int(next_id)})'
+        )
+
+    def describe(self):
+        return f'Partition {self.model_name} by list of {self.field}'
+
+    @property
+    def migration_name_fragment(self):
+        return f'partition_{self.model_name}_by_{self.field}'
+
+    def deconstruct(self):
+        return self.__class__.__name__, [], {
+            'model_name': self.model_name, 'field': self.field, 'default_partition': self.default_partition,
+        }
+
+
+def partition_name(semester):
+    slug = re.sub(r'[^0-9a-z]+', '_', semester.lower()).strip('_') or 'blank'
+    return truncate_name(f'{Grade._meta.db_table}_{slug}', connection.ops.max_name_length())
+
+
+def partitions():
+    """``[(partition, bound, estimated rows)]`` of ``grades``."""
+    with connection.cursor() as cursor:
+        if not _is_partitioned(cursor, Grade._meta.db_table):
+            raise PartitionError('grades is not partitioned; run `manage.py migrate grades`.')
+        return _partitions(cursor, Grade._meta.db_table)
+
+
+def default_semesters():
+    """Semesters still stored in the default (hot) partition, oldest first."""
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        rows = _fetch(cursor, f'SELECT DISTINCT semester FROM {quote(DEFAULT_PARTITION)} ORDER BY semester')
+    return [semester for semester, in rows]
+
+
+def _pending(cursor, name):
+    """Whether ``name`` is a copy an interrupted ``archive`` left unattached."""
+    return _fetch(
+        cursor, "SELECT obj_description(to_regclass(%s), 'pg_class')", [name]
+    )[0][0] == PENDING_COMMENT
+
+
+def _exists(cursor, name):
+    return _fetch(cursor, 'SELECT to_regclass(%s) IS NOT NULL', [name])[0][0]
+
+
+def _constraint(name, suffix):
+    return truncate_name(f'{name}_{suffix}', connection.ops.max_name_length())
+
+
+def _with_lock_timeout(func, lock_timeout, retries):
+    """Run ``func(cursor)`` in a transaction that waits at most ``lock_timeout`` ms per lock."""
+    for attempt in range(retries + 1):
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(f'SET LOCAL lock_timeout = {int(lock_timeout)}')
+                return func(cursor)
+        except OperationalError as exc:
+            if getattr(exc.__cause__, 'pgcode', None) != LOCK_NOT_AVAILABLE or attempt == retries:
+                raise
+            time.sleep(0.5 * 2 ** attempt)
+
+
+def archive(semester, lock_timeout=2000, retries=5):
+    """Move ``semester`` out of the default partition into its own partition.
+
+    A ``NOT VALID`` check constraint first closes the semester in the default
+    partition: existing rows stay readable and deletable, but no row of the
+    semester can be inserted or updated there. The rows are then copied and
+    indexed in a detached table while ``grades`` stays fully usable. A last
+    transaction deletes them from the default partition, validates the
+    constraint (a scan under ``SHARE UPDATE EXCLUSIVE``, which does not block
+    reads or writes), and attaches the copy; with the validated constraint
+    PostgreSQL skips its own scan of the default partition under ``ACCESS
+    EXCLUSIVE``, so that lock is held only for catalog updates. Every lock is
+    waited for at most ``lock_timeout`` ms (retrying ``retries`` times) so
+    other queries never queue behind it. Fails if rows of the semester were
+    deleted in between. Returns the number of rows moved.
+    """
+    table, quote = Grade._meta.db_table, connection.ops.quote_name
+    name = partition_name(semester)
+    closed, check, pkey = (_constraint(name, suffix) for suffix in ('closed', 'bound', 'pkey'))
+    bounds = {partition: bound for partition, bound, _ in partitions()}
+    if name in bounds:
+        if bounds[name] == f'FOR VALUES IN ({_literal(semester)})':
+            return 0
+        raise PartitionError(f'{name} already holds {bounds[name]}; cannot archive {semester!r} into it.')
+
+    def close(cursor):
+        # Left behind by an interrupted archive of the same semester.
+        cursor.execute(f'ALTER TABLE {quote(DEFAULT_PARTITION)} DROP CONSTRAINT IF EXISTS {quote(closed)}')
+        cursor.execute(
+            f'ALTER TABLE {quote(DEFAULT_PARTITION)} ADD CONSTRAINT {quote(closed)} '
+            f'CHECK (semester <> {_literal(semester)}) NOT VALID'
+        )
+
+    def reopen(cursor):
+        cursor.execute(f'ALTER TABLE {quote(DEFAULT_PARTITION)} DROP CONSTRAINT IF EXISTS {quote(closed)}')
+
+    with connection.cursor() as cursor:
+        if _exists(cursor, name):
+            if not _pending(cursor, name):
+                raise PartitionError(f'Table {name} already exists; cannot archive {semester!r} into it.')
+            cursor.execute(f'DROP TABLE {quote(name)}')
+    _with_lock_timeout(close, lock_timeout, retries)
+
+    with connection.cursor() as cursor:
+        with transaction.atomic():
+            cursor.execute(f'CREATE TABLE {quote(name)} (LIKE {quote(table)} INCLUDING DEFAULTS INCLUDING STORAGE)')
+            cursor.execute(f'COMMENT ON TABLE {quote(name)} IS {_literal(PENDING_COMMENT)}')
+        cursor.execute(
+            f'INSERT INTO {quote(name)} SELECT * FROM {quote(DEFAULT_PARTITION)} WHERE semester = %s', [semester]
+        )
+        snapshot = _fetch(cursor, f'SELECT COUNT(*), MAX(updated_at) FROM {quote(name)}')[0]
+        if not snapshot[0]:
+            cursor.execute(f'DROP TABLE {quote(name)}')
+            _with_lock_timeout(reopen, lock_timeout, retries)
+            return 0
+
+        # Let ATTACH adopt these instead of building them under its locks.
+        cursor.execute(
+            f'ALTER TABLE {quote(name)} ADD CONSTRAINT {quote(check)} CHECK (semester = {_literal(semester)})'
+        )
+        cursor.execute(
+            f'ALTER TABLE {quote(name)} ADD CONSTRAINT {quote(pkey)} '
+            f'PRIMARY KEY ({quote(Grade._meta.pk.column)}, semester)'
+        )
+        for index_name, definition, primary in _indexes(cursor, table):
+            if not primary:
+                cursor.execute(re.sub(
+                    r'^CREATE (UNIQUE )?INDEX \S+ ON (ONLY )?\S+ ',
+                    lambda match: f'CREATE {match.group(1) or ""}INDEX '
+                                  f'{quote(_renamed(index_name, table, name))} ON {quote(name)} ',
+                    definition,
+                ))
+        for constraint, definition in _foreign_keys(cursor, table):
+            cursor.execute(f'ALTER TABLE {quote(name)} ADD CONSTRAINT {quote(constraint)} {definition}')
+
+    def swap(cursor):
+        deleted = _fetch(cursor, f'''
+            WITH moved AS (
+                DELETE FROM {quote(DEFAULT_PARTITION)} WHERE semester = %s RETURNING updated_at
+            )
+            SELECT COUNT(*), MAX(updated_at) FROM moved
+        ''', [semester])[0]
+        if deleted != snapshot:
+            raise PartitionError(f'{semester!r} changed while it was being archived; is it closed?')
+        cursor.execute(f'ALTER TABLE {quote(DEFAULT_PARTITION)} VALIDATE CONSTRAINT {quote(closed)}')
+        cursor.execute(
+            f'ALTER TABLE {quote(table)} ATTACH PARTITION {quote(name)} FOR VALUES IN ({_literal(semester)})'
+        )
+        # The partition bound now keeps the semester out of the default partition.
+        cursor.execute(f'ALTER TABLE {quote(DEFAULT_PARTITION)} DROP CONSTRAINT {quote(closed)}')
+        cursor.execute(f'COMMENT ON TABLE {quote(name)} IS NULL')
+
+    try:
+        _with_lock_timeout(swap, lock_timeout, retries)
+    except PartitionError:
+        _with_lock_timeout(reopen, lock_timeout, retries)
+        raise
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'ANALYZE {quote(name)}')
+    return snapshot[0]
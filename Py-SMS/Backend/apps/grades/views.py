@@ -1,20 +1,87 @@
 from rest_framework import viewsets, filters
 from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Avg
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from apps.analytics.caching import cached_response
+from apps.analytics.distribution import letter_grade_expression, percentage_expression
+from apps.analytics.grade_statistics import statistics_queryset, stored_summary
+from apps.core.conditional import ConditionalGetMixin, conditional_get
+from apps.core.export import export_response, get_export_format
+from apps.core.pagination import CursorOrPageNumberPagination
+from apps.core.search import TrigramSearchFilter
+from apps.core.sparse import ValuesListMixin
+from apps.courses.models import Course
+from apps.jobs.tasks import enqueue
+from apps.jobs.views import accepted
+from apps.students.models import Student, full_name_expression
+from .importer import GradeImporter, ImportFormatError, read_csv_chunks, record_chunks
 from .models import Grade
 from .serializers import GradeSerializer, GradeCreateSerializer, GradeListSerializer
 
+# Columns GradeListSerializer reads, plus the cursor pagination key.
+GRADE_LIST_FIELDS = [
+    'id', 'score', 'max_score', 'grade_type', 'semester', 'created_at', 'student', 'course',
+    'student__first_name', 'student__last_name', 'course__name',
+]
+GRADE_EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('student_id', 'student__student_id'),
+    ('student_name', full_name_expression('student__')),
+    ('course_code', 'course__course_code'),
+    ('course_name', 'course__name'),
+    ('score', 'score'),
+    ('max_score', 'max_score'),
+    ('percentage', Coalesce(percentage_expression(), Value(0.0))),
+    ('letter_grade', letter_grade_expression()),
+    ('grade_type', 'grade_type'),
+    ('semester', 'semester'),
+    ('comments', 'comments'),
+    ('created_at', 'created_at'),
+]
+# Related columns GradeSerializer reads through its nested list serializers.
+GRADE_DETAIL_RELATED_FIELDS = [
+    'student__student_id', 'student__first_name', 'student__last_name', 'student__email',
+    'course__course_code', 'course__name', 'course__credits', 'course__instructor',
+]
 
-class GradeViewSet(viewsets.ModelViewSet):
+
+class GradeViewSet(ConditionalGetMixin, ValuesListMixin, viewsets.ModelViewSet):
     queryset = Grade.objects.all()
     serializer_class = GradeSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, TrigramSearchFilter, filters.OrderingFilter]
     filterset_fields = ['student', 'course', 'grade_type', 'semester']
     search_fields = ['student__first_name', 'student__last_name', 'course__name']
     ordering_fields = ['created_at', 'score', 'semester']
     ordering = ['-created_at']
+    pagination_class = CursorOrPageNumberPagination
+    cursor_ordering = ('-created_at', '-id')
+    conditional_models = (Grade, Student, Course)
+    # Same output as GradeListSerializer.
+    list_values = {
+        'id': 'id',
+        'student_name': full_name_expression('student__'),
+        'course_name': 'course__name',
+        'score': 'score',
+        'max_score': 'max_score',
+        'percentage': Coalesce(percentage_expression(), Value(0.0)),
+        'letter_grade': letter_grade_expression(),
+        'grade_type': 'grade_type',
+        'semester': 'semester',
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ['list', 'by_student', 'by_course']:
+            return queryset.select_related('student', 'course').only(*GRADE_LIST_FIELDS)
+        if self.action == 'retrieve':
+            grade_fields = [field.attname for field in Grade._meta.concrete_fields]
+            return queryset.select_related('student', 'course').only(
+                *grade_fields, *GRADE_DETAIL_RELATED_FIELDS
+            )
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -24,42 +91,84 @@ class GradeViewSet(viewsets.ModelViewSet):
         return GradeSerializer
 
     @action(detail=False, methods=['get'])
+    @conditional_get(Grade, Student, Course)
     def by_student(self, request):
         student_id = request.query_params.get('student_id')
         if not student_id:
             return Response({'error': 'student_id is required'}, status=400)
 
-        grades = self.queryset.filter(student_id=student_id)
+        grades = self.get_queryset().filter(student_id=student_id)
         serializer = GradeListSerializer(grades, many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
+    @conditional_get(Grade, Student, Course)
     def by_course(self, request):
         course_id = request.query_params.get('course_id')
         if not course_id:
             return Response({'error': 'course_id is required'}, status=400)
 
-        grades = self.queryset.filter(course_id=course_id)
+        grades = self.get_queryset().filter(course_id=course_id)
         serializer = GradeListSerializer(grades, many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
+    @conditional_get(Grade)
+    @cached_response(Grade)
     def statistics(self, request):
         course_id = request.query_params.get('course_id')
         semester = request.query_params.get('semester')
 
-        queryset = self.queryset
-        if course_id:
-            queryset = queryset.filter(course_id=course_id)
-        if semester:
-            queryset = queryset.filter(semester=semester)
-
-        stats = queryset.aggregate(
-            average_score=Avg('score'),
-            average_percentage=Avg('score') * 100 / Avg('max_score') if queryset.exists() else 0
-        )
+        stats = stored_summary(statistics_queryset(course_id, semester))
 
         return Response({
-            'total_grades': queryset.count(),
-            'average_score': stats['average_score'] or 0,
+            'total_grades': stats['count'],
+            'average_score': stats['average_score'],
+            'average_percentage': stats['average_percentage'],
         })
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream every grade matching the list filters as CSV or NDJSON."""
+        export_format = get_export_format(request)
+        if export_format is None:
+            return Response({'error': 'export_format must be csv or ndjson'}, status=400)
+
+        queryset = self.filter_queryset(Grade.objects.all())
+        return export_response(request, queryset, GRADE_EXPORT_COLUMNS, 'grades', export_format)
+
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, MultiPartParser])
+    def bulk_import(self, request):
+        """Import many grades from a CSV ``file`` upload or a JSON list of rows.
+
+        Columns: student_id, course_code, score, semester and optionally
+        max_score, grade_type, comments. ``?dry_run=true`` only validates.
+        ``?background=true`` queues the import as a job and answers ``202``
+        with it; the report becomes the job's ``result``.
+        """
+        dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true')
+        background = request.query_params.get('background', '').lower() in ('1', 'true')
+        upload = request.FILES.get('file')
+
+        if upload is not None:
+            if background:
+                return accepted(enqueue('grades.import', {'dry_run': dry_run}, request.user, input=upload.read()))
+            chunks = read_csv_chunks(upload)
+        else:
+            rows = request.data.get('rows') if isinstance(request.data, dict) else request.data
+            if not isinstance(rows, list):
+                return Response(
+                    {'error': 'Send a CSV file as "file" or a JSON list of rows.'}, status=400
+                )
+            if background:
+                return accepted(enqueue('grades.import', {'rows': rows, 'dry_run': dry_run}, request.user))
+            chunks = record_chunks(rows)
+
+        importer = GradeImporter(dry_run=dry_run)
+        try:
+            report = importer.run(chunks)
+        except ImportFormatError as exc:
+            # Chunks before the failing one are already committed.
+            return Response({'error': str(exc), 'created': importer.created}, status=400)
+
+        return Response(report, status=201 if report['created'] else 200)
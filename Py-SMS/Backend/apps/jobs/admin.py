@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'status', 'progress_current', 'progress_total', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status', 'name']
+    raw_id_fields = ['created_by']
+    exclude = ['input']
+    ordering = ['-created_at']
@@ -0,0 +1,75 @@
+import multiprocessing
+import signal
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.jobs import worker
+
+_stopping = False
+
+
+def _request_stop(signum, frame):
+    global _stopping
+    _stopping = True
+
+
+def _work(index, burst, processed=None):
+    # SIGINT/SIGTERM let the current job finish, then the worker exits.
+    signal.signal(signal.SIGINT, _request_stop)
+    signal.signal(signal.SIGTERM, _request_stop)
+    count = worker.work(f'{worker.worker_name()}/{index}', burst=burst, should_stop=lambda: _stopping)
+    if processed is not None:
+        with processed.get_lock():
+            processed.value += count
+    return count
+
+
+def _work_in_process(index, burst, processed):
+    django.setup()
+    _work(index, burst, processed)
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (imports, analytics rebuilds, transcript recomputes).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=1,
+            help='Worker processes, each running one job at a time (default: 1).',
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Exit once no job is ready instead of polling for new ones.',
+        )
+
+    def handle(self, *args, **options):
+        processes, burst = options['processes'], options['burst']
+        if processes <= 1:
+            processed = _work(0, burst)
+        else:
+            processed = self.run_pool(processes, burst)
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} job(s).'))
+
+    def run_pool(self, processes, burst):
+        # Forked workers must open their own connections, not share the parent's.
+        connections.close_all()
+        processed = multiprocessing.Value('i', 0)
+        workers = [
+            multiprocessing.Process(target=_work_in_process, args=(index, burst, processed))
+            for index in range(processes)
+        ]
+        for process in workers:
+            process.start()
+
+        def forward(signum, frame):
+            for process in workers:
+                if process.is_alive():
+                    process.terminate()
+
+        signal.signal(signal.SIGINT, forward)
+        signal.signal(signal.SIGTERM, forward)
+        for process in workers:
+            process.join()
+        return processed.value
@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """A unit of background work, run by ``manage.py run_jobs``.
+
+    ``name`` selects the task registered in ``jobs.tasks``; ``payload`` holds
+    its keyword arguments and ``input`` an optional uploaded file.
+    """
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+        (CANCELLED, 'Cancelled'),
+    ]
+    FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    input = models.BinaryField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    progress_current = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(null=True, blank=True)
+    progress_message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    worker = models.CharField(max_length=100, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'jobs'
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Workers claim the oldest due job and count running jobs per name.
+            models.Index(fields=['status', 'run_after'], name='jobs_status_run_after_idx'),
+            models.Index(fields=['name', 'status'], name='jobs_name_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+    @property
+    def percent(self):
+        if not self.progress_total:
+            return 100.0 if self.status == self.SUCCEEDED else None
+        return round(min(self.progress_current / self.progress_total, 1.0) * 100, 1)
+
+    def set_progress(self, current, total=None, message=''):
+        """Record progress from inside a running task; also serves as the heartbeat."""
+        self.progress_current = current
+        if total is not None:
+            self.progress_total = total
+        self.progress_message = message[:255]
+        self.heartbeat_at = timezone.now()
+        Job.objects.filter(pk=self.pk).update(
+            progress_current=self.progress_current, progress_total=self.progress_total,
+            progress_message=self.progress_message, heartbeat_at=self.heartbeat_at,
+        )
@@ -0,0 +1,42 @@
+from rest_framework import serializers
+
+from .models import Job
+from .tasks import TASKS, InvalidPayload
+
+
+class JobSerializer(serializers.ModelSerializer):
+    percent = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Job
+        fields = ['id', 'name', 'payload', 'status', 'progress_current', 'progress_total',
+                  'progress_message', 'percent', 'result', 'error', 'attempts', 'max_attempts',
+                  'run_after', 'created_by', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
+
+
+class JobProgressSerializer(serializers.ModelSerializer):
+    percent = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Job
+        fields = ['id', 'status', 'progress_current', 'progress_total', 'progress_message',
+                  'percent', 'attempts', 'finished_at']
+        read_only_fields = fields
+
+
+class JobCreateSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=100)
+    payload = serializers.DictField(required=False, default=dict)
+
+    def validate_name(self, value):
+        if value not in TASKS:
+            raise serializers.ValidationError(f"Unknown task. Available: {', '.join(sorted(TASKS))}.")
+        return value
+
+    def validate(self, attrs):
+        try:
+            TASKS[attrs['name']].validate(attrs['payload'])
+        except InvalidPayload as exc:
+            raise serializers.ValidationError({'payload': str(exc)})
+        return attrs
@@ -0,0 +1,102 @@
+"""Task registry and ``enqueue``.
+
+Apps register background tasks in a ``jobs`` module (discovered by
+``JobsConfig.ready``)::
+
+    @register('analytics.rebuild_grade_statistics', concurrency=1)
+    def rebuild_grade_statistics(job):
+        ...
+
+A task is called with the running ``Job`` and the job's ``payload`` as
+keyword arguments; it may call ``job.set_progress`` and returns a
+JSON-serializable result. ``concurrency`` caps how many jobs of that name run
+at once across all workers (``None``: no cap). ``retryable=False`` marks a
+task whose partial work a second run would repeat (it commits as it goes):
+it gets a single attempt and a failed job cannot be retried.
+
+``enqueue`` checks the payload before saving the job: keys must be keyword
+parameters of the task function, and ``validate(payload)``, if given, may
+raise ``ValueError`` for values out of range. A bad payload fails the
+request instead of a job that would be retried with the same arguments.
+"""
+import inspect
+
+from django.conf import settings
+
+from .models import Job
+
+TASKS = {}
+
+
+class PermanentFailure(Exception):
+    """Raised by a task to fail its job without further retries."""
+
+
+class InvalidPayload(ValueError):
+    """Raised by ``enqueue`` for a payload the task does not accept."""
+
+
+def _config():
+    return {
+        'POLL_INTERVAL': 1.0,
+        'STALE_TIMEOUT': 600,
+        'RETRY_DELAY': 30,
+        'MAX_ATTEMPTS': 3,
+        **getattr(settings, 'JOBS', {}),
+    }
+
+
+class Task:
+    def __init__(self, name, func, concurrency=None, max_attempts=None, validate=None, retryable=True):
+        self.name = name
+        self.func = func
+        self.concurrency = concurrency
+        self.retryable = retryable
+        self.max_attempts = max_attempts if retryable else 1
+        self.validator = validate
+        # Every parameter after ``job`` that may be passed by keyword.
+        self.arguments = [
+            parameter.name for parameter in list(inspect.signature(func).parameters.values())[1:]
+            if parameter.kind in (parameter.POSITIONAL_OR_KEYWORD, parameter.KEYWORD_ONLY)
+        ]
+
+    def __call__(self, job):
+        return self.func(job, **job.payload)
+
+    def validate(self, payload):
+        """Raise ``InvalidPayload`` unless ``payload`` is a valid set of arguments."""
+        unknown = sorted(set(payload) - set(self.arguments))
+        if unknown:
+            allowed = ', '.join(self.arguments) or 'none'
+            raise InvalidPayload(f"Unknown arguments for {self.name}: {', '.join(unknown)} (allowed: {allowed}).")
+        if self.validator is not None:
+            try:
+                self.validator(payload)
+            except ValueError as exc:
+                raise InvalidPayload(str(exc)) from exc
+
+
+def register(name, concurrency=None, max_attempts=None, validate=None, retryable=True):
+    """Register the decorated function as the task ``name``."""
+    def decorator(func):
+        if name in TASKS:
+            raise ValueError(f'Task {name!r} is already registered.')
+        TASKS[name] = Task(name, func, concurrency, max_attempts, validate, retryable)
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, user=None, input=None, max_attempts=None):
+    """Queue task ``name``; returns the saved ``Job``."""
+    if name not in TASKS:
+        raise KeyError(f'Unknown task {name!r}.')
+    task = TASKS[name]
+    payload = payload or {}
+    task.validate(payload)
+    return Job.objects.create(
+        name=name,
+        payload=payload,
+        input=input,
+        max_attempts=1 if not task.retryable else max_attempts or task.max_attempts or _config()['MAX_ATTEMPTS'],
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
@@ -0,0 +1,90 @@
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+
+from .models import Job
+from .serializers import JobCreateSerializer, JobProgressSerializer, JobSerializer
+from .tasks import TASKS, enqueue
+
+PROGRESS_FIELDS = ['id', 'status', 'progress_current', 'progress_total', 'progress_message',
+                   'attempts', 'finished_at']
+
+
+def accepted(job):
+    """``202 Accepted`` pointing at the job that will do the work."""
+    return Response(
+        JobSerializer(job).data, status=status.HTTP_202_ACCEPTED,
+        headers={'Location': f'/api/v1/jobs/{job.pk}/'},
+    )
+
+
+class JobViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """Background jobs: queue, inspect, cancel and retry.
+
+    Users see the jobs they queued; superusers see every job. Only staff may
+    queue a task directly; other jobs come from the endpoints that start them.
+    """
+
+    queryset = Job.objects.defer('input')
+    serializer_class = JobSerializer
+    filterset_fields = ['name', 'status']
+
+    def get_permissions(self):
+        if self.action == 'create':
+            return [IsAdminUser()]
+        return [IsAuthenticated()]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'progress':
+            queryset = queryset.only(*PROGRESS_FIELDS)
+        if not self.request.user.is_superuser:
+            queryset = queryset.filter(created_by=self.request.user)
+        return queryset
+
+    def create(self, request):
+        """Queue a registered task: ``{"name": "...", "payload": {...}}``."""
+        serializer = JobCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = enqueue(serializer.validated_data['name'], serializer.validated_data['payload'], request.user)
+        return accepted(job)
+
+    @action(detail=True, methods=['get'])
+    def progress(self, request, pk=None):
+        """Status and progress only, for polling."""
+        return Response(JobProgressSerializer(self.get_object()).data)
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """Cancel a job that has not started yet."""
+        job = self.get_object()
+        if not Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(status=Job.CANCELLED):
+            return Response({'error': f'Only queued jobs can be cancelled; this one is {job.status}.'}, status=409)
+        job.refresh_from_db()
+        return Response(JobSerializer(job).data)
+
+    @action(detail=True, methods=['post'])
+    def retry(self, request, pk=None):
+        """Queue a failed or cancelled job again with a fresh set of attempts.
+
+        Failed jobs of non-retryable tasks are refused: their partial work is
+        committed, and a second run would repeat it.
+        """
+        job = self.get_object()
+        task = TASKS.get(job.name)
+        retryable = [Job.CANCELLED] if task is not None and not task.retryable else [Job.FAILED, Job.CANCELLED]
+        if job.status == Job.FAILED and Job.FAILED not in retryable:
+            return Response(
+                {'error': f'{job.name} jobs are not retryable; their partial work would be repeated. '
+                          'Queue a new job for the remaining input instead.'},
+                status=409,
+            )
+        retried = Job.objects.filter(pk=job.pk, status__in=retryable).update(
+            status=Job.QUEUED, attempts=0, error='', result=None, finished_at=None, worker='',
+            progress_current=0, progress_message='',
+        )
+        if not retried:
+            return Response({'error': f'Only failed or cancelled jobs can be retried; this one is {job.status}.'}, status=409)
+        job.refresh_from_db()
+        return accepted(job)
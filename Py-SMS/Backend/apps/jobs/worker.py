@@ -0,0 +1,159 @@
+"""Claiming and running jobs.
+
+A worker repeatedly claims the oldest due ``queued`` job whose task is under
+its concurrency cap, runs it and records the outcome. Claims are a
+conditional ``UPDATE ... WHERE status = 'queued'``, so two workers never run
+the same job; on PostgreSQL an advisory lock per task name makes the
+concurrency cap exact. A failing job is queued again after
+``RETRY_DELAY * 2 ** (attempt - 1)`` seconds until ``max_attempts`` is
+reached. Running jobs whose heartbeat (``Job.set_progress`` or the claim)
+is older than ``STALE_TIMEOUT`` belong to a dead worker and are treated as a
+failed attempt; workers send a heartbeat every quarter of that while a
+task runs.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+import zlib
+from datetime import timedelta
+
+from django.db import DatabaseError, close_old_connections, connection, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+from .tasks import TASKS, PermanentFailure, _config
+
+logger = logging.getLogger(__name__)
+
+# Due jobs looked at per claim; jobs of a task at its cap are skipped.
+CLAIM_SCAN = 20
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _lock_task(name):
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [zlib.crc32(name.encode())])
+
+
+def _retry_or_fail(job, error, now):
+    if job.attempts < job.max_attempts:
+        delay = _config()['RETRY_DELAY'] * 2 ** max(job.attempts - 1, 0)
+        return {'status': Job.QUEUED, 'run_after': now + timedelta(seconds=delay), 'error': error, 'worker': ''}
+    return {'status': Job.FAILED, 'finished_at': now, 'error': error}
+
+
+def requeue_stale():
+    """Retry or fail running jobs whose worker stopped sending heartbeats."""
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=_config()['STALE_TIMEOUT'])
+    stale = Job.objects.filter(status=Job.RUNNING, heartbeat_at__lt=cutoff).only('pk', 'attempts', 'max_attempts')
+    for job in stale:
+        Job.objects.filter(pk=job.pk, status=Job.RUNNING).update(
+            **_retry_or_fail(job, 'Worker stopped responding.', now)
+        )
+
+
+def claim(worker):
+    """Mark the next runnable job as running for ``worker`` and return it, or ``None``."""
+    now = timezone.now()
+    candidates = (
+        Job.objects.filter(status=Job.QUEUED, run_after__lte=now)
+        .order_by('run_after', 'id').values_list('pk', 'name')[:CLAIM_SCAN]
+    )
+    for pk, name in candidates:
+        task = TASKS.get(name)
+        with transaction.atomic():
+            _lock_task(name)
+            if task is not None and task.concurrency is not None:
+                running = Job.objects.filter(name=name, status=Job.RUNNING).count()
+                if running >= task.concurrency:
+                    continue
+            claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+                status=Job.RUNNING, worker=worker, started_at=now, heartbeat_at=now,
+                attempts=F('attempts') + 1,
+            )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+class Heartbeat(threading.Thread):
+    """Refresh ``job.heartbeat_at`` until stopped, so long tasks never look stale."""
+
+    def __init__(self, job):
+        super().__init__(daemon=True)
+        self.job_id = job.pk
+        self.interval = _config()['STALE_TIMEOUT'] / 4
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                try:
+                    Job.objects.filter(pk=self.job_id, status=Job.RUNNING).update(heartbeat_at=timezone.now())
+                except DatabaseError:
+                    logger.exception('Heartbeat for job %s failed', self.job_id)
+        finally:
+            connections.close_all()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_job(job):
+    """Run a claimed job and store its result or error."""
+    task = TASKS.get(job.name)
+    heartbeat = Heartbeat(job)
+    heartbeat.start()
+    try:
+        if task is None:
+            raise PermanentFailure(f'No task registered as {job.name!r}.')
+        result = task(job)
+    except PermanentFailure as exc:
+        outcome = {'status': Job.FAILED, 'finished_at': timezone.now(), 'error': str(exc)}
+    except Exception:
+        logger.exception('Job %s (%s) failed', job.pk, job.name)
+        outcome = _retry_or_fail(job, traceback.format_exc(limit=20), timezone.now())
+    else:
+        outcome = {'status': Job.SUCCEEDED, 'finished_at': timezone.now(), 'result': result, 'error': ''}
+    finally:
+        heartbeat.stop()
+    Job.objects.filter(pk=job.pk, status=Job.RUNNING).update(**outcome)
+    return outcome['status']
+
+
+def work(worker=None, burst=False, should_stop=lambda: False):
+    """Claim and run jobs until ``should_stop()``; ``burst`` stops once the queue is empty.
+
+    Returns the number of jobs run.
+    """
+    worker = worker or worker_name()
+    poll_interval = _config()['POLL_INTERVAL']
+    processed = 0
+    while not should_stop():
+        close_old_connections()
+        try:
+            requeue_stale()
+            job = claim(worker)
+        except DatabaseError:
+            # e.g. a lock timeout; the queue is still there on the next poll.
+            logger.exception('Worker %s could not claim a job', worker)
+            time.sleep(poll_interval)
+            continue
+        if job is None:
+            if burst:
+                break
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        processed += 1
+    return processed
@@ -0,0 +1,18 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+from apps.core.search import AddTrigramIndex
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('students', '0002_student_students_created_id_idx'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddTrigramIndex(model_name='student', field='student_id', name='students_student_id_trgm'),
+        AddTrigramIndex(model_name='student', field='first_name', name='students_first_name_trgm'),
+        AddTrigramIndex(model_name='student', field='last_name', name='students_last_name_trgm'),
+        AddTrigramIndex(model_name='student', field='email', name='students_email_trgm'),
+    ]
@@ -1,4 +1,13 @@
 from django.db import models
+from django.db.models.functions import Concat
+
+
+def full_name_expression(prefix=''):
+    """SQL equivalent of ``Student.full_name`` (``prefix`` e.g. ``'student__'``)."""
+    return Concat(
+        f'{prefix}first_name', models.Value(' '), f'{prefix}last_name',
+        output_field=models.CharField(),
+    )
 
 
 class Student(models.Model):
@@ -17,6 +26,9 @@ class Student(models.Model):
     class Meta:
         db_table = 'students'
         ordering = ['last_name', 'first_name']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='students_created_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.student_id})"
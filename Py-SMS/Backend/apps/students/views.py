@@ -1,17 +1,31 @@
 from rest_framework import viewsets, filters
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Student
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.pagination import CursorOrPageNumberPagination
+from apps.core.search import TrigramSearchFilter
+from apps.core.sparse import ValuesListMixin
+from .models import Student, full_name_expression
 from .serializers import StudentSerializer, StudentListSerializer
 
 
-class StudentViewSet(viewsets.ModelViewSet):
+class StudentViewSet(ConditionalGetMixin, ValuesListMixin, viewsets.ModelViewSet):
     queryset = Student.objects.all()
     serializer_class = StudentSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, TrigramSearchFilter, filters.OrderingFilter]
     filterset_fields = ['student_id']
     search_fields = ['first_name', 'last_name', 'email', 'student_id']
     ordering_fields = ['created_at', 'last_name', 'first_name']
     ordering = ['-created_at']
+    pagination_class = CursorOrPageNumberPagination
+    cursor_ordering = ('-created_at', '-id')
+    conditional_models = (Student,)
+    # Same output as StudentListSerializer.
+    list_values = {
+        'id': 'id',
+        'student_id': 'student_id',
+        'full_name': full_name_expression(),
+        'email': 'email',
+    }
 
     def get_serializer_class(self):
         if self.action == 'list':
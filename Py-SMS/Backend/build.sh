@@ -10,3 +10,7 @@ python manage.py collectstatic --no-input
 
 # Run migrations
 python manage.py migrate
+
+# Populate materialized grade statistics on the first deploy only; signals
+# keep them current afterwards, and a rebuild locks grades against writes.
+python manage.py rebuild_grade_statistics --if-empty
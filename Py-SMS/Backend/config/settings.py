@@ -39,9 +39,12 @@ INSTALLED_APPS = [
     'apps.courses',
     'apps.grades',
     'apps.analytics',
+    'apps.core',
+    'apps.jobs',
 ]
 
 MIDDLEWARE = [
+    'apps.core.instrumentation.InstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -51,6 +54,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.core.routing.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -72,13 +76,21 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
 
 # Database
+# Persistent connections (CONN_MAX_AGE seconds) are kept per thread. Under
+# ASGI each sync request runs in a fresh thread, so they are not reused and
+# pile up towards the server's connection limit; ASGI deployments should set
+# CONN_MAX_AGE=0 (a connection per request) or put pgbouncer in front of the
+# database. See render.yaml.
+CONN_MAX_AGE = int(os.environ.get('CONN_MAX_AGE', '600'))
+
 if os.environ.get('DATABASE_URL'):
     DATABASES = {
         'default': dj_database_url.config(
             default=os.environ.get('DATABASE_URL'),
-            conn_max_age=600,
+            conn_max_age=CONN_MAX_AGE,
             conn_health_checks=True,
         )
     }
@@ -91,9 +103,120 @@ else:
             'PASSWORD': os.environ.get('POSTGRES_PASSWORD', 'postgres'),
             'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
             'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
         }
     }
 
+# Optional read replica (apps/core/routing.py): safe analytics and list GETs
+# read from it. A user who wrote is pinned to default for PIN_SECONDS so they
+# read their own writes despite replica lag; 0 disables pinning. Pins are
+# kept in CACHE_ALIAS, which must be shared (Redis/Memcached) across workers.
+if os.environ.get('REPLICA_DATABASE_URL'):
+    DATABASES['replica'] = {
+        **dj_database_url.parse(os.environ['REPLICA_DATABASE_URL'], conn_max_age=CONN_MAX_AGE, conn_health_checks=True),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['apps.core.routing.ReplicaRouter']
+REPLICA_ROUTING = {
+    'ALIAS': 'replica',
+    'PIN_SECONDS': int(os.environ.get('REPLICA_PIN_SECONDS', '5')),
+    'CACHE_ALIAS': 'default',
+}
+
+# Cache
+# Defaults to an in-process LRU (LocMemCache); point CACHE_BACKEND/CACHE_LOCATION
+# at Redis or Memcached to share cached responses between workers.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'py-sms'),
+    },
+    # Always in-process: users resolved from access tokens.
+    'users': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'py-sms-users',
+    },
+}
+if CACHE_BACKEND.endswith('LocMemCache'):
+    CACHES['default']['OPTIONS'] = {
+        'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '1000')),
+    }
+
+# Analytics response cache (apps/analytics/caching.py)
+# INVALIDATION: 'model' bumps only the versions of the model that was written,
+# 'global' invalidates every cached analytics response on any write.
+ANALYTICS_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': int(os.environ.get('ANALYTICS_CACHE_TIMEOUT', '60')),
+    'INVALIDATION': os.environ.get('ANALYTICS_CACHE_INVALIDATION', 'model'),
+}
+
+# Batch endpoint (apps/core/batch.py); MAX_WORKERS=1 runs sub-requests serially.
+BATCH_REQUESTS = {
+    'MAX_REQUESTS': int(os.environ.get('BATCH_MAX_REQUESTS', '20')),
+    'MAX_WORKERS': int(os.environ.get('BATCH_MAX_WORKERS', '4')),
+}
+
+# Users loaded by CachedJWTAuthentication (apps/accounts/authentication.py);
+# a change made in another process is seen after at most TIMEOUT seconds.
+AUTH_USER_CACHE = {
+    'ALIAS': 'users',
+    'TIMEOUT': int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', '30')),
+}
+
+# Background jobs (apps/jobs, run by `manage.py run_jobs`). Failed attempts
+# are retried after RETRY_DELAY * 2 ** (attempt - 1) seconds.
+JOBS = {
+    'POLL_INTERVAL': float(os.environ.get('JOBS_POLL_INTERVAL', '1.0')),
+    'STALE_TIMEOUT': int(os.environ.get('JOBS_STALE_TIMEOUT', '600')),
+    'RETRY_DELAY': int(os.environ.get('JOBS_RETRY_DELAY', '30')),
+    'MAX_ATTEMPTS': int(os.environ.get('JOBS_MAX_ATTEMPTS', '3')),
+}
+
+
+def _optional_ms(name, default):
+    """Milliseconds from the environment; an empty or ``none`` value gives ``None``."""
+    value = os.environ.get(name, default).strip()
+    return None if value.lower() in ('', 'none') else int(value)
+
+
+# Per-request timings (apps/core/instrumentation.py): Server-Timing header,
+# one log line per request and slow request/query logs (None disables).
+INSTRUMENTATION = {
+    'ENABLED': os.environ.get('INSTRUMENTATION', 'True').lower() == 'true',
+    'SERVER_TIMING': os.environ.get('SERVER_TIMING', 'True').lower() == 'true',
+    'LOG_REQUESTS': os.environ.get('LOG_REQUESTS', 'True').lower() == 'true',
+    'SLOW_REQUEST_MS': _optional_ms('SLOW_REQUEST_MS', '1000'),
+    'SLOW_QUERY_MS': _optional_ms('SLOW_QUERY_MS', '200'),
+    'SLOW_REQUEST_QUERIES': 5,
+}
+
+# Prometheus endpoint (apps/core/metrics.py); with a TOKEN, scrapers must send
+# "Authorization: Bearer <token>". Without one it is denied unless DEBUG or PUBLIC.
+METRICS = {
+    'TOKEN': os.environ.get('METRICS_TOKEN', ''),
+    'PUBLIC': os.environ.get('METRICS_PUBLIC', 'False').lower() == 'true',
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+    },
+    'loggers': {
+        'apps': {
+            'handlers': ['console'],
+            'level': os.environ.get('APPS_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 AUTH_USER_MODEL = 'accounts.User'
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -124,14 +247,14 @@ CORS_ALLOW_CREDENTIALS = True
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.accounts.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
-        'rest_framework.filters.SearchFilter',
+        'apps.core.search.TrigramSearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -144,4 +267,5 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
+    'TOKEN_OBTAIN_SERIALIZER': 'apps.accounts.serializers.TokenObtainPairSerializer',
 }
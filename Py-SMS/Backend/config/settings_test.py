@@ -0,0 +1,25 @@
+"""Settings for the test suite: in-memory SQLite, no Postgres required.
+
+    python manage.py test --settings=config.settings_test
+"""
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+    # A separate database standing in for a replica in tests/test_routing.py;
+    # reads go to it only where a test sets REPLICA_ROUTING['ALIAS'].
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+}
+REPLICA_ROUTING = {**REPLICA_ROUTING, 'ALIAS': None}  # noqa: F405
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+METRICS = {'TOKEN': '', 'PUBLIC': True}
+
+INSTRUMENTATION = {**INSTRUMENTATION, 'LOG_REQUESTS': False, 'SLOW_REQUEST_MS': None, 'SLOW_QUERY_MS': None}  # noqa: F405
@@ -2,6 +2,8 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from apps.core.batch import BatchView
+from apps.core.metrics import MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -12,4 +14,7 @@ urlpatterns = [
     path('api/v1/courses/', include('apps.courses.urls')),
     path('api/v1/grades/', include('apps.grades.urls')),
     path('api/v1/analytics/', include('apps.analytics.urls')),
+    path('api/v1/jobs/', include('apps.jobs.urls')),
+    path('api/v1/batch/', BatchView.as_view(), name='api-batch'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
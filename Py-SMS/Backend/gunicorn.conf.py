@@ -0,0 +1,52 @@
+"""Gunicorn server profiles, picked with ``SERVER_PROFILE``.
+
+``asgi`` (default): ``config.asgi`` on Uvicorn workers. Each worker process
+runs an event loop that holds many connections at once, so async views wait
+on the database without tying up the process. Workers default to one per CPU.
+``wsgi``: ``config.wsgi`` on sync workers, one request per process at a
+time, ``2 * CPU + 1`` workers by default.
+
+``WEB_CONCURRENCY`` overrides the worker count, ``PORT`` the port.
+
+Workers write Prometheus samples to ``PROMETHEUS_MULTIPROC_DIR`` (default: a
+``py-sms-metrics`` temp directory, emptied at startup) so ``/metrics``
+reports all of them.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+SERVER_PROFILE = os.environ.get('SERVER_PROFILE', 'asgi')
+CPUS = multiprocessing.cpu_count()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+keepalive = 5
+
+if SERVER_PROFILE == 'wsgi':
+    wsgi_app = 'config.wsgi:application'
+    worker_class = 'sync'
+    workers = int(os.environ.get('WEB_CONCURRENCY', CPUS * 2 + 1))
+elif SERVER_PROFILE == 'asgi':
+    wsgi_app = 'config.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+    workers = int(os.environ.get('WEB_CONCURRENCY', CPUS))
+else:
+    raise ValueError(f"SERVER_PROFILE must be 'asgi' or 'wsgi', not {SERVER_PROFILE!r}")
+
+# Set before the workers import prometheus_client, which reads it once.
+METRICS_DIR = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'py-sms-metrics')
+)
+
+
+def on_starting(server):
+    # Samples of a previous run's workers would be added to this run's.
+    shutil.rmtree(METRICS_DIR, ignore_errors=True)
+    os.makedirs(METRICS_DIR, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
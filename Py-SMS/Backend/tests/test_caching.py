@@ -0,0 +1,89 @@
+import threading
+from unittest import skipUnless
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.analytics.caching import model_versions
+from apps.analytics.models import ModelVersion
+from apps.courses.models import Course
+from apps.grades.models import Grade
+from apps.students.models import Student
+
+
+def grade_version():
+    return ModelVersion.objects.get(label='grades.grade').version
+
+
+class VersionBumpTests(TestCase):
+    def setUp(self):
+        # Commit the fixtures' bumps, so each test only sees its own.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student = Student.objects.create(
+                student_id='S1', first_name='First', last_name='Last', email='s1@example.com'
+            )
+            self.course = Course.objects.create(course_code='C1', name='Course 1')
+
+    def grade(self, score):
+        return Grade.objects.create(student=self.student, course=self.course, score=score, semester='2024-1')
+
+    def test_transaction_bumps_once_after_commit(self):
+        before = grade_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries, transaction.atomic():
+                for score in (50, 70, 90):
+                    self.grade(score)
+            # No counter row is locked while the transaction runs.
+            self.assertFalse([query for query in queries if 'model_versions' in query['sql']])
+        self.assertEqual(grade_version(), before + 1)
+
+    def test_rolled_back_savepoint_does_not_lose_later_bumps(self):
+        before = grade_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.grade(50)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            self.grade(70)
+        self.assertEqual(grade_version(), before + 1)
+
+    def test_versions_change_after_a_write(self):
+        versions, _ = model_versions([Grade])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grade(50)
+        self.assertNotEqual(model_versions([Grade])[0], versions)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'needs concurrent transactions')
+class ConcurrentWriteTests(TransactionTestCase):
+    def test_overlapping_writes_do_not_block_each_other(self):
+        student = Student.objects.create(student_id='S1', first_name='First', last_name='Last', email='s1@example.com')
+        course = Course.objects.create(course_code='C1', name='Course 1')
+        written, release = threading.Event(), threading.Event()
+
+        def slow_writer():
+            try:
+                with transaction.atomic():
+                    Grade.objects.create(student=student, course=course, score=50, semester='2024-1')
+                    written.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=slow_writer)
+        thread.start()
+        try:
+            self.assertTrue(written.wait(10))
+            before = grade_version()
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL lock_timeout = '1s'")
+                Grade.objects.create(student=student, course=course, score=70, semester='2024-1')
+            self.assertEqual(grade_version(), before + 1)
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(Grade.objects.count(), 2)
@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.students.models import Student
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_user(username='viewer', password='viewer-pass-123', is_staff=True)
+            self.student = Student.objects.create(
+                student_id='S1', first_name='First', last_name='Last', email='s1@example.com'
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url, **headers)
+
+    def test_matching_etag_returns_304(self):
+        for url in ('/api/v1/students/', f'/api/v1/students/{self.student.pk}/'):
+            response = self.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('private', response['Cache-Control'])
+            not_modified = self.get(url, response['ETag'])
+            self.assertEqual(not_modified.status_code, 304)
+            self.assertEqual(not_modified.content, b'')
+
+    def test_etag_covers_the_query_string(self):
+        etag = self.get('/api/v1/students/')['ETag']
+        self.assertEqual(self.get('/api/v1/students/?page=1', etag).status_code, 200)
+
+    def test_write_changes_etag(self):
+        etag = self.get('/api/v1/students/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/v1/students/{self.student.pk}/', {'first_name': 'Changed'})
+        self.assertEqual(response.status_code, 200)
+
+        response = self.get('/api/v1/students/', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['results'][0]['full_name'], 'Changed Last')
+        self.assertEqual(self.get('/api/v1/students/', response['ETag']).status_code, 304)
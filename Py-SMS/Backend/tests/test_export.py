@@ -0,0 +1,33 @@
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory, RequestFactory, TestCase
+
+from apps.core.export import export_response
+from apps.courses.models import Course
+
+COLUMNS = [('code', 'course_code'), ('credits', 'credits')]
+
+
+class ExportResponseTests(TestCase):
+    def setUp(self):
+        Course.objects.bulk_create(
+            Course(course_code=f'C{n:04d}', name=f'Course {n}', credits=3) for n in range(2500)
+        )
+        self.expected = 'code,credits\r\n' + ''.join(f'C{n:04d},3\r\n' for n in range(2500))
+
+    def test_wsgi_streams_sync_iterator(self):
+        request = RequestFactory().get('/export/')
+        response = export_response(request, Course.objects.order_by('course_code'), COLUMNS, 'courses', 'csv')
+        self.assertFalse(response.is_async)
+        self.assertEqual(b''.join(response.streaming_content).decode(), self.expected)
+
+    def test_asgi_streams_async_iterator_in_batches(self):
+        request = AsyncRequestFactory().get('/export/')
+        response = export_response(request, Course.objects.order_by('course_code'), COLUMNS, 'courses', 'csv')
+        self.assertTrue(response.is_async)
+
+        async def read():
+            return [chunk async for chunk in response.streaming_content]
+
+        chunks = async_to_sync(read)()
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b''.join(chunks).decode(), self.expected)
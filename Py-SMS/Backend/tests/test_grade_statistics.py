@@ -0,0 +1,223 @@
+"""Behavior of the derived grade data: statistics rows, letter grades and GPA.
+
+``GradeStatistics`` is maintained by signals with incremental deltas, so
+every test compares it with a live aggregate of ``grades`` after the write.
+"""
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.models import Avg, Count
+from django.test import TestCase
+
+from apps.analytics import grade_statistics, transcripts
+from apps.analytics.distribution import letter_grade_expression
+from apps.analytics.models import GradeStatistics
+from apps.courses.models import Course, Enrollment
+from apps.grades.importer import GradeImporter, ImportFormatError, record_chunks
+from apps.grades.models import Grade
+from apps.students.models import Student
+
+
+def make_student(n):
+    return Student.objects.create(
+        student_id=f'S{n}', first_name='First', last_name=f'Last{n}', email=f's{n}@example.com'
+    )
+
+
+class GradeStatisticsTests(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(course_code='C1', name='Course 1', credits=3)
+        self.other_course = Course.objects.create(course_code='C2', name='Course 2', credits=2)
+        self.student = make_student(1)
+
+    def grade(self, score, **fields):
+        return Grade.objects.create(**{
+            'student': self.student, 'course': self.course, 'score': score,
+            'grade_type': 'exam', 'semester': '2024-1', **fields,
+        })
+
+    def assertStatisticsMatchGrades(self):
+        self.assertEqual(grade_statistics.verify(), [])
+        live = Grade.objects.aggregate(count=Count('id'), average_score=Avg('score'))
+        stored = grade_statistics.stored_summary(GradeStatistics.objects.all())
+        self.assertEqual(stored['count'], live['count'])
+        self.assertAlmostEqual(stored['average_score'], live['average_score'] or 0)
+
+    def test_create(self):
+        self.grade(55)
+        self.grade(91)
+        self.grade(72, grade_type='quiz', max_score=80)
+        self.grade(40, semester='2024-2')
+        self.assertStatisticsMatchGrades()
+        self.assertEqual(GradeStatistics.objects.count(), 3)
+
+    def test_update_score(self):
+        low, _, high = self.grade(50), self.grade(70), self.grade(90)
+        low.score = 65
+        low.save()
+        self.assertStatisticsMatchGrades()
+        # Changing an extreme re-reads min/max.
+        high.score = 60
+        high.save()
+        self.assertStatisticsMatchGrades()
+        self.assertEqual(GradeStatistics.objects.get().score_max, 70)
+
+    def test_update_max_score_changes_letter_bucket(self):
+        grade = self.grade(80)
+        grade.max_score = 200
+        grade.save()
+        self.assertStatisticsMatchGrades()
+        self.assertEqual(GradeStatistics.objects.get().f_count, 1)
+
+    def test_update_semester_moves_grade(self):
+        grade, _ = self.grade(50), self.grade(80)
+        grade.semester = '2024-2'
+        grade.save()
+        self.assertStatisticsMatchGrades()
+        self.assertEqual(
+            dict(GradeStatistics.objects.values_list('semester', 'count')), {'2024-1': 1, '2024-2': 1}
+        )
+
+    def test_update_course_moves_grade(self):
+        grade = self.grade(50)
+        grade.course = self.other_course
+        grade.save()
+        self.assertStatisticsMatchGrades()
+        self.assertEqual(list(GradeStatistics.objects.values_list('course_id', flat=True)), [self.other_course.pk])
+
+    def test_delete(self):
+        low, _, high = self.grade(30), self.grade(60), self.grade(95)
+        high.delete()
+        self.assertStatisticsMatchGrades()
+        low.delete()
+        self.assertStatisticsMatchGrades()
+        Grade.objects.get().delete()
+        self.assertStatisticsMatchGrades()
+        self.assertFalse(GradeStatistics.objects.exists())
+
+    def test_bulk_import(self):
+        self.grade(70)
+        rows = [
+            {'student_id': 'S1', 'course_code': code, 'score': score, 'semester': '2024-1', 'grade_type': 'quiz'}
+            for code in ('C1', 'C2') for score in (45, 85, 99)
+        ]
+        report = GradeImporter().run(record_chunks(rows, chunk_size=4))
+        self.assertEqual(report['created'], 6)
+        self.assertStatisticsMatchGrades()
+
+    def test_failed_import_refreshes_committed_chunks(self):
+        rows = [
+            {'student_id': 'S1', 'course_code': 'C1', 'score': score, 'semester': '2024-1'}
+            for score in (45, 85)
+        ] + [{'student_id': 'S1', 'course_code': 'C1', 'semester': '2024-1'}]
+        importer = GradeImporter()
+        with self.assertRaises(ImportFormatError):
+            importer.run(record_chunks(rows, chunk_size=2))
+        self.assertEqual(importer.created, 2)
+        self.assertStatisticsMatchGrades()
+
+
+class RebuildCommandTests(TestCase):
+    def setUp(self):
+        course = Course.objects.create(course_code='C1', name='Course 1')
+        Grade.objects.create(student=make_student(1), course=course, score=80, semester='2024-1')
+
+    def rebuild(self, *args):
+        with mock.patch.object(grade_statistics, 'rebuild', wraps=grade_statistics.rebuild) as rebuild:
+            call_command('rebuild_grade_statistics', *args, stdout=StringIO())
+        return rebuild.call_count
+
+    def test_if_empty_fills_an_empty_table(self):
+        GradeStatistics.objects.all().delete()
+        self.assertEqual(self.rebuild('--if-empty'), 1)
+        self.assertEqual(grade_statistics.verify(), [])
+
+    def test_if_empty_skips_a_populated_table(self):
+        self.assertEqual(self.rebuild('--if-empty'), 0)
+        self.assertEqual(self.rebuild(), 1)
+
+
+class LetterGradeTests(TestCase):
+    def test_sql_expression_matches_model(self):
+        course = Course.objects.create(course_code='C1', name='Course 1')
+        student = make_student(1)
+        cases = [
+            (0, 100), (59.99, 100), (60, 100), (69.9, 100), (70, 100), (79.99, 100), (80, 100),
+            (89.99, 100), (90, 100), (100, 100), (45, 50), (27, 30), (12, 20), (5, 0), (0, 0),
+        ]
+        for score, max_score in cases:
+            Grade.objects.create(
+                student=student, course=course, score=score, max_score=max_score, semester='2024-1'
+            )
+
+        for grade in Grade.objects.annotate(sql_letter=letter_grade_expression()):
+            with self.subTest(score=grade.score, max_score=grade.max_score):
+                self.assertEqual(grade.sql_letter, grade.letter_grade)
+
+
+class TranscriptTests(TestCase):
+    def setUp(self):
+        self.student = make_student(1)
+        self.math = Course.objects.create(course_code='MATH', name='Math', credits=3)
+        self.art = Course.objects.create(course_code='ART', name='Art', credits=1)
+        self.history = Course.objects.create(course_code='HIST', name='History', credits=2)
+
+    def grade(self, course, score, semester='2024-1', max_score=100):
+        Grade.objects.create(
+            student=self.student, course=course, score=score, max_score=max_score, semester=semester
+        )
+
+    def test_gpa_is_credit_weighted_over_course_totals(self):
+        # Math: (95 + 35) / 150 = 86.7% -> B; Art: 50% -> F.
+        self.grade(self.math, 95)
+        self.grade(self.math, 35, max_score=50)
+        self.grade(self.art, 50)
+        self.grade(self.history, 91, semester='2024-2')
+
+        transcript = transcripts.get_transcript(self.student.pk)
+        first, second = transcript.semesters
+        self.assertEqual([course['letter_grade'] for course in first['courses']], ['F', 'B'])
+        self.assertEqual(first['gpa'], round((3.0 * 3 + 0.0 * 1) / 4, 2))
+        self.assertEqual(first['credits'], 4)
+        self.assertEqual(second['gpa'], 4.0)
+        self.assertEqual(transcript.gpa, round((3.0 * 3 + 0.0 * 1 + 4.0 * 2) / 6, 2))
+        self.assertEqual(transcript.credits, 6)
+
+    def test_dropped_courses_are_left_out(self):
+        self.grade(self.math, 90)
+        self.grade(self.art, 10)
+        Enrollment.objects.create(student=self.student, course=self.art, status='dropped')
+
+        transcript = transcripts.get_transcript(self.student.pk)
+        self.assertEqual(transcript.gpa, 4.0)
+        self.assertEqual(transcript.credits, 3)
+
+    def test_grade_change_refreshes_transcript(self):
+        self.grade(self.math, 90)
+        self.assertEqual(transcripts.get_transcript(self.student.pk).gpa, 4.0)
+        grade = Grade.objects.get()
+        grade.score = 65
+        grade.save()
+        self.assertEqual(transcripts.get_transcript(self.student.pk).gpa, 1.0)
+
+    def test_write_during_recompute_is_not_overwritten(self):
+        self.grade(self.math, 90)
+        compute = transcripts.compute_transcripts
+
+        def compute_then_write(student_ids):
+            # A writer commits after the reader has read the old grades.
+            result = compute(student_ids)
+            grade = Grade.objects.get()
+            grade.score = 65
+            grade.save()
+            return result
+
+        with mock.patch.object(transcripts, 'compute_transcripts', compute_then_write):
+            self.assertEqual(transcripts.get_transcript(self.student.pk).gpa, 4.0)
+        self.assertEqual(transcripts.get_transcript(self.student.pk).gpa, 1.0)
+
+    def test_student_without_grades(self):
+        transcript = transcripts.get_transcript(self.student.pk)
+        self.assertIsNone(transcript.gpa)
+        self.assertEqual(transcript.credits, 0)
@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.jobs.models import Job
+from apps.jobs.tasks import InvalidPayload, enqueue
+
+User = get_user_model()
+
+
+class JobCreateTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('job-list')
+
+    def login(self, **fields):
+        user = User.objects.create_user(username='user', email='user@example.com', password='pass-123', **fields)
+        self.client.force_authenticate(user)
+
+    def test_only_staff_can_queue(self):
+        self.login()
+        response = self.client.post(self.url, {'name': 'analytics.rebuild_grade_statistics'}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Job.objects.exists())
+
+    def test_staff_queues_valid_payload(self):
+        self.login(is_staff=True)
+        response = self.client.post(
+            self.url, {'name': 'analytics.recompute_transcripts', 'payload': {'semester': '2024-1', 'processes': 1}},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(Job.objects.get().payload, {'semester': '2024-1', 'processes': 1})
+
+    def test_invalid_payload_is_rejected_before_queueing(self):
+        self.login(is_staff=True)
+        payloads = [
+            ('analytics.rebuild_grade_statistics', {'semester': '2024-1'}),
+            ('analytics.recompute_transcripts', {'procs': 2}),
+            ('analytics.recompute_transcripts', {'processes': 10 ** 6}),
+            ('analytics.recompute_transcripts', {'batch_size': 0}),
+            ('grades.import', {'rows': 'S1,C1,90'}),
+        ]
+        for name, payload in payloads:
+            with self.subTest(name=name, payload=payload):
+                response = self.client.post(self.url, {'name': name, 'payload': payload}, format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('payload', response.data)
+        self.assertFalse(Job.objects.exists())
+
+    def test_enqueue_validates_payload(self):
+        with self.assertRaises(InvalidPayload):
+            enqueue('analytics.recompute_transcripts', {'unknown': True})
+
+
+class JobRetryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user', email='user@example.com', password='pass-123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def retry(self, job):
+        return self.client.post(reverse('job-retry', kwargs={'pk': job.pk}))
+
+    def test_failed_import_is_not_retried(self):
+        job = enqueue('grades.import', {'rows': []}, self.user)
+        self.assertEqual(job.max_attempts, 1)
+        Job.objects.filter(pk=job.pk).update(status=Job.FAILED, attempts=1)
+
+        self.assertEqual(self.retry(job).status_code, 409)
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.FAILED)
+
+    def test_cancelled_import_can_be_queued_again(self):
+        job = enqueue('grades.import', {'rows': []}, self.user)
+        Job.objects.filter(pk=job.pk).update(status=Job.CANCELLED)
+        self.assertEqual(self.retry(job).status_code, 202)
+
+    def test_failed_retryable_job_is_retried(self):
+        job = enqueue('analytics.rebuild_grade_statistics', user=self.user)
+        Job.objects.filter(pk=job.pk).update(status=Job.FAILED, attempts=3)
+        self.assertEqual(self.retry(job).status_code, 202)
+        self.assertEqual(Job.objects.get(pk=job.pk).attempts, 0)
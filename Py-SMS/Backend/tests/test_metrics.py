@@ -0,0 +1,24 @@
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+
+@override_settings(DEBUG=False)
+class MetricsAccessTests(SimpleTestCase):
+    def get(self, **headers):
+        return self.client.get(reverse('metrics'), headers=headers)
+
+    @override_settings(METRICS={'TOKEN': ''})
+    def test_denied_without_token(self):
+        self.assertEqual(self.get().status_code, 403)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.get().status_code, 200)
+
+    @override_settings(METRICS={'TOKEN': '', 'PUBLIC': True})
+    def test_public_without_token(self):
+        self.assertEqual(self.get().status_code, 200)
+
+    @override_settings(METRICS={'TOKEN': 'secret', 'PUBLIC': True})
+    def test_token_required(self):
+        self.assertEqual(self.get().status_code, 401)
+        self.assertEqual(self.get(Authorization='Bearer wrong').status_code, 401)
+        self.assertEqual(self.get(Authorization='Bearer secret').status_code, 200)
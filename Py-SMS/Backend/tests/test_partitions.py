@@ -0,0 +1,103 @@
+"""Partitioning of ``grades`` by semester (PostgreSQL only).
+
+The default test settings use SQLite, where these are skipped; run them
+against PostgreSQL with the regular settings::
+
+    DATABASE_URL=postgres://... python manage.py test tests.test_partitions
+"""
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+from apps.courses.models import Course
+from apps.grades import partitions
+from apps.grades.models import Grade
+from apps.students.models import Student
+
+UNPARTITIONED = ('grades', '0003_grade_access_path_indexes')
+
+
+def is_partitioned():
+    with connection.cursor() as cursor:
+        return partitions._is_partitioned(cursor, Grade._meta.db_table)
+
+
+def constraints(table):
+    with connection.cursor() as cursor:
+        return [name for name, in partitions._fetch(
+            cursor, 'SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass', [table]
+        )]
+
+
+@skipUnless(connection.vendor == 'postgresql', 'grades is only partitioned on PostgreSQL')
+class PartitionTests(TransactionTestCase):
+    def setUp(self):
+        self.student = Student.objects.create(
+            student_id='S1', first_name='First', last_name='Last', email='s1@example.com'
+        )
+        self.course = Course.objects.create(course_code='C1', name='Course 1')
+        self.grades = Grade.objects.bulk_create(
+            Grade(student=self.student, course=self.course, score=60 + n, semester=semester)
+            for semester in ('2023-1', '2023-2', '2024-1') for n in range(5)
+        )
+
+    def grade(self, semester):
+        return Grade.objects.create(student=self.student, course=self.course, score=70, semester=semester)
+
+    def tearDown(self):
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            for name, _, _ in partitions._partitions(cursor, Grade._meta.db_table):
+                if name != partitions.DEFAULT_PARTITION:
+                    cursor.execute(f'DROP TABLE {quote(name)}')
+
+    def migrate(self, targets):
+        MigrationExecutor(connection).migrate(targets)
+
+    def test_migration_forwards_and_backwards_keeps_rows(self):
+        ids = sorted(grade.pk for grade in self.grades)
+        self.assertTrue(is_partitioned())
+
+        self.migrate([UNPARTITIONED])
+        self.assertFalse(is_partitioned())
+        self.assertEqual(sorted(Grade.objects.values_list('pk', flat=True)), ids)
+        self.grade('2024-1')
+
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+        self.assertTrue(is_partitioned())
+        self.assertEqual(Grade.objects.count(), len(ids) + 1)
+        # The identity sequence continues after the highest id.
+        self.assertGreater(self.grade('2024-1').pk, max(ids) + 1)
+
+    def test_archive_moves_semester_into_its_own_partition(self):
+        self.assertEqual(partitions.archive('2023-1'), 5)
+
+        bounds = {name: bound for name, bound, _ in partitions.partitions()}
+        self.assertEqual(bounds['grades_2023_1'], "FOR VALUES IN ('2023-1')")
+        self.assertEqual(partitions.default_semesters(), ['2023-2', '2024-1'])
+        self.assertEqual(Grade.objects.filter(semester='2023-1').count(), 5)
+        self.assertEqual(Grade.objects.count(), 15)
+        # The check constraint that let ATTACH skip its scan is gone again.
+        self.assertNotIn('grades_2023_1_closed', constraints(partitions.DEFAULT_PARTITION))
+
+        # New rows of the semester go to its partition; archiving again is a no-op.
+        self.grade('2023-1')
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM grades_2023_1')
+            self.assertEqual(cursor.fetchone()[0], 6)
+        self.assertEqual(partitions.archive('2023-1'), 0)
+
+    def test_archive_of_empty_semester_reopens_it(self):
+        self.assertEqual(partitions.archive('2019-1'), 0)
+        self.assertNotIn('grades_2019_1_closed', constraints(partitions.DEFAULT_PARTITION))
+        self.assertEqual(len(partitions.partitions()), 1)
+
+    def test_archive_truncates_constraint_names(self):
+        with mock.patch.object(connection.ops, 'max_name_length', return_value=16):
+            self.assertEqual(partitions.archive('2023-1'), 5)
+            name = partitions.partition_name('2023-1')
+            expected = {partitions._constraint(name, 'bound'), partitions._constraint(name, 'pkey')}
+        self.assertTrue(all(len(constraint) <= 16 for constraint in expected))
+        self.assertLessEqual(expected, set(constraints(name)))
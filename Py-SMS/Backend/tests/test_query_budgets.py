@@ -0,0 +1,359 @@
+"""Per-endpoint SQL query budgets.
+
+Every API route is called against a small and a large fixture. A route fails
+if it runs more queries than its budget, or if its query count changes with
+the number of rows (the signature of an N+1).
+"""
+from itertools import count
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.analytics import grade_statistics
+from apps.analytics.models import StudentTranscript
+from apps.courses.models import Course, Enrollment
+from apps.grades.models import Grade
+from apps.jobs.models import Job
+from apps.students.models import Student
+
+User = get_user_model()
+
+SMALL = 4
+LARGE = 40
+SEMESTERS = ['2024-1', '2024-2']
+PASSWORD = 'budget-pass-123'
+
+_serial = count(1)
+
+
+def seed(students):
+    """Add ``students`` students, each in two courses with two grades per course."""
+    new_courses = Course.objects.bulk_create([
+        Course(course_code=f'C{n}', name=f'Course {n}', credits=3)
+        for n in (next(_serial) for _ in range(max(students // 2, 2)))
+    ])
+    new_students = Student.objects.bulk_create([
+        Student(
+            student_id=f'S{n}', first_name=f'First{n}', last_name=f'Last{n}', email=f's{n}@example.com'
+        )
+        for n in (next(_serial) for _ in range(students))
+    ])
+
+    enrollments, grades = [], []
+    for i, student in enumerate(new_students):
+        for course in (new_courses[i % len(new_courses)], new_courses[(i + 1) % len(new_courses)]):
+            enrollments.append(Enrollment(student=student, course=course, status='active'))
+            for semester in SEMESTERS:
+                grades.append(Grade(
+                    student=student, course=course, score=40 + (i * 7) % 50,
+                    grade_type='exam', semester=semester,
+                ))
+    Enrollment.objects.bulk_create(enrollments)
+    Grade.objects.bulk_create(grades)
+    grade_statistics.rebuild()
+
+
+def first_student():
+    return Student.objects.order_by('pk').first()
+
+
+def first_course():
+    return Course.objects.order_by('pk').first()
+
+
+def new_student():
+    n = next(_serial)
+    return Student.objects.create(
+        student_id=f'N{n}', first_name='New', last_name=f'Student{n}', email=f'n{n}@example.com'
+    )
+
+
+def new_course():
+    return Course.objects.create(course_code=f'N{next(_serial)}', name='New course')
+
+
+def new_grade():
+    return Grade.objects.create(
+        student=first_student(), course=first_course(), score=60,
+        grade_type='exam', semester=SEMESTERS[0],
+    )
+
+
+def new_enrollment():
+    return Enrollment.objects.create(student=new_student(), course=first_course())
+
+
+def new_user():
+    n = next(_serial)
+    return User.objects.create_user(username=f'user{n}', email=f'user{n}@example.com', password=PASSWORD)
+
+
+def new_job(status=Job.QUEUED):
+    return Job.objects.create(name='analytics.rebuild_grade_statistics', status=status)
+
+
+def failed_job():
+    return new_job(Job.FAILED)
+
+
+def student_payload():
+    n = next(_serial)
+    return {'student_id': f'P{n}', 'first_name': 'Post', 'last_name': 'Student', 'email': f'p{n}@example.com'}
+
+
+def course_payload():
+    return {'course_code': f'P{next(_serial)}', 'name': 'Posted course', 'credits': 3}
+
+
+def grade_payload():
+    return {
+        'student': first_student().pk, 'course': first_course().pk,
+        'score': 55, 'max_score': 100, 'grade_type': 'exam', 'semester': SEMESTERS[0],
+    }
+
+
+def grade_import_payload():
+    student, course = first_student(), first_course()
+    return [
+        {'student_id': student.student_id, 'course_code': course.course_code, 'score': score, 'semester': SEMESTERS[0]}
+        for score in (55, 65, 75)
+    ]
+
+
+def enrollment_payload():
+    return {'student': new_student().pk, 'course': first_course().pk, 'status': 'active'}
+
+
+def user_payload():
+    n = next(_serial)
+    return {
+        'username': f'signup{n}', 'email': f'signup{n}@example.com',
+        'password': PASSWORD, 'password_confirm': PASSWORD,
+    }
+
+
+def stale_transcript_url():
+    # Budget the recompute path, not the stored-row lookup.
+    student = first_student()
+    StudentTranscript.objects.filter(student=student).delete()
+    return reverse('student-transcript', kwargs={'student_id': student.pk})
+
+
+def detail(route, factory):
+    return lambda: reverse(route, kwargs={'pk': factory().pk})
+
+
+# (route name, method) -> (budget, url builder, payload builder)
+# Budgets include the query CachedJWTAuthentication runs to load the user,
+# since every measurement starts with empty caches, and the model_versions
+# read behind ETags and cached responses.
+ENDPOINT_BUDGETS = {
+    ('token_obtain_pair', 'post'): (
+        1, lambda: reverse('token_obtain_pair'),
+        lambda: {'username': new_user().username, 'password': PASSWORD},
+    ),
+    ('token_refresh', 'post'): (
+        1, lambda: reverse('token_refresh'),
+        lambda: {'refresh': str(RefreshToken.for_user(new_user()))},
+    ),
+
+    ('user-list', 'get'): (4, lambda: reverse('user-list'), None),
+    ('user-list', 'post'): (5, lambda: reverse('user-list'), user_payload),
+    ('user-me', 'get'): (2, lambda: reverse('user-me'), None),
+    ('user-detail', 'get'): (3, detail('user-detail', new_user), None),
+    ('user-detail', 'put'): (
+        6, detail('user-detail', new_user),
+        lambda: {'username': f'put{next(_serial)}', 'email': f'put{next(_serial)}@example.com'},
+    ),
+    ('user-detail', 'patch'): (4, detail('user-detail', new_user), lambda: {'full_name': 'Patched'}),
+    ('user-detail', 'delete'): (8, detail('user-detail', new_user), None),
+
+    ('student-list', 'get'): (4, lambda: reverse('student-list'), None),
+    ('student-list', 'post'): (5, lambda: reverse('student-list'), student_payload),
+    ('student-detail', 'get'): (3, detail('student-detail', new_student), None),
+    ('student-detail', 'put'): (6, detail('student-detail', new_student), student_payload),
+    ('student-detail', 'patch'): (4, detail('student-detail', new_student), lambda: {'phone': '010'}),
+    ('student-detail', 'delete'): (7, detail('student-detail', new_student), None),
+
+    ('course-list', 'get'): (4, lambda: reverse('course-list'), None),
+    ('course-list', 'post'): (4, lambda: reverse('course-list'), course_payload),
+    ('course-detail', 'get'): (3, detail('course-detail', new_course), None),
+    ('course-detail', 'put'): (6, detail('course-detail', new_course), course_payload),
+    ('course-detail', 'patch'): (5, detail('course-detail', new_course), lambda: {'credits': 2}),
+    ('course-detail', 'delete'): (7, detail('course-detail', new_course), None),
+    ('course-students', 'get'): (
+        4, lambda: reverse('course-students', kwargs={'pk': first_course().pk}), None,
+    ),
+    ('course-roster', 'get'): (
+        4, lambda: reverse('course-roster', kwargs={'pk': first_course().pk}), None,
+    ),
+
+    ('enrollment-list', 'get'): (4, lambda: reverse('enrollment-list'), None),
+    ('enrollment-list', 'post'): (7, lambda: reverse('enrollment-list'), enrollment_payload),
+    ('enrollment-detail', 'get'): (3, detail('enrollment-detail', new_enrollment), None),
+    ('enrollment-detail', 'put'): (
+        10, detail('enrollment-detail', new_enrollment), enrollment_payload,
+    ),
+    ('enrollment-detail', 'patch'): (
+        7, detail('enrollment-detail', new_enrollment), lambda: {'status': 'completed'},
+    ),
+    ('enrollment-detail', 'delete'): (5, detail('enrollment-detail', new_enrollment), None),
+    ('enrollment-export', 'get'): (2, lambda: reverse('enrollment-export'), None),
+
+    ('grade-list', 'get'): (4, lambda: reverse('grade-list'), None),
+    ('grade-list', 'post'): (7, lambda: reverse('grade-list'), grade_payload),
+    ('grade-detail', 'get'): (3, detail('grade-detail', new_grade), None),
+    ('grade-detail', 'put'): (10, detail('grade-detail', new_grade), grade_payload),
+    ('grade-detail', 'patch'): (8, detail('grade-detail', new_grade), lambda: {'score': 50}),
+    ('grade-detail', 'delete'): (7, detail('grade-detail', new_grade), None),
+    ('grade-by-student', 'get'): (
+        3, lambda: reverse('grade-by-student') + f'?student_id={first_student().pk}', None,
+    ),
+    ('grade-by-course', 'get'): (
+        3, lambda: reverse('grade-by-course') + f'?course_id={first_course().pk}', None,
+    ),
+    ('grade-statistics', 'get'): (3, lambda: reverse('grade-statistics'), None),
+    ('grade-export', 'get'): (
+        2, lambda: reverse('grade-export') + '?export_format=ndjson', None,
+    ),
+    ('grade-bulk-import', 'post'): (13, lambda: reverse('grade-bulk-import'), grade_import_payload),
+
+    ('dashboard-stats', 'get'): (6, lambda: reverse('dashboard-stats'), None),
+    ('course-analytics', 'get'): (4, lambda: reverse('course-analytics'), None),
+    ('grade-distribution', 'get'): (
+        3, lambda: reverse('grade-distribution') + '?group_by=grade_type,course', None,
+    ),
+    ('score-statistics', 'get'): (
+        3, lambda: reverse('score-statistics') + f'?course_id={first_course().pk}&students=true', None,
+    ),
+    ('student-performance', 'get'): (
+        3, lambda: reverse('student-performance') + f'?student_id={first_student().pk}', None,
+    ),
+    ('api-batch', 'post'): (
+        11, lambda: reverse('api-batch'),
+        lambda: {'requests': [reverse('dashboard-stats'), reverse('course-analytics'), reverse('grade-statistics')]},
+    ),
+    ('student-transcript', 'get'): (11, stale_transcript_url, None),
+
+    ('course-enroll', 'post'): (
+        9, detail('course-enroll', new_course),
+        lambda: {'students': list(Student.objects.values_list('pk', flat=True))},
+    ),
+    ('course-copy-cohort', 'post'): (
+        10, lambda: reverse('course-copy-cohort', kwargs={'pk': first_course().pk}),
+        lambda: {'target_course': new_course().pk},
+    ),
+    ('enrollment-bulk-status', 'post'): (
+        7, lambda: reverse('enrollment-bulk-status'),
+        lambda: {'filter': {'course': first_course().pk, 'status': 'active'}, 'status': 'completed'},
+    ),
+
+    ('job-list', 'get'): (3, lambda: reverse('job-list'), None),
+    ('job-list', 'post'): (
+        2, lambda: reverse('job-list'),
+        lambda: {'name': 'analytics.recompute_transcripts', 'payload': {'semester': SEMESTERS[0]}},
+    ),
+    ('job-detail', 'get'): (2, detail('job-detail', new_job), None),
+    ('job-progress', 'get'): (2, detail('job-progress', new_job), None),
+    ('job-cancel', 'post'): (4, detail('job-cancel', new_job), None),
+    ('job-retry', 'post'): (4, detail('job-retry', failed_job), None),
+
+    ('metrics', 'get'): (0, lambda: reverse('metrics'), None),
+}
+
+UNBUDGETED_ROUTES = {'api-root'}
+UNBUDGETED_NAMESPACES = {'admin'}
+
+
+def api_routes():
+    """Yield ``(route name, method)`` for every API route in the URLconf."""
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                if pattern.namespace not in UNBUDGETED_NAMESPACES:
+                    yield from walk(pattern.url_patterns)
+                continue
+            if not isinstance(pattern, URLPattern) or pattern.name in UNBUDGETED_ROUTES:
+                continue
+            callback = pattern.callback
+            actions = getattr(callback, 'actions', None)
+            if actions:
+                # DRF adds 'head' to a route's actions once it has served a request.
+                methods = [method for method in actions if method != 'head']
+            else:
+                view_class = callback.view_class
+                methods = [
+                    method for method in view_class.http_method_names
+                    if method not in ('head', 'options') and hasattr(view_class, method)
+                ]
+            for method in methods:
+                yield pattern.name, method
+
+    return set(walk(get_resolver().url_patterns))
+
+
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='budget', email='budget@example.com', password=PASSWORD, is_staff=True, is_superuser=True
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}'
+        )
+
+    def measure(self, route, method):
+        _, build_url, build_payload = ENDPOINT_BUDGETS[(route, method)]
+        url = build_url()
+        payload = build_payload() if build_payload else None
+        for cache in caches.all():
+            cache.clear()
+
+        # The test transaction never commits: run the commit-time work of the
+        # fixtures first, then count the request's own (version bumps).
+        pending, connection.run_on_commit = connection.run_on_commit, []
+        for _, callback, _ in pending:
+            callback()
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = getattr(self.client, method)(url, payload, format='json')
+                # Streamed responses only query the database while being read.
+                content = b''.join(response.streaming_content) if response.streaming else response.content
+        self.assertLess(
+            response.status_code, 400,
+            f'{method.upper()} {url} returned {response.status_code}: {content[:200]}',
+        )
+        return queries
+
+    def measure_all(self):
+        return {key: self.measure(*key) for key in sorted(ENDPOINT_BUDGETS)}
+
+    def test_every_route_has_a_budget(self):
+        missing = api_routes() - set(ENDPOINT_BUDGETS)
+        self.assertFalse(missing, f'Routes without a query budget: {sorted(missing)}')
+
+    def test_query_counts_stay_within_budget_and_do_not_grow(self):
+        seed(SMALL)
+        small = self.measure_all()
+        seed(LARGE - SMALL)
+        large = self.measure_all()
+
+        for key, (budget, _, _) in ENDPOINT_BUDGETS.items():
+            route, method = key
+            with self.subTest(route=route, method=method.upper()):
+                executed = '\n'.join(query['sql'] for query in large[key].captured_queries)
+                self.assertEqual(
+                    len(small[key]), len(large[key]),
+                    f'Query count grows with row count ({len(small[key])} -> {len(large[key])}):\n'
+                    f'{executed}',
+                )
+                self.assertLessEqual(
+                    len(large[key]), budget,
+                    f'{len(large[key])} queries exceed the budget of {budget}:\n{executed}',
+                )
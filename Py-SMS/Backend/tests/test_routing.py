@@ -0,0 +1,105 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connections, transaction
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.core import routing
+from apps.core.routing import ReplicaRouter, check_pin_cache
+from apps.students.models import Student
+
+User = get_user_model()
+
+REPLICA = {'ALIAS': 'replica', 'PIN_SECONDS': 5, 'CACHE_ALIAS': 'default'}
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+REDIS = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost'}}
+
+
+@override_settings(DEBUG=False)
+class PinCacheCheckTests(SimpleTestCase):
+    def check_ids(self):
+        return [message.id for message in check_pin_cache()]
+
+    @override_settings(REPLICA_ROUTING=REPLICA, CACHES=LOCMEM)
+    def test_replica_with_process_local_cache_is_an_error(self):
+        self.assertEqual(self.check_ids(), ['core.E001'])
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.check_ids(), ['core.W001'])
+
+    @override_settings(REPLICA_ROUTING=REPLICA, CACHES=REDIS)
+    def test_replica_with_shared_cache_passes(self):
+        self.assertEqual(self.check_ids(), [])
+
+    @override_settings(CACHES=LOCMEM)
+    def test_no_replica_passes(self):
+        self.assertEqual(self.check_ids(), [])
+
+    @override_settings(REPLICA_ROUTING={**REPLICA, 'PIN_SECONDS': 0}, CACHES=LOCMEM)
+    def test_pinning_disabled_passes(self):
+        self.assertEqual(self.check_ids(), [])
+
+
+@override_settings(REPLICA_ROUTING=REPLICA)
+class ReplicaRoutingTests(TransactionTestCase):
+    """``replica`` is a separate database here, so a read shows where it went.
+
+    TestCase would wrap every test in a transaction on ``default``, and reads
+    inside a transaction never go to the replica.
+    """
+
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        caches['default'].clear()
+        self.user = User.objects.create_user(username='reader', password='reader-pass-123', is_staff=True)
+        # The replica has the user but not the students written to the primary.
+        self.user.save(using='replica')
+        Student.objects.create(student_id='S1', first_name='First', last_name='Last', email='s1@example.com')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def list_students(self):
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get('/api/v1/students/')
+        self.assertEqual(response.status_code, 200)
+        return response.data['count'], len(replica.captured_queries)
+
+    def test_get_reads_replica_until_a_write_pins_the_user(self):
+        count, replica_queries = self.list_students()
+        self.assertEqual(count, 0)
+        self.assertGreater(replica_queries, 0)
+
+        response = self.client.post('/api/v1/students/', {
+            'student_id': 'S2', 'first_name': 'New', 'last_name': 'Student', 'email': 's2@example.com',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(routing.is_pinned(self.user.pk))
+
+        self.assertEqual(self.list_students(), (2, 0))
+
+    def test_failed_write_does_not_pin(self):
+        response = self.client.post('/api/v1/students/', {'student_id': 'S1'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(routing.is_pinned(self.user.pk))
+        self.assertEqual(self.list_students()[0], 0)
+
+    def test_batch_of_gets_does_not_pin(self):
+        response = self.client.post('/api/v1/batch/', {'requests': ['/api/v1/students/']}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(routing.is_pinned(self.user.pk))
+        self.assertEqual(self.list_students()[0], 0)
+
+    def test_db_for_read(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Student))
+        token = routing._reading_replica.set(True)
+        try:
+            self.assertEqual(router.db_for_read(Student), 'replica')
+            with transaction.atomic():
+                self.assertIsNone(router.db_for_read(Student))
+            with self.settings(REPLICA_ROUTING={**REPLICA, 'ALIAS': 'missing'}):
+                self.assertIsNone(router.db_for_read(Student))
+        finally:
+            routing._reading_replica.reset(token)
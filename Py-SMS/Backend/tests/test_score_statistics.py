@@ -0,0 +1,89 @@
+import numpy as np
+from django.test import TestCase
+
+from apps.analytics import score_statistics
+from apps.courses.models import Course
+from apps.grades.models import Grade
+from apps.students.models import Student
+
+
+def make_student(n):
+    return Student.objects.create(
+        student_id=f'S{n}', first_name='First', last_name=f'Last{n}', email=f's{n}@example.com'
+    )
+
+
+class ScoreStatisticsTests(TestCase):
+    def setUp(self):
+        course = Course.objects.create(course_code='C1', name='Course 1')
+        self.students = [make_student(n) for n in range(4)]
+        # Percentages per student: [60, 80] (mean 70), [90], [50], [70].
+        for student, score, max_score in [
+            (self.students[0], 60, 100), (self.students[0], 40, 50), (self.students[1], 45, 50),
+            (self.students[2], 50, 100), (self.students[3], 70, 100),
+        ]:
+            Grade.objects.create(student=student, course=course, score=score, max_score=max_score, semester='2024-1')
+
+    def statistics(self, **kwargs):
+        return score_statistics.score_statistics(
+            score_statistics.grade_queryset(), include_students=True, **kwargs
+        )
+
+    def test_describe(self):
+        result = self.statistics()
+        self.assertEqual(result['count'], 5)
+        self.assertEqual(result['mean'], 70)
+        self.assertEqual(result['median'], 70)
+        self.assertEqual(result['std'], round(200 ** 0.5, 4))
+        self.assertEqual((result['min'], result['max']), (50, 90))
+        self.assertEqual(result['quartiles'], {'q1': 60, 'q2': 70, 'q3': 80})
+
+    def test_raw_score_metric(self):
+        result = self.statistics(metric='score')
+        self.assertEqual((result['min'], result['max'], result['mean']), (40, 70, 53))
+
+    def test_histogram(self):
+        self.assertEqual(self.statistics(bins=4)['histogram'], [
+            {'start': 50, 'end': 60, 'count': 1},
+            {'start': 60, 'end': 70, 'count': 1},
+            {'start': 70, 'end': 80, 'count': 1},
+            # The last bucket includes its upper edge.
+            {'start': 80, 'end': 90, 'count': 2},
+        ])
+
+    def test_z_score_and_percentile_rank(self):
+        standings = {row['student_id']: row for row in self.statistics()['students']}
+        z = round(20 / 200 ** 0.5, 4)
+        expected = [(2, 70, 0, 50), (1, 90, z, 87.5), (1, 50, -z, 12.5), (1, 70, 0, 50)]
+        for student, (count, mean, z_score, rank) in zip(self.students, expected):
+            self.assertEqual(
+                standings[student.pk],
+                {'student_id': student.pk, 'count': count, 'mean': mean, 'z_score': z_score, 'percentile_rank': rank},
+            )
+        # Best mean first.
+        self.assertEqual(self.statistics()['students'][0]['student_id'], self.students[1].pk)
+
+    def test_zero_max_score_counts_as_zero_percent(self):
+        Grade.objects.filter(student=self.students[3]).update(max_score=0)
+        self.assertEqual(self.statistics()['min'], 0)
+
+    def test_empty(self):
+        result = score_statistics.score_statistics(Grade.objects.none(), include_students=True)
+        self.assertEqual(result['count'], 0)
+        self.assertIsNone(result['mean'])
+        self.assertIsNone(result['std'])
+        self.assertEqual(result['quartiles'], {'q1': None, 'q2': None, 'q3': None})
+        self.assertEqual(result['histogram'], [])
+        self.assertEqual(result['students'], [])
+
+    def test_single_score(self):
+        values = np.array([75.0])
+        self.assertEqual(score_statistics.describe(values)['std'], 0)
+        self.assertEqual(sum(bucket['count'] for bucket in score_statistics.histogram(values)), 1)
+        # No spread: the z-score is 0 rather than a division by zero.
+        [standing] = score_statistics.student_standings(np.array([7]), values)
+        self.assertEqual(standing, {'student_id': 7, 'count': 1, 'mean': 75, 'z_score': 0, 'percentile_rank': 50})
+
+    def test_equal_means(self):
+        standings = score_statistics.student_standings(np.array([1, 2, 3]), np.array([60.0, 60.0, 60.0]))
+        self.assertEqual({(row['z_score'], row['percentile_rank']) for row in standings}, {(0, 50)})
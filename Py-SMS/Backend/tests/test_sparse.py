@@ -0,0 +1,83 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.courses.models import Course, Enrollment
+from apps.courses.views import CourseViewSet
+from apps.grades.models import Grade
+from apps.grades.views import GradeViewSet
+from apps.students.models import Student
+from apps.students.views import StudentViewSet
+
+User = get_user_model()
+
+VALUES_LISTS = [
+    ('/api/v1/students/', StudentViewSet),
+    ('/api/v1/courses/', CourseViewSet),
+    ('/api/v1/grades/', GradeViewSet),
+]
+
+
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='viewer', is_staff=True))
+        courses = [
+            Course.objects.create(course_code='C1', name='Course 1', credits=3, instructor='Kim'),
+            Course.objects.create(course_code='C2', name='Course 2', credits=2),
+        ]
+        for n in range(3):
+            student = Student.objects.create(
+                student_id=f'S{n}', first_name=f'First{n}', last_name=f'Last{n}', email=f's{n}@example.com'
+            )
+            for course in courses:
+                Enrollment.objects.create(student=student, course=course)
+                Grade.objects.create(
+                    student=student, course=course, score=55 + 13 * n, max_score=100 if n else 0,
+                    grade_type='exam', semester='2024-1',
+                )
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def serialized(self, viewset, url):
+        # Without list_values, list goes through the list serializer.
+        with mock.patch.object(viewset, 'list_values', None):
+            return self.get(url)
+
+    def test_values_path_matches_serializer(self):
+        for url, viewset in VALUES_LISTS:
+            with self.subTest(url=url):
+                data = self.get(url)
+                self.assertEqual(data['count'], viewset.queryset.count())
+                self.assertEqual(data, self.serialized(viewset, url))
+
+    def test_fields_match_serializer(self):
+        for url, viewset in VALUES_LISTS:
+            fields = list(viewset.list_values)[-2:]
+            sparse = f'{url}?fields={",".join(fields)}'
+            with self.subTest(url=url):
+                data = self.get(sparse)
+                self.assertEqual(data, self.serialized(viewset, sparse))
+                self.assertEqual([list(row) for row in data['results']], [fields] * data['count'])
+
+    def test_fields_on_serializer_views(self):
+        enrollments = self.get('/api/v1/courses/enrollments/?fields=status,id')['results']
+        self.assertEqual({tuple(row) for row in enrollments}, {('id', 'status')})
+        student = self.get(f'/api/v1/students/{Student.objects.first().pk}/?fields=email')
+        self.assertEqual(list(student), ['email'])
+
+    def test_unknown_field_is_rejected(self):
+        for url in (
+            '/api/v1/students/?fields=id,password',
+            '/api/v1/courses/enrollments/?fields=id,password',
+            f'/api/v1/grades/{Grade.objects.first().pk}/?fields=password',
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('password', response.data['fields'])